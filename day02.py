@@ -104,9 +104,16 @@ Find the input noun and verb that cause the program to produce the output 196907
 """
 
 from egc.computer import ElfGuidanceComputer
+from egc.loader import loadProgram, programCachePath
+from egc.parallel import parallelSearch
+from egc.symbolic import EGCSymbolicError, deriveOutputPolynomial, solvePolynomial
 from utils.solver import ProblemSolver
 
 
+# the output we're looking for in part two
+TARGET_OUTPUT = 19690720
+
+
 def add(inData, inPosition):
     """
     opcode 1 adds two numbers and stores the result in a third position
@@ -149,6 +156,23 @@ def mul(inData, inPosition):
     return inData
 
 
+def producesOutput(program, nounVerb, target=TARGET_OUTPUT):
+    """
+    Runs the program with the given noun and verb
+
+    :param tuple program: the parsed intcode program
+    :param tuple nounVerb: the (noun, verb) pair to try
+    :param int target: the value we want left at address 0
+
+    :return bool: if the program halted with the target value at address 0
+    """
+    noun, verb = nounVerb
+    egc = ElfGuidanceComputer(list(program), noun=noun, verb=verb)
+    egc.Run()
+
+    return egc.buffer[0] == target
+
+
 class DaySolver02(ProblemSolver):
     def __init__(self):
         super(DaySolver02, self).__init__(2)
@@ -159,16 +183,21 @@ class DaySolver02(ProblemSolver):
                                 '1,1,1,4,99,5,6,0,99': [30,1,1,4,2,5,6,0,99]}
         self.testDataPartTwo = {}
 
+        # how many processes to search for part two's noun and verb with, defaults to the number of cores
+        self.workers = None
+
     def ProcessInput(self, data=None):
         """
         :param str data:string of integers, separated by commas
 
         :returns list[int]:
         """
+        cachePath = None
         if not data:
             data = self.rawData
+            cachePath = programCachePath(self.filePath)
 
-        processed = [int(i) for i in data.split(',')]
+        processed = loadProgram(data, cachePath)
 
         return processed
 
@@ -206,14 +235,27 @@ class DaySolver02(ProblemSolver):
         
         :return : the result
         """
-
-        for x in range(0, 100):
-            for y in range(0, 100):
-                egc = ElfGuidanceComputer(self.ProcessInput(), noun=x, verb=y)
-                egc.Run()
-                result = egc.buffer[0]
-                if egc.buffer[0] == 19690720:
-                    return (100 * x) + y
+        program = self.ProcessInput()
+
+        # the output is usually a polynomial in the noun and verb, which we can solve in a single run
+        try:
+            polynomial = deriveOutputPolynomial(program, {1: 'noun', 2: 'verb'})
+        except EGCSymbolicError:
+            pass
+        else:
+            found = solvePolynomial(polynomial, TARGET_OUTPUT, {'noun': range(0, 100), 'verb': range(0, 100)})
+            if found is None:
+                raise Exception("Failed to find the right result")
+
+            return (100 * found['noun']) + found['verb']
+
+        # otherwise the program branches on them, so we have to try them all
+        candidates = ((noun, verb) for noun in range(0, 100) for verb in range(0, 100))
+
+        found = parallelSearch(program, candidates, producesOutput, workers=self.workers)
+        if found is not None:
+            noun, verb = found
+            return (100 * noun) + verb
 
         raise Exception("Failed to find the right result")
 
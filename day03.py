@@ -51,14 +51,15 @@ What is the Manhattan distance from the central port to the closest intersection
 
 import math
 
+from utils.geometry import Point, findCrossings
 from utils.solver import ProblemSolver
-from utils.math import Float2
 
 
-Directions = {'R': Float2([1, 0]),
-             'L': Float2([-1, 0]),
-             'U': Float2([0, 1]),
-             'D': Float2([0, -1])}
+# the (x, y) step taken in each direction
+Directions = {'R': (1, 0),
+              'L': (-1, 0),
+              'U': (0, 1),
+              'D': (0, -1)}
 
 
 class Orientations(object):
@@ -68,11 +69,13 @@ class Orientations(object):
 
 
 class Edge(object):
+    __slots__ = ('start', 'end')
+
     def __init__(self, start, end):
         """
 
-        :param Float2 start: Where the edge starts
-        :param Float2 end: Where the edge ends
+        :param Point start: Where the edge starts
+        :param Point end: Where the edge ends
         """
         self.start = start
         self.end = end
@@ -91,7 +94,7 @@ class Edge(object):
         Given input point that is colinear with this edge, determine if the point
         is on the segment
 
-        :param Float2 point:
+        :param Point point:
         :return bool:
         """
         if point.x <= max(self.start.x, self.end.x) and \
@@ -113,7 +116,7 @@ class Edge(object):
         {
 
         }
-        :param Float2 point:
+        :param Point point:
         :return:
         """
         value = (point.y - self.start.y) * (self.end.x - point.x) - (point.x - self.start.x) * (self.end.y - point.y)
@@ -159,25 +162,59 @@ class Edge(object):
         Finds the point at which this edge and the input otherEdge intersect, if at all
 
         :param Edge otherEdge:
-        :return Float2: the point of intersection
+        :return Point: the point of intersection, or None if the edges don't meet on a grid point
         """
         if self.DoesIntersect(otherEdge):
-            xdiff = Float2([self.start.x - self.end.x, otherEdge.start.x - otherEdge.end.x])
-            ydiff = Float2([self.start.y - self.end.y, otherEdge.start.y - otherEdge.end.y])
-
-            def det(a, b):
-                return a.x * b.y - a.y * b.x
+            xdiffA = self.start.x - self.end.x
+            xdiffB = otherEdge.start.x - otherEdge.end.x
+            ydiffA = self.start.y - self.end.y
+            ydiffB = otherEdge.start.y - otherEdge.end.y
 
-            div = det(xdiff, ydiff)
+            div = xdiffA * ydiffB - xdiffB * ydiffA
             if not div:
-                return False
+                return None
 
-            d = Float2([det(self.start, self.end), det(otherEdge.start, otherEdge.end)])
-            x = det(d, xdiff) / div
-            y = det(d, ydiff) / div
-            return Float2([x, y])
+            dA = self.start.x * self.end.y - self.start.y * self.end.x
+            dB = otherEdge.start.x * otherEdge.end.y - otherEdge.start.y * otherEdge.end.x
+            x, xRemainder = divmod(dA * xdiffB - dB * xdiffA, div)
+            y, yRemainder = divmod(dA * ydiffB - dB * ydiffA, div)
 
-        return False
+            # axis aligned edges on the grid always meet on a grid point, only other edges can miss one
+            if xRemainder or yRemainder:
+                return None
+
+            return Point(x, y)
+
+        return None
+
+
+class Wire(list):
+    """
+    The edges of a wire in order from the central port, along with how many steps it takes to reach each one
+    """
+    def __init__(self, edges):
+        """
+        :param list[Edge] edges: the edges of the wire, starting at the central port
+        """
+        super(Wire, self).__init__(edges)
+
+        # the steps along the wire to the start of each edge
+        self.stepCounts = []
+
+        steps = 0
+        for edge in self:
+            self.stepCounts.append(steps)
+            steps += edge.GetLength()
+
+    def StepsTo(self, index, point):
+        """
+        :param int index: the index of the edge the point is on
+        :param Point point: a point on that edge
+
+        :return int: the steps along the wire it takes to reach the point
+        """
+        start = self[index].start
+        return self.stepCounts[index] + abs(point.x - start.x) + abs(point.y - start.y)
 
 
 class DaySolver03(ProblemSolver):
@@ -209,51 +246,55 @@ class DaySolver03(ProblemSolver):
         """
         Build a list of edges that constitue the input wire directions
         :param list wire:
-        :return list[Edge]:
+        :return Wire:
         """
         output = []
 
-        currentPoint = Float2([0, 0])
+        x = y = 0
+        currentPoint = Point(x, y)
         for direction, distance in wire:
-            newPoint = currentPoint + (Directions[direction] * distance)
-            edge = Edge(currentPoint, newPoint)
-            output.append(edge)
+            stepX, stepY = Directions[direction]
+            x += stepX * distance
+            y += stepY * distance
+
+            newPoint = Point(x, y)
+            output.append(Edge(currentPoint, newPoint))
             currentPoint = newPoint
 
-        return output
+        return Wire(output)
 
     def BuildWires(self, data):
         """
+        Build the edges of every wire, however many there are
 
-        :param data:
-        :return:
+        :param list data: the directions of each wire
+        :return list[Wire]:
+        """
+        return [self.BuildWire(wire) for wire in data]
+
+    def GetWireCrossings(self, wires):
+        """
+        Sweep across the edges of both wires to find where they cross
+
+        :param list wires:
+        :return list[tuple]: (index of the edge on the first wire, index of the edge on the second wire, point)
+                             for every crossing
         """
-        wires = [[], []]
+        crossings = []
 
-        #   figure out each of the "edges" of the wire based on the start, and next point
-        for index, wire in enumerate(data):
-            wires[index] = self.BuildWire(wire)
+        for indexA, indexB, x, y in findCrossings(wires[0], wires[1]):
+            # both wires start at the central port, which doesn't count as crossing
+            if x or y:
+                crossings.append((indexA, indexB, Point(x, y)))
 
-        return wires
+        return crossings
 
     def GetWireIntersections(self, wires):
         """
-        Loop over all the edges in each wire and determine their points of intersection
-
         :param list wires:
         :return list: the points at which the wires intersect
         """
-        intersections = []
-
-        # then compare each edge against each edge in the other wire for intersection
-        for edgeA in wires[0]:
-            for edgeB in wires[1]:
-                # check the bounding boxes of each wire
-                intersection = edgeA.FindIntersection(edgeB)
-                if intersection and (intersection.x != 0.0 and intersection.y != 0.0):
-                    intersections.append(intersection)
-
-        return intersections
+        return [point for _, _, point in self.GetWireCrossings(wires)]
 
     def SolvePartOne(self, data=None):
         """
@@ -281,8 +322,7 @@ class DaySolver03(ProblemSolver):
 
     def SolvePartTwo(self, data=None):
         """
-        Loop over all the intersections in the wires and determine the distance
-        to each that intersect point for each wire and use that to determine the shortest distance
+        Find the combined steps both wires take to reach each of their intersections, and return the fewest
 
         :param list data: the data to operate on
         
@@ -293,34 +333,14 @@ class DaySolver03(ProblemSolver):
 
         wires = self.BuildWires(data)
 
-        intersections = self.GetWireIntersections(wires)
-
         intersectDistances = []
-        for intersection in intersections:
-            intersectDistances.append(sum([self.tracePathToIntersection(wire, intersection) for wire in wires]))
+        for indexA, indexB, point in self.GetWireCrossings(wires):
+            intersectDistances.append(wires[0].StepsTo(indexA, point) + wires[1].StepsTo(indexB, point))
 
         minValue = min(intersectDistances)
 
         return minValue
 
-    def tracePathToIntersection(self, wire, intersection):
-        """
-
-        :param list[Edge] wire:
-        :param Float2 intersection:
-        :return float: the total driving distance to reach the intersection on this wire
-        """
-        distance = 0.0
-        for edge in wire:
-            if edge.PointOnSegment(intersection):
-                partialEdge = Edge(edge.start, intersection)
-                distance += partialEdge.GetLength()
-                break
-            else:
-                distance += edge.GetLength()
-
-        return distance
-
 
 def Main():
     solver = DaySolver03()
@@ -5,6 +5,7 @@
 from utils.solver import ProblemSolver
 
 from egc.computer import ElfGuidanceComputer
+from egc.loader import loadProgram, programCachePath
 
 
 class Day05Part01Computer(ElfGuidanceComputer):
@@ -39,10 +40,12 @@ class DaySolver05(ProblemSolver):
 
         :returns list[int]: the current memory buffer
         """
+        cachePath = None
         if not data:
             data = self.rawData
+            cachePath = programCachePath(self.filePath)
 
-        processed = [int(i) for i in data.split(',')]
+        processed = loadProgram(data, cachePath)
 
         return processed
 
@@ -3,7 +3,10 @@
 """
 import itertools
 
-from egc.computer import ElfGuidanceComputer
+from egc.computer import ElfGuidanceComputer, AwaitingInput
+from egc.loader import loadProgram, programCachePath
+from egc.network import ComputerNetwork
+from egc.parallel import parallelMax
 from utils.solver import ProblemSolver
 
 
@@ -46,51 +49,236 @@ class Day07ElfGuidanceComputer(ElfGuidanceComputer):
 
 
 class Day07ConcurrentComputer(Day07ElfGuidanceComputer):
-    def __init__(self, *args, **kwargs):
-        super(Day07ConcurrentComputer, self).__init__(*args, **kwargs)
-        self.paused = False
-        self.next = -1
-        self.input = False
-        self.paused = False
-
-    @property
-    def input(self):
-        return self._input
-
-    @input.setter
-    def input(self, value):
-        self._input = value
-        self.paused = False
-
-    def step(self):
-        super(Day07ConcurrentComputer, self).step()
-        #print(self.ampID, self.currentIndex, self.buffer)
-
+    """
+    An amplifier in a feedback loop, which reads its phase and then every input signal from its input channel,
+    so it can be run as part of an egc.network.ComputerNetwork
+    """
     def GetInput(self):
         self.inputCounter += 1
-        # if we don't have an input signal, pause
-        if self.input is False:
-            self.paused = True
-            return False
-
-        if self.inputCounter > 0:
-            output = self.input
-            self.input = False
-            return output
+        return self.inputChannel.popleft()
+
+
+AMPLIFIER_IDS = ('a', 'b', 'c', 'd', 'e')
+
+# the amplifier receiving each amplifier's output signals in the feedback loop
+NEXT_AMPLIFIER = {'a': 'b',
+                  'b': 'c',
+                  'c': 'd',
+                  'd': 'e',
+                  'e': 'a'}
+
+
+def forkAmplifiers(template, amplifierIDs=AMPLIFIER_IDS):
+    """
+    :param EGCSnapshot template: the freshly loaded amplifier to fork from
+    :param list amplifierIDs: the id of every amplifier
+
+    :return dict: the initialized amplifier computers, sharing their program copy on write, mapped to str ids
+    """
+    amplifiers = {}
+    for amp in amplifierIDs:
+        amplifiers[amp] = template.CreateComputer()
+        amplifiers[amp].ampID = amp
+
+    return amplifiers
+
+
+def runAmplifierChain(amplifiers, phaseOrder, amplifierIDs=AMPLIFIER_IDS):
+    """
+    Run each amplifier once in order, feeding each one's output into the next
+
+    :param dict amplifiers: Day07ElfGuidanceComputers mapped to their ids
+    :param list phaseOrder: the phase of each amplifier, in amplifierIDs order
+    :param list amplifierIDs: the id of every amplifier, in the order they're chained together
+
+    :return int: the output of the last amplifier
+    """
+    for i, value in enumerate(amplifierIDs):
+        amplifiers[value].phase = phaseOrder[i]
+
+    amplifiers[amplifierIDs[0]].input = 0
+
+    for i, value in enumerate(amplifierIDs):
+        amplifiers[value].Run()
+
+        if i + 1 < len(amplifierIDs):
+            amplifiers[amplifierIDs[i + 1]].input = amplifiers[value].output
+
+    return amplifiers[amplifierIDs[-1]].output
+
+
+def runFeedbackLoop(amplifiers, phaseOrder, amplifierIDs=AMPLIFIER_IDS, connections=NEXT_AMPLIFIER):
+    """
+    Run the amplifiers as a network wired up by the given connections until they've all finished
+
+    :param dict amplifiers: Day07ConcurrentComputers mapped to their ids
+    :param list phaseOrder: the phase of each amplifier, in amplifierIDs order
+    :param list amplifierIDs: the id of every amplifier, the first gets the starting signal
+    :param dict connections: the id of the amplifier receiving each amplifier's outputs, mapped to its id
+
+    :return int: the last output of the last amplifier
+    """
+    network = ComputerNetwork(amplifiers, connections)
+
+    # each amplifier reads its phase first
+    for i, value in enumerate(amplifierIDs):
+        amplifiers[value].phase = phaseOrder[i]
+        network.Send(value, phaseOrder[i])
+
+    # then the first amplifier gets the starting signal
+    network.Send(amplifierIDs[0], 0)
+
+    return network.Run()[amplifierIDs[-1]]
+
+
+def createAmplifierTemplate(program, amplifierClass=Day07ElfGuidanceComputer):
+    """
+    :param tuple program: the amplifier program
+    :param type amplifierClass: the computer class to use for each amplifier
+
+    :return EGCSnapshot: a freshly loaded amplifier that every amplifier can be forked from
+    """
+    return amplifierClass(None, list(program)).Snapshot()
+
+
+def createChainTemplate(program):
+    """
+    :param tuple program: the amplifier program
+
+    :return EGCSnapshot: a freshly loaded amplifier for the chain of amplifiers to fork from
+    """
+    return createAmplifierTemplate(program)
+
+
+def createFeedbackLoopTemplate(program):
+    """
+    :param tuple program: the amplifier program
+
+    :return EGCSnapshot: a freshly loaded amplifier for the feedback loop to fork from
+    """
+    return createAmplifierTemplate(program, Day07ConcurrentComputer)
+
+
+class PhasePrefixCache(object):
+    """
+    Runs phase orders through the amplifiers, remembering what happened after every prefix of a phase order.
+
+    The first k amplifiers only ever see the starting signal and their own phases, so whatever they do depends
+    on nothing but the first k phases. For a chain that's the signal the kth amplifier outputs, and for a
+    feedback loop it's the state of the first k amplifiers once they're waiting for the signal to come back
+    around. Phase orders sharing a prefix only run the amplifiers after it
+    """
+    def __init__(self, template, amplifierIDs=AMPLIFIER_IDS, connections=None):
+        """
+        :param EGCSnapshot template: a freshly loaded amplifier to fork from, a Day07ElfGuidanceComputer for
+                                     a chain, or a Day07ConcurrentComputer for a feedback loop
+        :param list amplifierIDs: the id of every amplifier, in order
+        :param dict connections: see runFeedbackLoop, defaults to NEXT_AMPLIFIER for a feedback loop
+        """
+        self.template = template
+        self.amplifierIDs = tuple(amplifierIDs)
+
+        self.feedback = issubclass(template.computerClass, Day07ConcurrentComputer)
+        self.connections = connections or NEXT_AMPLIFIER
+
+        # for a chain, the signal the last amplifier output, and for a feedback loop the snapshot of every
+        # amplifier so far and the signals the last one output, mapped to phase prefixes
+        self._prefixes = {(): 0 if not self.feedback else ((), (0,))}
+
+        # how many times we've had to run an amplifier
+        self.amplifierRuns = 0
+
+    def _forkAmplifier(self, prefix):
+        """
+        :return Day07ElfGuidanceComputer: a new amplifier for the last phase in the prefix
+        """
+        self.amplifierRuns += 1
+
+        amplifier = self.template.CreateComputer()
+        amplifier.ampID = self.amplifierIDs[len(prefix) - 1]
+        amplifier.phase = prefix[-1]
+
+        return amplifier
+
+    def _runPrefix(self, prefix):
+        """
+        :param tuple prefix: the phases of the first amplifiers
+
+        :return: what happened after the prefix, see _prefixes
+        """
+        result = self._prefixes.get(prefix)
+        if result is not None:
+            return result
+
+        previous = self._runPrefix(prefix[:-1])
+        amplifier = self._forkAmplifier(prefix)
+
+        if not self.feedback:
+            amplifier.input = previous
+            amplifier.Run()
+            result = amplifier.output
         else:
-            return self.phase
+            snapshots, signals = previous
+            amplifier.inputChannel.append(prefix[-1])
+            amplifier.inputChannel.extend(signals)
 
-    def Output(self, value):
+            # run until the amplifier is waiting for the signal to come back around
+            outputs = list(itertools.takewhile(lambda value: value is not AwaitingInput, amplifier.Execute()))
+            result = (snapshots + (amplifier.Snapshot(),), tuple(outputs))
+
+        self._prefixes[prefix] = result
+
+        return result
+
+    def Signal(self, phaseOrder):
         """
-        On output, pause execution until we recieve a new input signal
+        :param tuple phaseOrder: the phase of each amplifier, in order
 
-        :param value:
+        :return int: the signal the last amplifier outputs
         """
-        super(Day07ConcurrentComputer, self).Output(value)
+        result = self._runPrefix(tuple(phaseOrder))
+        if not self.feedback:
+            return result
+
+        snapshots, signals = result
+        amplifiers = {}
+        for ampID, snapshot in zip(self.amplifierIDs, snapshots):
+            amplifiers[ampID] = snapshot.CreateComputer()
+
+        network = ComputerNetwork(amplifiers, self.connections)
+        for signal in signals:
+            network.Send(self.connections[self.amplifierIDs[-1]], signal)
+        network.Run()
+
+        return amplifiers[self.amplifierIDs[-1]].output
+
+
+def createChainCache(program):
+    """
+    :param tuple program: the amplifier program
+
+    :return PhasePrefixCache: a cache to run chains of amplifiers with
+    """
+    return PhasePrefixCache(createChainTemplate(program))
+
 
-    def RunUntilOutput(self):
-        while not self.paused and not self.finished:
-            self.step()
+def createFeedbackLoopCache(program):
+    """
+    :param tuple program: the amplifier program
+
+    :return PhasePrefixCache: a cache to run feedback loops of amplifiers with
+    """
+    return PhasePrefixCache(createFeedbackLoopTemplate(program))
+
+
+def amplifierSignal(cache, phaseOrder):
+    """
+    :param PhasePrefixCache cache: see createChainCache or createFeedbackLoopCache
+    :param tuple phaseOrder: the phase of each amplifier
+
+    :return int: the signal the chain or feedback loop of amplifiers outputs with the given phases
+    """
+    return cache.Signal(phaseOrder)
 
 
 class DaySolver07(ProblemSolver):
@@ -104,24 +292,25 @@ class DaySolver07(ProblemSolver):
                                 ('3,52,1001,52,-5,52,3,53,1,52,56,54,1007,54,5,55,1005,55,26,1001,54,-5,54,1105,1,12,1,53,54,53,1008,54,0,55,1001,55,1,55,2,53,55,53,4,53,1001,56,-1,56,1005,56,6,99,0,0,0,0,10', '97856'): 18216
                                 }
 
-        self.amplifierIDs = ['a', 'b', 'c', 'd', 'e']
-        self.nextAmplifier = {'a':'b',
-                              'b':'c',
-                              'c':'d',
-                              'd':'e',
-                              'e':'a'}
+        self.amplifierIDs = list(AMPLIFIER_IDS)
+        self.nextAmplifier = dict(NEXT_AMPLIFIER)
         self.phases = [0, 1, 2, 3, 4]
 
+        # how many processes to evaluate phase orders with, defaults to the number of cores
+        self.workers = None
+
     def ProcessInput(self, data=None):
         """
         :param str data: comma-separated integers
 
         :returns list[int]: the intcode buffer
         """
+        cachePath = None
         if not data:
             data = self.rawData
+            cachePath = programCachePath(self.filePath)
 
-        processed = [int(i) for i in data.split(',')]
+        processed = loadProgram(data, cachePath)
 
         return processed
 
@@ -130,7 +319,7 @@ class DaySolver07(ProblemSolver):
 
         :return dict: the initialized amplifier computers mapped to str ids
         """
-        return {amp: amplifierClass(amp, data.copy()) for amp in self.amplifierIDs}
+        return forkAmplifiers(createAmplifierTemplate(data, amplifierClass), self.amplifierIDs)
 
     def TestAlgorithm(self, algorithm, part=1):
         """
@@ -181,48 +370,18 @@ class DaySolver07(ProblemSolver):
 
         :return int: the output buffer of amplifier e
         """
-        amplifiers = amplifiers.copy()
-
-        for i, value in enumerate(self.amplifierIDs):
-            amplifiers[value].phase = phaseOrder[i]
-
-        amplifiers['a'].input = 0
-
-        for i, value in enumerate(self.amplifierIDs):
-            amplifiers[value].Run()
-
-            if i + 1 < len(self.amplifierIDs):
-                amplifiers[self.amplifierIDs[i + 1]].input = amplifiers[value].output
-
-        return amplifiers['e'].output
+        return runAmplifierChain(amplifiers, phaseOrder, self.amplifierIDs)
 
     def testPhaseOrderConcurrent(self, amplifiers, phaseOrder):
-        amplifiers = amplifiers.copy()
-
-        # tell the amplifiers who to talk to next
-        for amp in amplifiers:
-            amplifiers[amp].next = self.nextAmplifier[amp]
-
-        # populate the input buffer with the phase of the amplifier to start
-        for i, value in enumerate(self.amplifierIDs):
-            amplifiers[value].phase = phaseOrder[i]
-
-        # pre-populate the second input of the 'a' amplifier
-        amplifiers['a'].input = 0
-
-        allFinished = False
-
-        while not allFinished:
-            for ampID, amplifier in amplifiers.items():
-                #print(ampID)
-                if not amplifier.finished:
-                    amplifier.RunUntilOutput()
-
-                    amplifiers[amplifier.next].input = amplifier.output
+        """
+        Run the amplifiers as a feedback loop wired up by nextAmplifier, based on the input phaseOrder values
 
-            allFinished = all([amplifier.finished for amplifier in amplifiers.values()])
+        :param dict amplifiers: Day07ConcurrentComputers mapped to their ids
+        :param list phaseOrder: the phase of each amplifier, in amplifierIDs order
 
-        return amplifiers['e'].output
+        :return int: the last output of amplifier e
+        """
+        return runFeedbackLoop(amplifiers, phaseOrder, self.amplifierIDs, self.nextAmplifier)
 
     def SolvePartOne(self, data=None):
         """
@@ -237,13 +396,10 @@ class DaySolver07(ProblemSolver):
 
         phaseOrderPermutations = itertools.permutations(self.phases, len(self.phases))
 
-        results = []
+        signal, _ = parallelMax(data, phaseOrderPermutations, amplifierSignal, workers=self.workers,
+                                prepare=createChainCache)
 
-        for phaseOrder in phaseOrderPermutations:
-            amplifiers = self._initializeAmplifiers(data)
-            results.append(self.testPhaseOrder(amplifiers, list(phaseOrder)))
-
-        return max(results)
+        return signal
 
     def SolvePartTwo(self, data=None):
         """
@@ -258,13 +414,10 @@ class DaySolver07(ProblemSolver):
 
         phaseOrderPermutations = itertools.permutations(self.phases, len(self.phases))
 
-        results = []
-
-        for phaseOrder in phaseOrderPermutations:
-            amplifiers = self._initializeAmplifiers(data, amplifierClass=Day07ConcurrentComputer)
-            results.append(self.testPhaseOrderConcurrent(amplifiers, list(phaseOrder)))
+        signal, _ = parallelMax(data, phaseOrderPermutations, amplifierSignal, workers=self.workers,
+                                prepare=createFeedbackLoopCache)
 
-        return max(results)
+        return signal
 
 
 def Main():
@@ -3,6 +3,7 @@
 """
 
 from egc.computer import ExtraMemoryComputer
+from egc.loader import loadProgram, programCachePath
 from utils.solver import ProblemSolver
 
 
@@ -36,10 +37,12 @@ class DaySolver09(ProblemSolver):
         """
         :param str data:
         """
+        cachePath = None
         if not data:
             data = self.rawData
+            cachePath = programCachePath(self.filePath)
 
-        processed = [int(i) for i in data.split(',')]
+        processed = loadProgram(data, cachePath)
 
         return processed
 
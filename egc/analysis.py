@@ -0,0 +1,326 @@
+"""
+Static analysis of Elf Guidance Computer programs, without running them
+
+Programs can be disassembled straight through, or explored from their entry point into basic blocks and a control
+flow graph. Only jumps whose target is an immediate value can be followed, so anything jumping to a computed
+address is reported rather than guessed at, as is any write that can land on code we found. Print a program's
+disassembly or control flow graph with
+
+    python -m egc.analysis inputData/day09.txt --cfg
+"""
+import argparse
+import collections
+import sys
+
+from egc.computer import ElfGuidanceComputer, ParameterMode, decodeInstruction
+from egc.loader import loadProgram
+
+
+JUMP_IF_TRUE = 5
+JUMP_IF_FALSE = 6
+HALT = 99
+
+_JUMPS = (JUMP_IF_TRUE, JUMP_IF_FALSE)
+
+
+Instruction = collections.namedtuple('Instruction', ['address', 'opcode', 'modes', 'parameters', 'length'])
+
+
+def _parameterText(mode, parameter):
+    """
+    :return str: the parameter written in disassembly syntax, [12] for position, #12 for immediate and
+                 [rb+12] for relative mode
+    """
+    if mode == ParameterMode.Position:
+        return '[{}]'.format(parameter)
+    elif mode == ParameterMode.Immediate:
+        return '#{}'.format(parameter)
+    elif mode == ParameterMode.Relative:
+        return '[rb{:+d}]'.format(parameter)
+
+    return '?{}'.format(parameter)
+
+
+def formatInstruction(instruction, computerClass=ElfGuidanceComputer):
+    """
+    :param Instruction instruction: the instruction to format
+    :param type computerClass: the computer class whose handler names to use
+
+    :return str: the instruction as a line of disassembly, eg "    12: _add [13], #4, [rb+5]"
+    """
+    if instruction.opcode is None:
+        return '{:>6}: .data {}'.format(instruction.address, instruction.parameters[0])
+
+    name = computerClass._instructionSet.get(instruction.opcode, str(instruction.opcode))
+    parameters = ', '.join(_parameterText(mode, parameter)
+                           for mode, parameter in zip(instruction.modes, instruction.parameters))
+
+    return '{:>6}: {} {}'.format(instruction.address, name, parameters).rstrip()
+
+
+def decodeAt(buffer, address, computerClass=ElfGuidanceComputer):
+    """
+    :param list[int] buffer: the program
+    :param int address: the address to decode
+    :param type computerClass: the computer class whose instruction set to decode with
+
+    :return Instruction: the instruction at the address, or a single word of data with an opcode of None if
+                         there's no valid instruction there
+    """
+    value = buffer[address]
+    if not isinstance(value, int):
+        return Instruction(address, None, (), (value,), 1)
+
+    opcode, modes, length = decodeInstruction(value, 5, computerClass._instructionLengths)
+    if length is None or address + length > len(buffer):
+        return Instruction(address, None, (), (value,), 1)
+
+    modes = modes[:length - 1]
+    for mode in modes:
+        if mode not in (ParameterMode.Position, ParameterMode.Immediate, ParameterMode.Relative):
+            return Instruction(address, None, (), (value,), 1)
+
+    writes = computerClass._instructionWrites.get(opcode)
+    if writes is not None and modes[writes] == ParameterMode.Immediate:
+        return Instruction(address, None, (), (value,), 1)
+
+    return Instruction(address, opcode, modes, tuple(buffer[address + 1:address + length]), length)
+
+
+def disassemble(buffer, start=0, end=None, computerClass=ElfGuidanceComputer):
+    """
+    Decode a program straight through in a single pass, treating anything that isn't a valid instruction
+    as a word of data. Data that happens to look like an instruction will be decoded as one
+
+    :param list[int] buffer: the program
+    :param int start: the address to start at
+    :param int end: the address to stop before, defaults to the end of the buffer
+    :param type computerClass: the computer class whose instruction set to decode with
+
+    :return list[Instruction]: every instruction in order
+    """
+    end = len(buffer) if end is None else min(end, len(buffer))
+
+    instructions = []
+    address = start
+    while address < end:
+        instruction = decodeAt(buffer, address, computerClass)
+        instructions.append(instruction)
+        address += instruction.length
+
+    return instructions
+
+
+class BasicBlock(object):
+    """
+    A run of instructions that's only ever entered at its first instruction and left after its last
+    """
+    def __init__(self, start):
+        """
+        :param int start: the address of the first instruction
+        """
+        self.start = start
+        self.instructions = []
+
+        # the start addresses of every block control can pass to after this one
+        self.successors = []
+
+    @property
+    def end(self):
+        """
+        :return int: the address just past the last instruction
+        """
+        last = self.instructions[-1]
+        return last.address + last.length
+
+    def __repr__(self):
+        return 'BasicBlock({}-{} -> {})'.format(self.start, self.end, self.successors)
+
+
+class ControlFlowGraph(object):
+    """
+    The basic blocks reachable from a program's entry point, and what we could find out about them statically
+    """
+    def __init__(self):
+        # basic blocks mapped to their start addresses
+        self.blocks = {}
+
+        # every address belonging to an instruction we found, or to a word control reaches that isn't one yet
+        self.codeAddresses = set()
+
+        # addresses of jumps whose target is read from memory, so we couldn't follow them
+        self.indirectJumps = []
+
+        # (instruction address, target address) of writes we know land on code
+        self.selfModifyingWrites = []
+
+        # addresses of instructions writing through a relative mode parameter, which could land anywhere
+        self.unresolvedWrites = []
+
+        # addresses we reached that don't hold a valid instruction
+        self.invalidAddresses = []
+
+    @property
+    def isSelfModifying(self):
+        """
+        :return bool: True if we found a write into code
+        """
+        return bool(self.selfModifyingWrites)
+
+    def Predecessors(self):
+        """
+        :return dict: the start addresses of every block that can pass control to a block, mapped to its start
+        """
+        predecessors = {start: [] for start in self.blocks}
+        for start, block in sorted(self.blocks.items()):
+            for successor in block.successors:
+                predecessors.setdefault(successor, []).append(start)
+
+        return predecessors
+
+
+def _successors(instruction):
+    """
+    :param Instruction instruction: a decoded instruction
+
+    :return tuple: (addresses control can continue at, if control leaves in a way we can't follow)
+    """
+    nextAddress = instruction.address + instruction.length
+
+    if instruction.opcode is None or instruction.opcode == HALT:
+        return (), False
+
+    if instruction.opcode not in _JUMPS:
+        return (nextAddress,), False
+
+    conditionMode, targetMode = instruction.modes
+    condition, target = instruction.parameters
+
+    successors = []
+    if conditionMode == ParameterMode.Immediate:
+        jumps = (condition != 0) == (instruction.opcode == JUMP_IF_TRUE)
+        if not jumps:
+            return (nextAddress,), False
+    else:
+        successors.append(nextAddress)
+
+    if targetMode != ParameterMode.Immediate:
+        return tuple(successors), True
+
+    successors.insert(0, target)
+    return tuple(successors), False
+
+
+def buildControlFlowGraph(buffer, entry=0, computerClass=ElfGuidanceComputer):
+    """
+    Explore a program from its entry point with a worklist, following every jump with an immediate target,
+    then split what we found into basic blocks
+
+    :param list[int] buffer: the program
+    :param int entry: the address execution starts at
+    :param type computerClass: the computer class whose instruction set to decode with
+
+    :return ControlFlowGraph: the program's control flow graph
+    """
+    graph = ControlFlowGraph()
+
+    instructions = {}
+    leaders = {entry}
+    worklist = [entry]
+    while worklist:
+        address = worklist.pop()
+        # follow straight line code in this loop, and only queue up the other side of branches
+        while 0 <= address < len(buffer) and address not in instructions:
+            instruction = decodeAt(buffer, address, computerClass)
+            instructions[address] = instruction
+
+            if instruction.opcode is None:
+                graph.invalidAddresses.append(address)
+                break
+
+            successors, indirect = _successors(instruction)
+            if indirect:
+                graph.indirectJumps.append(address)
+
+            if instruction.opcode in _JUMPS or instruction.opcode == HALT:
+                leaders.update(successors)
+                worklist.extend(successors)
+                break
+
+            address = successors[0]
+
+    # control reaching a word that isn't an instruction yet usually means the program writes one there first,
+    # so it still counts as code
+    for instruction in instructions.values():
+        graph.codeAddresses.update(range(instruction.address, instruction.address + instruction.length))
+
+    for address in sorted(instructions):
+        instruction = instructions[address]
+        writes = computerClass._instructionWrites.get(instruction.opcode)
+        if writes is None:
+            continue
+
+        if instruction.modes[writes] == ParameterMode.Position:
+            if instruction.parameters[writes] in graph.codeAddresses:
+                graph.selfModifyingWrites.append((address, instruction.parameters[writes]))
+        else:
+            graph.unresolvedWrites.append(address)
+
+    # a block runs from each leader until a jump, a halt, or the next leader
+    for start in sorted(leaders):
+        if start not in instructions:
+            continue
+
+        block = BasicBlock(start)
+        address = start
+        while True:
+            instruction = instructions[address]
+            block.instructions.append(instruction)
+
+            successors, _ = _successors(instruction)
+            address = instruction.address + instruction.length
+            if instruction.opcode is None or instruction.opcode in _JUMPS or instruction.opcode == HALT:
+                block.successors = [successor for successor in successors if successor in instructions]
+                break
+
+            if address in leaders or address not in instructions:
+                block.successors = [address] if address in instructions else []
+                break
+
+        graph.blocks[start] = block
+
+    graph.indirectJumps.sort()
+    graph.invalidAddresses.sort()
+
+    return graph
+
+
+def Main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m egc.analysis', description="Disassemble an intcode program")
+    parser.add_argument('program', help="comma separated intcode program")
+    parser.add_argument('--cfg', action='store_true', help="print the control flow graph instead")
+
+    args = parser.parse_args(args)
+
+    with open(args.program, 'r') as fh:
+        program = loadProgram(fh.read())
+
+    if not args.cfg:
+        for instruction in disassemble(program):
+            sys.stdout.write(formatInstruction(instruction) + '\n')
+        return
+
+    graph = buildControlFlowGraph(program)
+    for start, block in sorted(graph.blocks.items()):
+        sys.stdout.write('block {} -> {}\n'.format(start, ', '.join(str(s) for s in block.successors) or 'end'))
+        for instruction in block.instructions:
+            sys.stdout.write(formatInstruction(instruction) + '\n')
+
+    for address in graph.indirectJumps:
+        sys.stdout.write('indirect jump at {}\n'.format(address))
+    for address, target in graph.selfModifyingWrites:
+        sys.stdout.write('write into code at {} -> {}\n'.format(address, target))
+
+
+if __name__ == '__main__':
+    Main()
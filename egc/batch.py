@@ -0,0 +1,244 @@
+"""
+A batched Elf Guidance Computer that runs many instances of the same program in lockstep with NumPy
+
+Every instance's memory is a row of one 2D array. Instances whose instruction pointers agree and who are looking
+at the same opcode are decoded once and executed together as array operations, and the batch splits into smaller
+groups wherever their control flow diverges. Requires NumPy
+"""
+import collections
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from egc.computer import ParameterMode, EGCUnhandledOpcodeError, EGCUnexpectedParameterMode, EGCAccessViolation, \
+    EGCOutOfRangeError, decodeInstruction
+
+
+# values beyond these could overflow 64 bits when added or multiplied
+_ADD_LIMIT = 2 ** 62
+_MUL_LIMIT = 2 ** 31
+
+
+class BatchComputer(object):
+    """
+    Runs a batch of instances of one intcode program, each with its own memory, instruction pointer, relative
+    base, inputs and outputs, and gives exactly the same results as running each on an ElfGuidanceComputer.
+
+    Memory is a 2D int64 array, and moves over to Python ints as soon as any value might not fit in 64 bits
+    """
+    def __init__(self, program, count, memorySize=None):
+        """
+        :param list[int] program: the parsed intcode program every instance starts with
+        :param int count: how many instances to run
+        :param int memorySize: how many addresses each instance has, defaults to the length of the program
+        """
+        if numpy is None:
+            raise ImportError("The BatchComputer requires NumPy")
+
+        memorySize = max(memorySize or 0, len(program))
+
+        image = list(program) + [0] * (memorySize - len(program))
+        try:
+            row = numpy.array(image, dtype=numpy.int64)
+        except OverflowError:
+            row = numpy.array(image, dtype=object)
+
+        self.count = count
+        self.memory = numpy.tile(row, (count, 1))
+
+        self.currentIndices = numpy.zeros(count, dtype=numpy.int64)
+        self.relativeBases = numpy.zeros(count, dtype=numpy.int64)
+        self.finished = numpy.zeros(count, dtype=bool)
+
+        # instances waiting on an input they haven't been given yet
+        self.blocked = numpy.zeros(count, dtype=bool)
+
+        self.inputs = [collections.deque() for _ in range(count)]
+        self.outputs = [[] for _ in range(count)]
+
+        self.maxParams = 5
+
+        # how many grouped steps we've executed
+        self.steps = 0
+
+    @property
+    def isObject(self):
+        """
+        :return bool: True once memory has moved over to Python ints
+        """
+        return self.memory.dtype == object
+
+    def _promote(self):
+        """
+        Move memory over to arbitrary-precision Python ints
+        """
+        if not self.isObject:
+            self.memory = self.memory.astype(object)
+
+    def SetInputs(self, instance, values):
+        """
+        Queue up input values for an instance
+
+        :param int instance: the index of the instance
+        :param list[int] values: the values, in the order the instance should read them
+        """
+        self.inputs[instance].extend(values)
+        self.blocked[instance] = False
+
+    def _checkAddresses(self, addresses, ip):
+        if len(addresses) and (addresses.min() < 0 or addresses.max() >= self.memory.shape[1]):
+            raise IndexError("Instruction at position {} accessed an address outside of memory".format(ip))
+
+        return addresses.astype(numpy.int64)
+
+    def _address(self, lanes, ip, modes, paramPosition):
+        """
+        :return numpy.ndarray: the address each lane's parameter refers to
+        """
+        mode = modes[paramPosition]
+        parameters = self.memory[lanes, ip + 1 + paramPosition]
+
+        if mode == ParameterMode.Position:
+            return self._checkAddresses(parameters, ip)
+        elif mode == ParameterMode.Immediate:
+            return numpy.full(len(lanes), ip + 1 + paramPosition, dtype=numpy.int64)
+        elif mode == ParameterMode.Relative:
+            return self._checkAddresses(self.relativeBases[lanes] + parameters, ip)
+
+        raise EGCUnexpectedParameterMode(mode, ip)
+
+    def _read(self, lanes, ip, modes, paramPosition):
+        """
+        :return numpy.ndarray: each lane's value for the parameter
+        """
+        return self.memory[lanes, self._address(lanes, ip, modes, paramPosition)]
+
+    def _write(self, lanes, ip, modes, paramPosition, values):
+        if modes[paramPosition] == ParameterMode.Immediate:
+            raise EGCAccessViolation(modes, ip)
+
+        self.memory[lanes, self._address(lanes, ip, modes, paramPosition)] = values
+
+    def _fits(self, a, b, limit):
+        """
+        :return bool: if every value is small enough that combining them can't overflow 64 bits
+        """
+        if self.isObject:
+            return True
+
+        # not numpy.abs, which leaves the most negative int64 negative
+        return bool(((a > -limit) & (a < limit)).all() and ((b > -limit) & (b < limit)).all())
+
+    def _execute(self, lanes, ip, opcode, modes):
+        """
+        Executes one instruction for a group of lanes sharing the same instruction pointer and opcode
+
+        :param numpy.ndarray lanes: the indices of the instances in the group
+        :param int ip: their instruction pointer
+        :param int opcode: the decoded opcode
+        :param tuple modes: the decoded parameter modes
+        """
+        if opcode in (1, 2):
+            a = self._read(lanes, ip, modes, 0)
+            b = self._read(lanes, ip, modes, 1)
+            if not self._fits(a, b, _ADD_LIMIT if opcode == 1 else _MUL_LIMIT):
+                self._promote()
+                a = a.astype(object)
+                b = b.astype(object)
+
+            self._write(lanes, ip, modes, 2, a + b if opcode == 1 else a * b)
+            self.currentIndices[lanes] += 4
+
+        elif opcode == 3:
+            ready = []
+            values = []
+            for lane in lanes:
+                if self.inputs[lane]:
+                    ready.append(lane)
+                    values.append(self.inputs[lane].popleft())
+                else:
+                    self.blocked[lane] = True
+
+            if ready:
+                ready = numpy.array(ready, dtype=numpy.int64)
+                if not self.isObject and any(abs(value) >= 2 ** 63 for value in values):
+                    self._promote()
+
+                self._write(ready, ip, modes, 0, numpy.array(values, dtype=self.memory.dtype))
+                self.currentIndices[ready] += 2
+
+        elif opcode == 4:
+            for lane, value in zip(lanes, self._read(lanes, ip, modes, 0)):
+                self.outputs[lane].append(int(value))
+            self.currentIndices[lanes] += 2
+
+        elif opcode in (5, 6):
+            condition = self._read(lanes, ip, modes, 0) != 0
+            if opcode == 6:
+                condition = ~condition
+
+            targets = self._read(lanes, ip, modes, 1)
+            self.currentIndices[lanes] = numpy.where(condition, targets, ip + 3).astype(numpy.int64)
+
+        elif opcode in (7, 8):
+            a = self._read(lanes, ip, modes, 0)
+            b = self._read(lanes, ip, modes, 1)
+            result = numpy.where((a < b) if opcode == 7 else (a == b), 1, 0)
+
+            self._write(lanes, ip, modes, 2, result.astype(self.memory.dtype))
+            self.currentIndices[lanes] += 4
+
+        elif opcode == 9:
+            self.relativeBases[lanes] += self._read(lanes, ip, modes, 0).astype(numpy.int64)
+            self.currentIndices[lanes] += 2
+
+        elif opcode == 99:
+            self.finished[lanes] = True
+
+        else:
+            raise EGCUnhandledOpcodeError(opcode, ip)
+
+    def step(self):
+        """
+        Executes one instruction for every instance that can run, grouped by instruction pointer and opcode
+
+        :return bool: False if no instance could run
+        """
+        size = self.memory.shape[1]
+        runnable = numpy.flatnonzero(~self.finished & ~self.blocked)
+        if len(runnable):
+            ips = self.currentIndices[runnable]
+            if ips.min() < 0:
+                raise IndexError("An instruction pointer ran outside of memory")
+            if ips.max() > size:
+                raise EGCOutOfRangeError(int(ips.max()), size)
+
+            # like the ElfGuidanceComputer, an instance that runs onto the end of its memory just stops
+            runnable = runnable[ips < size]
+
+        if not len(runnable):
+            return False
+
+        ips = self.currentIndices[runnable]
+
+        for ip in numpy.unique(ips):
+            atIp = runnable[ips == ip]
+            words = self.memory[atIp, ip]
+
+            # instances can rewrite their own code, so split on what's actually there
+            for word in numpy.unique(words):
+                lanes = atIp[words == word]
+                opcode, modes, _ = decodeInstruction(int(word), self.maxParams)
+                self._execute(lanes, int(ip), opcode, modes)
+                self.steps += 1
+
+        return True
+
+    def Run(self):
+        """
+        Runs every instance until it finishes, or blocks waiting for input
+        """
+        while self.step():
+            pass
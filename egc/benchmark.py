@@ -0,0 +1,372 @@
+"""
+Micro benchmarks for the Elf Guidance Computer
+
+Run with `python -m egc.benchmark`
+"""
+import itertools
+import time
+import timeit
+import tracemalloc
+
+from egc import batch, loader
+from egc.compiler import CompiledEngine
+from egc.computer import ElfGuidanceComputer, ExpandedMemoryBuffer
+from egc.fusion import FusedEngine
+from egc.memory import PagedMemory
+
+
+def _noop(self):
+    return 0
+
+
+# a computer whose handlers do no work, so timing a dispatch measures only the cost of reaching the handler
+_DispatchStub = type('_DispatchStub', (ElfGuidanceComputer,),
+                     {name: _noop for name in ElfGuidanceComputer._instructionSet.values()})
+
+
+def _chainDispatch(computer):
+    """
+    Reaches the handler the way _processCurrentCommand did before the dispatch table, decoding the instruction
+    and then making one comparison per opcode ahead of it in the chain
+    """
+    opcode, computer._parameterModes, _ = computer._decodeCurrentInstruction()
+
+    if opcode == 1:
+        return computer._add()
+    elif opcode == 2:
+        return computer._mul()
+    elif opcode == 3:
+        return computer._store()
+    elif opcode == 4:
+        return computer._output()
+    elif opcode == 5:
+        return computer._jumpIfTrue()
+    elif opcode == 6:
+        return computer._jumpIfFalse()
+    elif opcode == 7:
+        return computer._lessThan()
+    elif opcode == 8:
+        return computer._equals()
+    elif opcode == 9:
+        return computer._adjustRelativeBase()
+    elif opcode == 99:
+        return computer._complete()
+
+
+def benchmarkDispatch(number=200000):
+    """
+    Times reaching each opcode's handler, from decoding the instruction at the instruction pointer, through
+    the old if/elif chain and through the handler cached with the decoded instruction
+
+    :param int number: how many dispatches to time per opcode
+
+    :return dict: (chain seconds, table seconds) mapped to each opcode
+    """
+    results = {}
+    for opcode in sorted(ElfGuidanceComputer._instructionSet):
+        stub = _DispatchStub([opcode, 0, 0, 0])
+        chain = timeit.timeit(lambda: _chainDispatch(stub), number=number)
+        table = timeit.timeit(stub._processCurrentCommand, number=number)
+        results[opcode] = (chain, table)
+
+    return results
+
+
+def _timeRun(computer, compiled, stopCondition=None):
+    """
+    :return float: how many seconds it took to run the computer through the interpreter or the compiled engine
+    """
+    start = time.perf_counter()
+    if compiled:
+        CompiledEngine(computer).Run(stopCondition)
+    else:
+        while not computer.finished and not (stopCondition and stopCondition()):
+            computer.step()
+
+    return time.perf_counter() - start
+
+
+def _runDay05(compiled):
+    import day05
+
+    program = day05.DaySolver05().ProcessInput()
+
+    elapsed = 0.0
+    outputs = []
+    for value in (1, 5):
+        computer = ElfGuidanceComputer(list(program))
+        computer.input = value
+        elapsed += _timeRun(computer, compiled)
+        outputs.append(computer.output)
+
+    return elapsed, outputs
+
+
+def _runDay07(compiled):
+    import day07
+
+    program = day07.DaySolver07().ProcessInput()
+
+    elapsed = 0.0
+    outputs = []
+
+    # every phase order of the straight amplifier chain
+    best = 0
+    for phaseOrder in itertools.permutations(range(5)):
+        signal = 0
+        for ampID, phase in zip('abcde', phaseOrder):
+            computer = day07.Day07ElfGuidanceComputer(ampID, list(program))
+            computer.phase = phase
+            computer.input = signal
+            elapsed += _timeRun(computer, compiled)
+            signal = computer.output
+        best = max(best, signal)
+    outputs.append(best)
+
+    # and every phase order of the feedback loop
+    best = 0
+    for phaseOrder in itertools.permutations(range(5, 10)):
+        amplifiers = [day07.Day07ConcurrentComputer(ampID, list(program)) for ampID in 'abcde']
+        engines = [CompiledEngine(amplifier) for amplifier in amplifiers]
+        for amplifier, phase in zip(amplifiers, phaseOrder):
+            amplifier.queueOutputs = True
+            amplifier.inputChannel.append(phase)
+        amplifiers[0].inputChannel.append(0)
+
+        start = time.perf_counter()
+        while not all(amplifier.finished for amplifier in amplifiers):
+            for i, amplifier in enumerate(amplifiers):
+                if amplifier.finished:
+                    continue
+
+                # run until the amplifier has output a signal, or is waiting for one
+                blocked = lambda: amplifier.outputChannel or (not amplifier.inputChannel and
+                                                               amplifier.buffer[amplifier.currentIndex] % 100 == 3)
+                if compiled:
+                    engines[i].Run(blocked)
+                else:
+                    while not amplifier.finished and not blocked():
+                        amplifier.step()
+
+                amplifiers[(i + 1) % 5].inputChannel.extend(amplifier.outputChannel)
+                amplifier.outputChannel.clear()
+        elapsed += time.perf_counter() - start
+
+        best = max(best, amplifiers[-1].output)
+    outputs.append(best)
+
+    return elapsed, outputs
+
+
+def _runDay09(compiled):
+    import day09
+
+    program = day09.DaySolver09().ProcessInput()
+
+    elapsed = 0.0
+    outputs = []
+    for value in (1, 2):
+        computer = day09.Day09Computer(list(program))
+        computer.input = value
+        elapsed += _timeRun(computer, compiled)
+        outputs.append(computer.output)
+
+    return elapsed, outputs
+
+
+def benchmarkCompiler():
+    """
+    Runs both parts of the day05, day07 and day09 puzzle inputs through the interpreter and the compiled engine
+
+    :return dict: (interpreted seconds, compiled seconds) mapped to each day's name
+    """
+    results = {}
+    for name, runner in (('day05', _runDay05), ('day07', _runDay07), ('day09', _runDay09)):
+        interpreted, expected = runner(compiled=False)
+        compiled, outputs = runner(compiled=True)
+        if outputs != expected:
+            raise Exception("The compiled engine produced {} on {} instead of {}".format(outputs, name, expected))
+
+        results[name] = (interpreted, compiled)
+
+    return results
+
+
+def benchmarkMemory(size=100000, number=200000):
+    """
+    Compares the dict backed ExpandedMemoryBuffer with PagedMemory
+
+    :param int size: how many addresses to fill with a program
+    :param int number: how many reads and writes to time
+
+    :return dict: (bytes allocated, read seconds, write seconds) mapped to each memory class's name
+    """
+    program = list(range(size))
+
+    results = {}
+    for memoryClass in (ExpandedMemoryBuffer, PagedMemory):
+        tracemalloc.start()
+        memory = memoryClass(program)
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        addresses = [(i * 7919) % size for i in range(1000)]
+        read = timeit.timeit(lambda: [memory[address] for address in addresses], number=number // 1000)
+
+        def write():
+            for address in addresses:
+                memory[address] = address
+
+        written = timeit.timeit(write, number=number // 1000)
+
+        results[memoryClass.__name__] = (allocated, read, written)
+
+    return results
+
+
+def benchmarkBatch():
+    """
+    Runs the whole day02 noun/verb sweep one computer at a time, and as a single NumPy batch
+
+    :return tuple: (serial seconds, batched seconds)
+    """
+    import day02
+
+    program = day02.DaySolver02().ProcessInput()
+
+    start = time.perf_counter()
+    serial = []
+    for noun in range(100):
+        for verb in range(100):
+            computer = ElfGuidanceComputer(list(program), noun=noun, verb=verb)
+            computer.Run()
+            serial.append(computer.buffer[0])
+    serialTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    computer = batch.BatchComputer(program, 10000)
+    candidates = batch.numpy.arange(10000)
+    computer.memory[:, 1] = candidates // 100
+    computer.memory[:, 2] = candidates % 100
+    computer.Run()
+    batchTime = time.perf_counter() - start
+
+    if list(computer.memory[:, 0]) != serial:
+        raise Exception("The batch computer disagreed with the serial sweep")
+
+    return serialTime, batchTime
+
+
+def benchmarkFusion():
+    """
+    Runs the day05 and day09 puzzle inputs through the interpreter and the fused engine
+
+    :return dict: (instructions, dispatches saved, interpreted seconds, fused seconds) mapped to each run's name
+    """
+    import day05
+    import day09
+
+    runs = {'day05': (ElfGuidanceComputer, day05.DaySolver05().ProcessInput(), 5),
+            'day09': (day09.Day09Computer, day09.DaySolver09().ProcessInput(), 2)}
+
+    results = {}
+    for name, (computerClass, program, inputValue) in runs.items():
+        interpreted = computerClass(list(program))
+        interpreted.input = inputValue
+        start = time.perf_counter()
+        interpreted.Run()
+        interpretedTime = time.perf_counter() - start
+
+        fused = computerClass(list(program))
+        fused.input = inputValue
+        engine = FusedEngine(fused)
+        start = time.perf_counter()
+        engine.Run()
+        fusedTime = time.perf_counter() - start
+
+        if fused.output != interpreted.output:
+            raise Exception("The fused engine disagreed with the interpreter on {}".format(name))
+
+        results[name] = (fused.cycles, engine.dispatchesSaved, interpretedTime, fusedTime)
+
+    return results
+
+
+def benchmarkLoader(number=1000):
+    """
+    Loads the day09 puzzle input by parsing its text, from the template cache, and from the on-disk cache
+
+    :param int number: how many times to load the program each way
+
+    :return tuple: (parse seconds, template seconds, disk cache seconds)
+    """
+    import os
+    import tempfile
+
+    import day09
+
+    text = day09.DaySolver09().rawData
+    parseTime = timeit.timeit(lambda: list(loader.parseProgram(text)), number=number)
+
+    loader.programTemplate(text)
+    templateTime = timeit.timeit(lambda: loader.loadProgram(text), number=number)
+
+    cachePath = os.path.join(tempfile.mkdtemp(), 'day09.egcp')
+    loader.programTemplate(text, cachePath)
+
+    def loadFromDisk():
+        loader.clearTemplates()
+        loader.loadProgram(text, cachePath)
+
+    diskTime = timeit.timeit(loadFromDisk, number=number)
+    os.remove(cachePath)
+    os.rmdir(os.path.dirname(cachePath))
+
+    return parseTime, templateTime, diskTime
+
+
+def Main():
+    number = 200000
+    print("Dispatch cost per call, {} calls per opcode".format(number))
+    print("{:>6} {:>12} {:>12} {:>8}".format("opcode", "chain (ns)", "table (ns)", "speedup"))
+    for opcode, (chain, table) in benchmarkDispatch(number).items():
+        print("{:>6} {:>12.1f} {:>12.1f} {:>7.2f}x".format(opcode, chain / number * 1e9, table / number * 1e9,
+                                                          chain / table))
+
+    print()
+    print("Memory models holding a 100000 value program, 200000 reads and writes")
+    print("{:>20} {:>12} {:>10} {:>10}".format("memory", "size (KiB)", "read (s)", "write (s)"))
+    for name, (allocated, read, written) in benchmarkMemory().items():
+        print("{:>20} {:>12.1f} {:>10.3f} {:>10.3f}".format(name, allocated / 1024.0, read, written))
+
+    print()
+    print("Compiled engine against the interpreter on the puzzle inputs")
+    print("{:>6} {:>16} {:>14} {:>8}".format("input", "interpreted (s)", "compiled (s)", "speedup"))
+    for name, (interpreted, compiled) in benchmarkCompiler().items():
+        print("{:>6} {:>16.3f} {:>14.3f} {:>7.2f}x".format(name, interpreted, compiled, interpreted / compiled))
+
+    print()
+    print("Superinstruction fusion against the interpreter on the puzzle inputs")
+    print("{:>6} {:>13} {:>17} {:>16} {:>10} {:>8}".format("input", "instructions", "dispatches saved",
+                                                           "interpreted (s)", "fused (s)", "speedup"))
+    for name, (instructions, saved, interpreted, fused) in benchmarkFusion().items():
+        print("{:>6} {:>13} {:>17} {:>16.3f} {:>10.3f} {:>7.2f}x".format(name, instructions, saved, interpreted,
+                                                                         fused, interpreted / fused))
+
+    print()
+    number = 1000
+    parseTime, templateTime, diskTime = benchmarkLoader(number)
+    print("Loading the day09 program, {} loads".format(number))
+    print("{:>12} {:>15} {:>15}".format("parse (us)", "template (us)", "disk cache (us)"))
+    print("{:>12.1f} {:>15.1f} {:>15.1f}".format(parseTime / number * 1e6, templateTime / number * 1e6,
+                                                 diskTime / number * 1e6))
+
+    if batch.numpy is not None:
+        serial, batched = benchmarkBatch()
+        print()
+        print("day02 noun/verb sweep: {:.3f}s serial, {:.3f}s batched, {:.1f}x".format(serial, batched,
+                                                                                     serial / batched))
+
+
+if __name__ == '__main__':
+    Main()
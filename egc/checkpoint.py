@@ -0,0 +1,332 @@
+"""
+Checkpointing Elf Guidance Computers to disk, so long running programs can survive a restart
+
+A checkpoint holds a computer's class, memory and every other piece of its state, including its instruction
+pointer, relative base, cycle count, finished flag and pending input and output, in a compact binary format:
+
+    magic, computer class, state, memory
+
+Every integer is a zigzag varint. A list buffer is stored densely, paged memory only stores the pages that have
+been allocated, and an ExpandedMemoryBuffer stores each address it holds alongside its value. Decoded
+instructions, tracers and profilers aren't part of a checkpoint. A deadline is stored as the seconds it had left,
+and counts down again from when the checkpoint is loaded
+"""
+import collections
+import os
+import struct
+import time
+
+from egc.computer import ElfGuidanceComputer, EGCSnapshot, ExpandedMemoryBuffer
+from egc.encoding import encodeVarint, decodeVarint
+from egc.memory import PagedMemory
+
+
+CHECKPOINT_MAGIC = b'EGCK\x01'
+
+# type tags for the values in a computer's state
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_STR = 4
+_LIST = 5
+_TUPLE = 6
+_DEQUE = 7
+_DICT = 8
+_FLOAT = 9
+
+_DOUBLE = struct.Struct('<d')
+
+# memory layouts
+_DENSE = 0
+_PAGED = 1
+_SPARSE = 2
+
+
+class EGCCheckpointError(Exception):
+    """
+    Custom exception for raising when a computer can't be checkpointed, or a checkpoint can't be read
+    """
+
+
+def _encodeString(value, out):
+    data = value.encode('utf-8')
+    encodeVarint(len(data), out)
+    out.extend(data)
+
+
+def _decodeString(data, offset):
+    length, offset = decodeVarint(data, offset)
+    return bytes(data[offset:offset + length]).decode('utf-8'), offset + length
+
+
+def _encodeValue(value, out):
+    """
+    Appends a tagged encoding of a piece of computer state to a bytearray
+
+    :param value: None, a bool, int, float or str, or a list, tuple, deque or dict of them
+    :param bytearray out: where to append the encoded bytes
+    """
+    if value is None:
+        out.append(_NONE)
+    elif value is False:
+        out.append(_FALSE)
+    elif value is True:
+        out.append(_TRUE)
+    elif isinstance(value, int):
+        out.append(_INT)
+        encodeVarint(value, out)
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out.extend(_DOUBLE.pack(value))
+    elif isinstance(value, str):
+        out.append(_STR)
+        _encodeString(value, out)
+    elif isinstance(value, (list, tuple, collections.deque)):
+        out.append(_LIST if isinstance(value, list) else _TUPLE if isinstance(value, tuple) else _DEQUE)
+        encodeVarint(len(value), out)
+        for item in value:
+            _encodeValue(item, out)
+    elif isinstance(value, dict):
+        out.append(_DICT)
+        encodeVarint(len(value), out)
+        for key, item in value.items():
+            _encodeValue(key, out)
+            _encodeValue(item, out)
+    else:
+        raise EGCCheckpointError("Can't checkpoint a value of type {}".format(type(value).__name__))
+
+
+def _decodeValue(data, offset):
+    """
+    Reads one value written by _encodeValue
+
+    :return tuple: the decoded value, and the offset of the next value
+    """
+    tag = data[offset]
+    offset += 1
+
+    if tag == _NONE:
+        return None, offset
+    elif tag == _FALSE:
+        return False, offset
+    elif tag == _TRUE:
+        return True, offset
+    elif tag == _INT:
+        return decodeVarint(data, offset)
+    elif tag == _FLOAT:
+        return _DOUBLE.unpack_from(data, offset)[0], offset + _DOUBLE.size
+    elif tag == _STR:
+        return _decodeString(data, offset)
+    elif tag in (_LIST, _TUPLE, _DEQUE):
+        count, offset = decodeVarint(data, offset)
+        items = []
+        for _ in range(count):
+            item, offset = _decodeValue(data, offset)
+            items.append(item)
+
+        if tag == _TUPLE:
+            return tuple(items), offset
+        if tag == _DEQUE:
+            return collections.deque(items), offset
+        return items, offset
+    elif tag == _DICT:
+        count, offset = decodeVarint(data, offset)
+        items = {}
+        for _ in range(count):
+            key, offset = _decodeValue(data, offset)
+            items[key], offset = _decodeValue(data, offset)
+        return items, offset
+
+    raise EGCCheckpointError("Unknown value tag {} at offset {}".format(tag, offset - 1))
+
+
+def _encodeMemory(memory, out):
+    if isinstance(memory, list):
+        out.append(_DENSE)
+        encodeVarint(len(memory), out)
+        for value in memory:
+            encodeVarint(value, out)
+    elif isinstance(memory, PagedMemory):
+        out.append(_PAGED)
+        encodeVarint(memory.pageBits, out)
+        encodeVarint(len(memory), out)
+
+        pages = memory.pages()
+        encodeVarint(len(pages), out)
+        for index, page in pages:
+            encodeVarint(index, out)
+            for value in page:
+                encodeVarint(value, out)
+    elif isinstance(memory, ExpandedMemoryBuffer):
+        out.append(_SPARSE)
+        encodeVarint(len(memory), out)
+        for address, value in sorted(memory.items()):
+            encodeVarint(address, out)
+            encodeVarint(value, out)
+    else:
+        raise EGCCheckpointError("Can't checkpoint memory of type {}".format(type(memory).__name__))
+
+
+def _decodeMemory(data, offset):
+    layout = data[offset]
+    offset += 1
+
+    if layout == _DENSE:
+        length, offset = decodeVarint(data, offset)
+        memory = []
+        for _ in range(length):
+            value, offset = decodeVarint(data, offset)
+            memory.append(value)
+        return memory, offset
+
+    if layout == _PAGED:
+        pageBits, offset = decodeVarint(data, offset)
+        length, offset = decodeVarint(data, offset)
+        pageCount, offset = decodeVarint(data, offset)
+
+        pages = []
+        for _ in range(pageCount):
+            index, offset = decodeVarint(data, offset)
+            values = []
+            for _ in range(1 << pageBits):
+                value, offset = decodeVarint(data, offset)
+                values.append(value)
+            pages.append((index, values))
+
+        return PagedMemory.fromPages(pages, length, pageBits), offset
+
+    if layout == _SPARSE:
+        count, offset = decodeVarint(data, offset)
+        memory = ExpandedMemoryBuffer(())
+        for _ in range(count):
+            address, offset = decodeVarint(data, offset)
+            memory[address], offset = decodeVarint(data, offset)
+        return memory, offset
+
+    raise EGCCheckpointError("Unknown memory layout {}".format(layout))
+
+
+def encodeCheckpoint(computer):
+    """
+    :param ElfGuidanceComputer computer: the computer to checkpoint
+
+    :return bytearray: the computer's full state
+    """
+    out = bytearray(CHECKPOINT_MAGIC)
+
+    computerClass = type(computer)
+    _encodeString(computerClass.__module__, out)
+    _encodeString(computerClass.__qualname__, out)
+
+    state = {key: value for key, value in computer.__dict__.items() if key not in EGCSnapshot._excludedState}
+
+    # a monotonic deadline means nothing to another process, so keep the time it has left instead
+    if state.get('deadline') is not None:
+        state['deadline'] = max(state['deadline'] - time.monotonic(), 0.0)
+
+    _encodeValue(state, out)
+
+    _encodeMemory(computer.buffer, out)
+
+    return out
+
+
+def _findComputerClass(moduleName, className):
+    """
+    Looks the checkpointed class up among the Elf Guidance Computer classes that have already been defined,
+    so loading a checkpoint never imports anything it names
+
+    :param str moduleName: the module the class was defined in
+    :param str className: the class's qualified name
+
+    :return type: the class, or None if no Elf Guidance Computer class has that name
+    """
+    pending = [ElfGuidanceComputer]
+    seen = set()
+    while pending:
+        computerClass = pending.pop()
+        if computerClass in seen:
+            continue
+        seen.add(computerClass)
+
+        if computerClass.__module__ == moduleName and computerClass.__qualname__ == className:
+            return computerClass
+
+        pending.extend(computerClass.__subclasses__())
+
+    return None
+
+
+def decodeCheckpoint(data):
+    """
+    :param bytes data: a checkpoint made by encodeCheckpoint
+
+    :return ElfGuidanceComputer: a new computer of the checkpointed class, in the checkpointed state
+    """
+    if bytes(data[:len(CHECKPOINT_MAGIC)]) != CHECKPOINT_MAGIC:
+        raise EGCCheckpointError("Not an EGC checkpoint")
+
+    offset = len(CHECKPOINT_MAGIC)
+    moduleName, offset = _decodeString(data, offset)
+    className, offset = _decodeString(data, offset)
+
+    # the names come from the file, so only ever match them against classes that are already loaded
+    computerClass = _findComputerClass(moduleName, className)
+    if computerClass is None:
+        raise EGCCheckpointError("{}.{} isn't a loaded Elf Guidance Computer class".format(moduleName, className))
+
+    state, offset = _decodeValue(data, offset)
+    memory, offset = _decodeMemory(data, offset)
+
+    if state.get('deadline') is not None:
+        state['deadline'] += time.monotonic()
+
+    computer = computerClass.__new__(computerClass)
+    computer.__dict__.update(state)
+    computer.buffer = memory
+    computer._decodeCache = {}
+    computer.tracer = None
+    computer.profiler = None
+    computer.queueOutputs = False
+
+    return computer
+
+
+def saveCheckpoint(computer, path):
+    """
+    Write a computer's full state to disk. The previous checkpoint at the path is only replaced once the
+    new one has been completely written
+
+    :param ElfGuidanceComputer computer: the computer to checkpoint
+    :param str path: the file to write
+    """
+    temporaryPath = path + '.tmp'
+    with open(temporaryPath, 'wb') as fh:
+        fh.write(encodeCheckpoint(computer))
+
+    os.replace(temporaryPath, path)
+
+
+def loadCheckpoint(path):
+    """
+    :param str path: a file written by saveCheckpoint
+
+    :return ElfGuidanceComputer: the checkpointed computer, ready to carry on running where it left off
+    """
+    with open(path, 'rb') as fh:
+        return decodeCheckpoint(fh.read())
+
+
+def runWithCheckpoints(computer, path, interval):
+    """
+    Runs a computer until its program finishes, checkpointing it every interval instructions and once it's
+    finished. A computer loaded from the checkpoint can be passed straight back in to carry on after a restart
+
+    :param ElfGuidanceComputer computer: the computer to run
+    :param str path: the file to keep the latest checkpoint in
+    :param int interval: how many instructions to run between checkpoints
+    """
+    while not computer.finished and computer.currentIndex < len(computer.buffer):
+        computer.RunFor(interval)
+        saveCheckpoint(computer, path)
@@ -0,0 +1,389 @@
+"""
+An optional execution engine that compiles an Elf Guidance Computer's program into Python
+
+Each basic block of the program is translated into a generated Python function with its operands already
+resolved, so running it costs no decoding or dispatching. Anything the compiler doesn't understand, like input,
+output, halting or opcodes a subclass has overridden, falls back to the computer's own interpreter one
+instruction at a time, and any write landing on compiled code throws the affected blocks away so
+self-modifying programs still behave exactly like ElfGuidanceComputer.Run
+"""
+import collections
+
+from egc.computer import ElfGuidanceComputer, ParameterMode, EGCOutOfRangeError, decodeInstruction
+
+
+# methods the generated code stands in for, if a computer overrides any of these we can't compile it safely
+_MEMORY_METHODS = ('_getAddressForParameter', '_getValueForParameter', '_setValueForParameter', '_writeMemory')
+
+# the longest run of instructions we'll put in a single block
+MAX_BLOCK_LENGTH = 64
+
+# block marker for addresses the interpreter has to handle
+_INTERPRET = False
+
+# (block words, block function) pairs mapped to the opcodes they were allowed to compile and their start address,
+# shared by every engine so programs we run over and over again are only ever compiled once. Least recently used
+# first, so the blocks of programs we've stopped running are the first to go
+_compiledBlocks = collections.OrderedDict()
+
+# how many differently modified versions of a block we remember per address
+MAX_BLOCK_VERSIONS = 8
+
+# how many start addresses we remember compiled blocks for, across every program
+MAX_CACHED_BLOCKS = 4096
+
+# compilable opcodes mapped to each computer class
+_compilableOpcodes = {}
+
+
+class CompiledEngine(object):
+    """
+    Runs a computer's program as compiled basic blocks, falling back to its interpreter where needed
+    """
+    def __init__(self, computer):
+        """
+        :param ElfGuidanceComputer computer: the computer whose buffer and state we'll execute
+        """
+        self.computer = computer
+
+        # compiled block functions, or _INTERPRET, mapped to the address they start at
+        self._blocks = {}
+
+        # the starting addresses of every block covering an address, mapped to that address
+        self._codeMap = {}
+
+        # the addresses covered by each block, mapped to the address it starts at
+        self._blockAddresses = {}
+
+        computerClass = type(computer)
+        if computerClass not in _compilableOpcodes:
+            _compilableOpcodes[computerClass] = self._findCompilableOpcodes(computerClass)
+        self._compilableOpcodes = _compilableOpcodes[computerClass]
+
+        # statistics
+        self.blocksCompiled = 0
+        self.blocksInvalidated = 0
+        self.interpretedSteps = 0
+
+    @staticmethod
+    def _findCompilableOpcodes(computerClass):
+        """
+        :param type computerClass: the class of the computer we're compiling for
+
+        :return set: the opcodes whose behavior on this class is still the base computer's
+        """
+        for name in _MEMORY_METHODS:
+            if getattr(computerClass, name) is not getattr(ElfGuidanceComputer, name):
+                return set()
+
+        compilable = set()
+        for opcode in _EMITTERS:
+            name = computerClass._instructionSet.get(opcode)
+            if name is None or name != ElfGuidanceComputer._instructionSet[opcode]:
+                continue
+
+            if getattr(computerClass, name) is getattr(ElfGuidanceComputer, name):
+                compilable.add(opcode)
+
+        return compilable
+
+    def _compile(self, start):
+        """
+        Translate the basic block starting at the given address into a Python function
+
+        :param int start: the address of the first instruction in the block
+
+        :return func: the compiled block, or _INTERPRET if the first instruction can't be compiled
+        """
+        computer = self.computer
+        memory = computer.buffer
+
+        # reuse a block compiled by any engine, as long as the code in our memory is still the same
+        cacheKey = (frozenset(self._compilableOpcodes), computer.maxParams, start)
+        if cacheKey in _compiledBlocks:
+            _compiledBlocks.move_to_end(cacheKey)
+
+        for words, block in _compiledBlocks.get(cacheKey, ()):
+            try:
+                matches = _readWords(memory, start, start + len(words)) == words
+            except IndexError:
+                matches = False
+
+            if matches:
+                if block is _INTERPRET:
+                    self._blocks[start] = _INTERPRET
+                else:
+                    self._addBlock(start, start + len(words), block)
+                return block
+
+        lines = []
+        address = start
+        instructions = 0
+
+        # how many instructions have run when the block leaves early, mapped to where it leaves the pointer
+        exits = {}
+        while instructions < MAX_BLOCK_LENGTH:
+            try:
+                opcode, modes, length = decodeInstruction(memory[address], computer.maxParams,
+                                                          computer._instructionLengths)
+                if opcode not in self._compilableOpcodes or not _canCompileModes(computer, opcode, modes, length):
+                    break
+                parameters = [memory[address + 1 + i] for i in range(length - 1)]
+            except IndexError:
+                # leave running off the end of the buffer to the interpreter, which knows how to complain about it
+                break
+
+            operands = [_operand(mode, parameter) for mode, parameter in zip(modes, parameters)]
+
+            terminates = _EMITTERS[opcode](lines, address, address + length, modes, parameters, operands)
+            address += length
+            instructions += 1
+            exits[address] = instructions
+            if terminates:
+                break
+
+        versions = _compiledBlocks.setdefault(cacheKey, [])
+        if len(versions) >= MAX_BLOCK_VERSIONS:
+            versions.pop(0)
+        while len(_compiledBlocks) > MAX_CACHED_BLOCKS:
+            _compiledBlocks.popitem(last=False)
+
+        if not instructions:
+            # remember that the instruction here has to be interpreted, unless we're past the end of the buffer
+            try:
+                versions.append((_readWords(memory, start, start + 1), _INTERPRET))
+            except IndexError:
+                pass
+
+            self._blocks[start] = _INTERPRET
+            return _INTERPRET
+
+        if not lines or not lines[-1].startswith('    return'):
+            lines.append('    c.currentIndex = {}'.format(address))
+            lines.append('    c.relativeBase = rb')
+
+        source = '\n'.join(['def block(m, c, code, decoded):', '    rb = c.relativeBase'] + lines)
+        namespace = {}
+        exec(compile(source, '<egc block {}>'.format(start), 'exec'), namespace)
+        block = namespace['block']
+        block.instructions = instructions
+        block.exits = exits
+
+        versions.append((_readWords(memory, start, address), block))
+
+        self._addBlock(start, address, block)
+        self.blocksCompiled += 1
+
+        return block
+
+    def _addBlock(self, start, end, block):
+        """
+        Start using a compiled block for the given address range
+
+        :param int start: the address of the block's first instruction
+        :param int end: the address just past the block's last instruction
+        :param func block: the compiled block
+        """
+        self._blocks[start] = block
+        self._blockAddresses[start] = range(start, end)
+        for covered in range(start, end):
+            self._codeMap.setdefault(covered, set()).add(start)
+
+    def _invalidate(self, address):
+        """
+        Throw away every compiled block covering an address that was just written to
+
+        :param int address: the address written to
+        """
+        self.computer._decodeCache.pop(address, None)
+
+        for start in self._codeMap.pop(address, ()):
+            self._blocks.pop(start, None)
+            for covered in self._blockAddresses.pop(start):
+                if covered != address:
+                    self._codeMap[covered].discard(start)
+                    if not self._codeMap[covered]:
+                        del self._codeMap[covered]
+
+            self.blocksInvalidated += 1
+
+    def _interpret(self):
+        """
+        Run the single instruction at the instruction pointer through the computer's own interpreter,
+        throwing away any compiled code it writes over
+        """
+        computer = self.computer
+        self.interpretedSteps += 1
+
+        opcode, computer._parameterModes, _ = computer._decodeCurrentInstruction()
+        writes = computer._instructionWrites.get(opcode)
+
+        target = None
+        if writes is not None and self._codeMap and computer._parameterModes[writes] != ParameterMode.Immediate:
+            target = computer._getAddressForParameter(writes)
+
+        computer.step()
+
+        if target in self._codeMap:
+            self._invalidate(target)
+
+    def Run(self, stopCondition=None):
+        """
+        Runs the program in the computer's buffer from its current instruction pointer until it finishes,
+        the same way ElfGuidanceComputer.Run does
+
+        :param func stopCondition: optional callable checked between blocks, we stop early once it returns True
+        """
+        computer = self.computer
+
+        # a traced or profiled computer wants to see every instruction, so let the interpreter have it
+        interpretOnly = computer.tracer is not None or computer.profiler is not None
+
+        blocks = self._blocks
+        codeMap = self._codeMap
+        decodeCache = computer._decodeCache
+
+        nextCheck = computer.cycles
+        while not computer.finished and computer.currentIndex < len(computer.buffer):
+            if stopCondition is not None and stopCondition():
+                return
+
+            if computer.cycles >= nextCheck:
+                nextCheck = computer._nextBudgetCheck()
+
+            if interpretOnly:
+                computer.step()
+                computer.cycles += 1
+                continue
+
+            block = blocks.get(computer.currentIndex)
+            if block is None:
+                block = self._compile(computer.currentIndex)
+
+            # a whole block mustn't take us past our budget, so finish up to it one instruction at a time
+            if block is _INTERPRET or nextCheck - computer.cycles < block.instructions:
+                self._interpret()
+                computer.cycles += 1
+                continue
+
+            written = block(computer.buffer, computer, codeMap, decodeCache)
+            if written is None:
+                computer.cycles += block.instructions
+            else:
+                # the block stopped straight after the instruction that wrote over code
+                computer.cycles += block.exits[computer.currentIndex]
+                self._invalidate(written)
+
+        if computer.currentIndex > len(computer.buffer) and not computer.finished:
+            raise EGCOutOfRangeError(computer.currentIndex, len(computer.buffer))
+
+
+def _readWords(memory, start, end):
+    """
+    :return tuple: the values stored in memory between the start and end addresses
+    """
+    if isinstance(memory, list):
+        if end > len(memory):
+            raise IndexError("Block runs past the end of the buffer")
+        return tuple(memory[start:end])
+
+    return tuple(memory[address] for address in range(start, end))
+
+
+def _canCompileModes(computer, opcode, modes, length):
+    """
+    :return bool: False if the instruction uses parameter modes that the interpreter has to reject,
+                  like an unknown mode or an immediate mode write
+    """
+    for mode in modes[:length - 1]:
+        if mode not in (ParameterMode.Position, ParameterMode.Immediate, ParameterMode.Relative):
+            return False
+
+    writes = computer._instructionWrites.get(opcode)
+    if writes is not None and modes[writes] == ParameterMode.Immediate:
+        return False
+
+    return True
+
+
+def _operand(mode, parameter):
+    """
+    :param int mode: the parameter's mode
+    :param int parameter: the raw parameter value from the buffer
+
+    :return str: a Python expression reading the parameter's value in a generated block
+    """
+    if mode == ParameterMode.Position:
+        return 'm[{}]'.format(parameter)
+    elif mode == ParameterMode.Immediate:
+        return '({})'.format(parameter)
+    elif mode == ParameterMode.Relative:
+        return 'm[rb + {}]'.format(parameter)
+
+    raise ValueError("Unexpected parameter mode {}".format(mode))
+
+
+def _emitWrite(lines, modes, parameters, position, expression, nextAddress):
+    """
+    Emit the code storing an expression through a parameter, bailing out of the block if the write lands
+    on an address holding compiled or decoded code
+
+    :return bool: False, since a write never ends its block
+    """
+    if modes[position] == ParameterMode.Relative:
+        target = 'rb + {}'.format(parameters[position])
+    else:
+        target = '{}'.format(parameters[position])
+
+    lines.append('    a = {}'.format(target))
+    lines.append('    m[a] = {}'.format(expression))
+    lines.append('    if a in code or a in decoded:')
+    lines.append('        c.currentIndex = {}'.format(nextAddress))
+    lines.append('        c.relativeBase = rb')
+    lines.append('        return a')
+
+    return False
+
+
+def _emitArithmetic(operator):
+    def emit(lines, address, nextAddress, modes, parameters, operands):
+        return _emitWrite(lines, modes, parameters, 2, '{} {} {}'.format(operands[0], operator, operands[1]),
+                          nextAddress)
+
+    return emit
+
+
+def _emitComparison(operator):
+    def emit(lines, address, nextAddress, modes, parameters, operands):
+        return _emitWrite(lines, modes, parameters, 2,
+                          '1 if {} {} {} else 0'.format(operands[0], operator, operands[1]), nextAddress)
+
+    return emit
+
+
+def _emitJump(condition):
+    def emit(lines, address, nextAddress, modes, parameters, operands):
+        lines.append('    if {} {} 0:'.format(operands[0], condition))
+        lines.append('        c.currentIndex = {}'.format(operands[1]))
+        lines.append('    else:')
+        lines.append('        c.currentIndex = {}'.format(nextAddress))
+        lines.append('    c.relativeBase = rb')
+        lines.append('    return None')
+        return True
+
+    return emit
+
+
+def _emitAdjustRelativeBase(lines, address, nextAddress, modes, parameters, operands):
+    lines.append('    rb += {}'.format(operands[0]))
+    return False
+
+
+# code generators for each opcode we can compile, each returns True if the instruction ends its block
+_EMITTERS = {1: _emitArithmetic('+'),
+             2: _emitArithmetic('*'),
+             5: _emitJump('!='),
+             6: _emitJump('=='),
+             7: _emitComparison('<'),
+             8: _emitComparison('=='),
+             9: _emitAdjustRelativeBase}
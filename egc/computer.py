@@ -2,6 +2,10 @@
 Stores all the classes and functions we need to create a working Elf Guidance Computer
 """
 import collections
+import copy
+import time
+
+from egc.memory import PagedMemory
 
 
 class ParameterMode(object):
@@ -44,10 +48,138 @@ class EGCOutOfRangeError(Exception):
             "Attempted to access index {}, which is beyond the buffer size {}".format(index, bufferLength))
 
 
+class _AwaitingInput(object):
+    """
+    Yielded by ElfGuidanceComputer.Execute when the program needs an input it hasn't been given yet
+    """
+    def __repr__(self):
+        return 'AwaitingInput'
+
+
+AwaitingInput = _AwaitingInput()
+
+# the opcode that reads an input, which Execute has to be able to supply before it runs
+INPUT_OPCODE = 3
+
+# how many instructions we run between checks of a computer's deadline
+BUDGET_CHECK_INTERVAL = 4096
+
+
+class EGCBudgetExceeded(Exception):
+    """
+    Custom exception for raising when a computer runs out of its step budget or passes its deadline
+    before its program finishes
+    """
+    def __init__(self, position, cycles):
+        super(EGCBudgetExceeded, self).__init__(
+            "Ran out of budget at position {} after {} instructions".format(position, cycles))
+        self.position = position
+        self.cycles = cycles
+
+
+DecodedInstruction = collections.namedtuple('DecodedInstruction', ['opcode', 'modes', 'length'])
+
+
+class _CachedInstruction(DecodedInstruction):
+    """
+    A decoded instruction in a computer's decode cache, which also keeps the function that handles it, or None
+    if the computer doesn't handle it, so running a cached instruction doesn't need to look its handler up
+    """
+
+
+def decodeInstruction(value, maxParams=5, lengths=None):
+    """
+    Splits a raw opcode value into its instruction, parameter modes and length
+
+    :param int value: the raw value stored at the instruction pointer, eg 1002
+    :param int maxParams: the maximum number of digits an opcode value can have
+    :param dict lengths: instruction lengths mapped to their opcodes, defaults to the base computer's instruction set
+
+    :return DecodedInstruction: the instruction (eg 2), its parameter modes in parameter order (eg (0, 1, 0))
+                                and the number of addresses it occupies, or None if the instruction is unknown
+    """
+    if lengths is None:
+        lengths = ElfGuidanceComputer._instructionLengths
+
+    modeCount = maxParams - 2
+
+    # negative values can never be valid, so let them fall through to the unhandled opcode error
+    if value < 0:
+        return DecodedInstruction(value, (ParameterMode.Position,) * modeCount, None)
+
+    opcode = value % 100
+    modeWord = value // 100
+
+    modes = []
+    for _ in range(modeCount):
+        modes.append(modeWord % 10)
+        modeWord //= 10
+
+    return DecodedInstruction(opcode, tuple(modes), lengths.get(opcode))
+
+
+def instruction(opcode, length, writes=None):
+    """
+    Registers the decorated method as the handler for an opcode on the computer class it's defined in.
+    Subclasses inherit every registered handler, and can override one either by overriding the method
+    itself or by registering a differently named method for the same opcode
+
+    :param int opcode: the opcode handled by the method, eg 1
+    :param int length: the number of addresses, including the opcode, the instruction occupies
+    :param int writes: the position of the parameter the instruction writes to, if any
+
+    :return func: the decorator
+    """
+    def decorator(func):
+        func._egcOpcode = opcode
+        func._egcLength = length
+        func._egcWrites = writes
+        return func
+
+    return decorator
+
+
 class ElfGuidanceComputer(object):
     """
     Base class for an Elf Guidance Computer based off the day02 intcode processor
     """
+    # handler method names, handler functions, instruction lengths and written parameters mapped to their
+    # opcodes, built once per class
+    _instructionSet = {}
+    _instructionHandlers = {}
+    _instructionLengths = {}
+    _instructionWrites = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super(ElfGuidanceComputer, cls).__init_subclass__(**kwargs)
+        cls._registerInstructions()
+
+    @classmethod
+    def _registerInstructions(cls):
+        """
+        Build this class's instruction set from its parent's, plus every handler registered with @instruction
+        in the class body
+        """
+        instructionSet = {}
+        instructionLengths = {}
+        instructionWrites = {}
+        for base in reversed(cls.__mro__[1:]):
+            instructionSet.update(base.__dict__.get('_instructionSet', {}))
+            instructionLengths.update(base.__dict__.get('_instructionLengths', {}))
+            instructionWrites.update(base.__dict__.get('_instructionWrites', {}))
+
+        for name, member in cls.__dict__.items():
+            opcode = getattr(member, '_egcOpcode', None)
+            if opcode is not None:
+                instructionSet[opcode] = name
+                instructionLengths[opcode] = member._egcLength
+                instructionWrites[opcode] = member._egcWrites
+
+        cls._instructionSet = instructionSet
+        cls._instructionHandlers = {opcode: getattr(cls, name) for opcode, name in instructionSet.items()}
+        cls._instructionLengths = instructionLengths
+        cls._instructionWrites = instructionWrites
+
     def __init__(self, intBuffer, noun=None, verb=None):
         """
         :param list[int] intBuffer: The processed list of integers to use as our command and data buffer
@@ -56,55 +188,75 @@ class ElfGuidanceComputer(object):
         """
         self.buffer = intBuffer
 
-        self.buffer[1] = noun or intBuffer[1]
-        self.buffer[2] = verb or intBuffer[2]
+        if noun is not None:
+            self.buffer[1] = noun
+        if verb is not None:
+            self.buffer[2] = verb
+
+        # the maximum number of parameters for which we need to account
+        self.maxParams = 5
 
         # state information
-        self._parameterModes = []
+        self._parameterModes = (ParameterMode.Position,) * (self.maxParams - 2)
         self.currentIndex = 0
         self.finished = False
 
+        # how many instructions we've executed, and the budget we have to finish in, see SetBudget
+        self.cycles = 0
+        self.maxCycles = None
+        self.deadline = None
+
+        # decoded instructions, keyed by the address of their opcode
+        self._decodeCache = {}
+
         # initialize the input and output buffers
         self.input = None
         self.output = None
 
-        # the maximum number of parameters for which we need to account
-        self.maxParams = 5
+        # queued inputs, read before the input buffer, and the values the program has output while queueOutputs
+        # is set, which Execute sets while it's running the program
+        self.inputChannel = collections.deque()
+        self.outputChannel = collections.deque()
+        self.queueOutputs = False
 
         self.relativeBase = 0
 
-    def _getValueForParameter(self, paramPosition):
+        # see SetTracer and SetProfiler
+        self.tracer = None
+        self.profiler = None
+
+    def _getAddressForParameter(self, paramPosition):
         """
-        Retrieves the value desired based on the instruction pointer
+        Resolves the address a parameter refers to based on the instruction pointer
         and parameter mode for the given instruction
 
         :param int paramPosition: Where in the arg list to look for modes
 
-        :return int: the value needed based on the parameter mode and position
+        :return int: the address the parameter reads from or writes to
         """
         mode = self._parameterModes[paramPosition]
+        parameterAddress = self.currentIndex + 1 + paramPosition
 
         if mode == ParameterMode.Position:
-            positionValue = self.currentIndex + 1 + paramPosition
-            accessPosition = self.buffer[positionValue]
-            outValue = self.buffer[accessPosition]
-            print("Get/Position", positionValue, accessPosition, outValue)
-            return outValue
+            return self.buffer[parameterAddress]
         elif mode == ParameterMode.Immediate:
-            accessPosition = self.currentIndex + 1 + paramPosition
-            outValue = self.buffer[accessPosition]
-            print("Get/Immediate", accessPosition, outValue)
-            return outValue
+            return parameterAddress
         elif mode == ParameterMode.Relative:
-            relativePosition = self.currentIndex + 1 + paramPosition
-            relativeParameter = self.buffer[relativePosition]
-            accessPosition = self.relativeBase + relativeParameter
-            outValue = self.buffer[accessPosition]
-            print("Get/Relative", relativeParameter, self.relativeBase, accessPosition, outValue)
-            return outValue
+            return self.relativeBase + self.buffer[parameterAddress]
 
         raise EGCUnexpectedParameterMode(mode, self.currentIndex)
 
+    def _getValueForParameter(self, paramPosition):
+        """
+        Retrieves the value desired based on the instruction pointer
+        and parameter mode for the given instruction
+
+        :param int paramPosition: Where in the arg list to look for modes
+
+        :return int: the value needed based on the parameter mode and position
+        """
+        return self.buffer[self._getAddressForParameter(paramPosition)]
+
     def _setValueForParameter(self, paramPosition, value):
         """
         Stores the value desired based on the instruction pointer
@@ -112,23 +264,48 @@ class ElfGuidanceComputer(object):
 
         :param int paramPosition: Where in the arg list to look for modes
         """
-        mode = self._parameterModes[paramPosition]
-        if mode == ParameterMode.Position:
-            positionValue = self.currentIndex + 1 + paramPosition
-            accessPosition = self.buffer[positionValue]
-            print("Set/Position", positionValue, accessPosition, value)
-            self.buffer[self.buffer[self.currentIndex + paramPosition + 1]] = value
         # bail out if our param mode for storage is Immediate
-        elif mode == ParameterMode.Immediate:
+        if self._parameterModes[paramPosition] == ParameterMode.Immediate:
             raise EGCAccessViolation(self._parameterModes, self.currentIndex)
-        elif mode == ParameterMode.Relative:
-            relativePosition = self.currentIndex + 1 + paramPosition
-            relativeParameter = self.buffer[relativePosition]
-            accessPosition = self.relativeBase + relativeParameter
-            print("Set/Relative", value, relativeParameter, self.relativeBase, accessPosition)
 
-            self.buffer[accessPosition] = value
+        self._writeMemory(self._getAddressForParameter(paramPosition), value)
 
+    def _writeMemory(self, address, value):
+        """
+        Stores the value at the given address, dropping any decoded instruction cached there
+        so that self-modifying programs still execute what's actually in memory
+
+        :param int address: the address to write to
+        :param int value: the value to store
+        """
+        self.buffer[address] = value
+
+        if address in self._decodeCache:
+            del self._decodeCache[address]
+
+    def InvalidateDecodeCache(self):
+        """
+        Forget every decoded instruction. Call this after modifying the buffer from outside of the computer
+        """
+        self._decodeCache.clear()
+
+    def _decodeCurrentInstruction(self):
+        """
+        Looks up the decoded instruction at the instruction pointer, decoding and caching it if needed
+
+        :return DecodedInstruction: the decoded instruction at the current index
+        """
+        decoded = self._decodeCache.get(self.currentIndex)
+
+        if decoded is None:
+            decoded = _CachedInstruction(*decodeInstruction(self.buffer[self.currentIndex], self.maxParams,
+                                                            self._instructionLengths))
+            decoded.handler = self._instructionHandlers.get(decoded.opcode)
+            self._decodeCache[self.currentIndex] = decoded
+
+        return decoded
+
+    @instruction(1, 4, writes=2)
     def _add(self):
         """
         Uses the computer's current position to add two numbers together and store the result
@@ -139,12 +316,11 @@ class ElfGuidanceComputer(object):
         a = self._getValueForParameter(0)
         b = self._getValueForParameter(1)
 
-        print("Adding", a, b)
-
         self._setValueForParameter(2, a + b)
 
         return 4
 
+    @instruction(2, 4, writes=2)
     def _mul(self):
         """
         Uses the computer's current position to multiply two numbers together and store the result
@@ -155,41 +331,45 @@ class ElfGuidanceComputer(object):
         a = self._getValueForParameter(0)
         b = self._getValueForParameter(1)
 
-        print("Multiply", a, b)
-
         self._setValueForParameter(2, a * b)
 
         return 4
 
+    @instruction(3, 2, writes=0)
     def _store(self):
         """
         Stores the result of the computer's GetInput function and stores its value at the position specified
 
         :returns int: The number of parameters used in the instruction
         """
-        print("Store")
-
         self._setValueForParameter(0, self.GetInput())
 
         return 2
 
     def GetInput(self):
         """
-        Customizable input behavior based on the needs of the computer. By default, returns the value
-        stored in the computer's input buffer
+        Customizable input behavior based on the needs of the computer. By default, returns the next value
+        queued in the input channel, or the value stored in the computer's input buffer if nothing is queued
 
-        :return: The value stored in the input buffer of the computer
+        :return: The next input value
         """
+        if self.inputChannel:
+            return self.inputChannel.popleft()
+
         return self.input
 
+    @instruction(4, 2)
     def _output(self):
         """
-        Calls the computer's Output function with the value deteremind by the opcodes parameter modes
+        Calls the computer's Output function with the value deteremind by the opcodes parameter modes,
+        and queues the value in the output channel if queueOutputs is set
 
         :returns int: The number of parameters used in the instruction
         """
-        print("Output")
-        self.Output(self._getValueForParameter(0))
+        value = self._getValueForParameter(0)
+        if self.queueOutputs:
+            self.outputChannel.append(value)
+        self.Output(value)
 
         return 2
 
@@ -201,6 +381,7 @@ class ElfGuidanceComputer(object):
         """
         self.output = value
 
+    @instruction(5, 3)
     def _jumpIfTrue(self):
         """
         if the value of the first parameter is non-zero,
@@ -214,14 +395,13 @@ class ElfGuidanceComputer(object):
         a = self._getValueForParameter(0)
         b = self._getValueForParameter(1)
 
-        print("Jit", a, b)
-
         if a != 0:
             self.currentIndex = b
             return 0
 
         return 3
 
+    @instruction(6, 3)
     def _jumpIfFalse(self):
         """
         If the value of the first parameter is 0
@@ -236,14 +416,13 @@ class ElfGuidanceComputer(object):
         a = self._getValueForParameter(0)
         b = self._getValueForParameter(1)
 
-        print("Jif", a, b)
-
         if a == 0:
             self.currentIndex = b
             return 0
 
         return 3
 
+    @instruction(7, 4, writes=2)
     def _lessThan(self):
         """
         if the first parameter is less than the second parameter,
@@ -257,12 +436,11 @@ class ElfGuidanceComputer(object):
 
         c = 1 if a < b else 0
 
-        print("LessThan", a, b, c)
-
         self._setValueForParameter(2, c)
 
         return 4
 
+    @instruction(8, 4, writes=2)
     def _equals(self):
         """
         if the first parameter is equal to the second parameter,
@@ -278,12 +456,11 @@ class ElfGuidanceComputer(object):
 
         c = 1 if a == b else 0
 
-        print("Equals", a, b, c)
-
         self._setValueForParameter(2, c)
 
         return 4
 
+    @instruction(9, 2)
     def _adjustRelativeBase(self):
         """
         Gets the value at the instruction's first parameter
@@ -292,11 +469,11 @@ class ElfGuidanceComputer(object):
         :returns int: The number of parameters used in the instruction
         """
         offset = self._getValueForParameter(0)
-        print("AdjustRelativeBase", offset)
 
         self.relativeBase += offset
         return 2
 
+    @instruction(99, 1)
     def _complete(self):
         """
         Flips the "finished" bit
@@ -311,38 +488,124 @@ class ElfGuidanceComputer(object):
         Gets the current index and figures out what to do with the opcode at that index
         :return int: by how many addressess to advance the instruction pointer
         """
-        # convert our opcode to a string so we can parse it and figure out what to do with it
-        opcode = str(self.buffer[self.currentIndex]).zfill(self.maxParams)
-
-        print(opcode)
-
-        instruction = int(opcode[-2:])
-
-        # populate a state list of the parameter modes our functions may need
-        self._parameterModes = [int(i) for i in opcode[:-2]][::-1]
-
-        if instruction == 1:
-            return self._add()
-        elif instruction == 2:
-            return self._mul()
-        elif instruction == 3:
-            return self._store()
-        elif instruction == 4:
-            return self._output()
-        elif instruction == 5:
-            return self._jumpIfTrue()
-        elif instruction == 6:
-            return self._jumpIfFalse()
-        elif instruction == 7:
-            return self._lessThan()
-        elif instruction == 8:
-            return self._equals()
-        elif instruction == 9:
-            return self._adjustRelativeBase()
-        elif instruction == 99:
-            return self._complete()
-
-        raise EGCUnhandledOpcodeError(opcode, self.currentIndex)
+        decoded = self._decodeCurrentInstruction()
+        self._parameterModes = decoded.modes
+
+        # the handler was looked up when the instruction was decoded, so a cached instruction runs straight away
+        handler = decoded.handler
+        if handler is not None:
+            return handler(self)
+
+        raise EGCUnhandledOpcodeError(self.buffer[self.currentIndex], self.currentIndex)
+
+    def SetTracer(self, tracer):
+        """
+        Starts recording every instruction this computer executes into the given tracer, or stops tracing
+        if tracer is None. When no tracer is set, the computer runs its regular, untraced command processing
+
+        :param egc.trace.Tracer tracer: where to record the trace, eg a RingBufferTracer
+        """
+        self.tracer = tracer
+        self._shadowCommandProcessor()
+
+    def SetProfiler(self, profiler):
+        """
+        Starts counting and timing every instruction this computer executes with the given profiler, or stops
+        profiling if profiler is None. Like tracing, an unprofiled computer pays nothing for this
+
+        :param egc.profiler.Profiler profiler: where to record the profile
+        """
+        self.profiler = profiler
+        if profiler is not None:
+            profiler.instructionNames.update(self._instructionSet)
+
+        self._shadowCommandProcessor()
+
+    def _shadowCommandProcessor(self):
+        """
+        Shadow the command processor on this instance only while tracing or profiling,
+        so the regular path doesn't even need to check for a tracer or profiler
+        """
+        if self.profiler is not None:
+            self._processCurrentCommand = self._profiledProcessCurrentCommand
+        elif self.tracer is not None:
+            self._processCurrentCommand = self._tracedProcessCurrentCommand
+        else:
+            self.__dict__.pop('_processCurrentCommand', None)
+
+    def _traceCurrentCommand(self):
+        """
+        Records the current instruction, with its operands resolved, to our tracer
+        """
+        opcode, self._parameterModes, length = self._decodeCurrentInstruction()
+        writes = self._instructionWrites.get(opcode)
+
+        operands = []
+        target = None
+        for paramPosition in range((length or 1) - 1):
+            if paramPosition == writes:
+                target = self._getAddressForParameter(paramPosition)
+            else:
+                operands.append(self._getValueForParameter(paramPosition))
+
+        self.tracer.Record(self.currentIndex, opcode, self._parameterModes, tuple(operands), target)
+
+    def _tracedProcessCurrentCommand(self):
+        """
+        Records the current instruction to our tracer before processing it
+
+        :return int: by how many addressess to advance the instruction pointer
+        """
+        self._traceCurrentCommand()
+
+        return type(self)._processCurrentCommand(self)
+
+    def _profiledProcessCurrentCommand(self):
+        """
+        Processes the current instruction, recording it and how long it took to our profiler,
+        and to our tracer if we have one
+
+        :return int: by how many addressess to advance the instruction pointer
+        """
+        if self.tracer is not None:
+            self._traceCurrentCommand()
+
+        ip = self.currentIndex
+        opcode, modes, length = self._decodeCurrentInstruction()
+
+        start = time.perf_counter()
+        advance = type(self)._processCurrentCommand(self)
+        self.profiler.Record(ip, opcode, modes[:(length or 1) - 1], time.perf_counter() - start)
+
+        return advance
+
+    def Snapshot(self):
+        """
+        Capture the full state of this computer, so any number of computers can later be forked from this
+        exact point without reloading the program
+
+        :return EGCSnapshot: the captured state
+        """
+        return EGCSnapshot(self)
+
+    def Restore(self, snapshot):
+        """
+        Rewind this computer to a snapshot taken from a computer of the same class
+
+        :param EGCSnapshot snapshot: the state to return to
+        """
+        if not isinstance(self, snapshot.computerClass):
+            raise TypeError("Cannot restore a {} snapshot into a {}".format(snapshot.computerClass.__name__,
+                                                                            type(self).__name__))
+
+        snapshot.ApplyTo(self)
+
+    def Fork(self):
+        """
+        :return ElfGuidanceComputer: a new, independent computer in exactly the same state as this one,
+                                     sharing its memory copy on write
+        """
+        return self.Snapshot().CreateComputer()
 
     def step(self):
         """
@@ -353,17 +616,189 @@ class ElfGuidanceComputer(object):
         output = self._processCurrentCommand()
         self.currentIndex = self.currentIndex + output
 
-    def Run(self):
+    def SetBudget(self, maxCycles=None, seconds=None):
         """
-        Runs the entire program in the buffer, starting at position 0
+        Limit how long the program is allowed to run, after which running it raises an EGCBudgetExceeded.
+        Passing None for both removes the budget
+
+        :param int maxCycles: the total number of instructions the computer may execute, counting the ones
+                              it has already executed
+        :param float seconds: how many seconds from now the computer may keep running for
         """
+        self.maxCycles = maxCycles
+        self.deadline = None if seconds is None else time.monotonic() + seconds
+
+    def _nextBudgetCheck(self):
+        """
+        Make sure we're still within budget before executing another instruction
+
+        :return int: the cycle count at which we have to check our budget again
+        """
+        if self.maxCycles is not None and self.cycles >= self.maxCycles:
+            raise EGCBudgetExceeded(self.currentIndex, self.cycles)
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise EGCBudgetExceeded(self.currentIndex, self.cycles)
+
+        nextCheck = self.cycles + BUDGET_CHECK_INTERVAL
+        if self.maxCycles is not None:
+            nextCheck = min(nextCheck, self.maxCycles)
+
+        return nextCheck
+
+    def RunFor(self, instructions=None):
+        """
+        Runs the program from the current instruction pointer for at most the given number of instructions,
+        so a scheduler can share time between many computers. Call it again to carry on where it left off
+
+        :param int instructions: the most instructions to execute, or None to run until the program finishes
+
+        :return int: how many instructions were executed
+        """
+        start = self.cycles
+        end = None if instructions is None else start + instructions
+
         while not self.finished and self.currentIndex < len(self.buffer):
-            self.step()
+            if end is not None and self.cycles >= end:
+                break
+
+            nextCheck = self._nextBudgetCheck()
+            if end is not None:
+                nextCheck = min(nextCheck, end)
+
+            # count in a local, the hot loop shouldn't pay for updating an attribute every instruction
+            executed = 0
+            count = nextCheck - self.cycles
+            try:
+                while executed < count and not self.finished and self.currentIndex < len(self.buffer):
+                    self.step()
+                    executed += 1
+            finally:
+                self.cycles += executed
+
+        if self.currentIndex > len(self.buffer) and not self.finished:
+            raise EGCOutOfRangeError(self.currentIndex, len(self.buffer))
+
+        return self.cycles - start
+
+    def Run(self):
+        """
+        Runs the entire program in the buffer, from the current instruction pointer until it finishes
+        """
+        self.RunFor()
+
+    def Execute(self):
+        """
+        Runs the program as a generator, which yields every value the program outputs, and yields AwaitingInput
+        whenever the program wants an input and nothing is queued in the input channel. The program stays paused
+        on that instruction until an input is given with send(), and a value sent in reply to an output is queued
+        for later. The generator stops once the program finishes, so with every input queued up front the
+        outputs are just list(computer.Execute()). Like Run, it raises an EGCBudgetExceeded if the program
+        runs out of its budget
+
+        :return generator: the program's outputs, and AwaitingInput
+        """
+        inputChannel = self.inputChannel
+        outputChannel = self.outputChannel
+
+        queueOutputs = self.queueOutputs
+        self.queueOutputs = True
+        try:
+            nextCheck = self.cycles
+            while not self.finished and self.currentIndex < len(self.buffer):
+                if self.cycles >= nextCheck:
+                    nextCheck = self._nextBudgetCheck()
+
+                # pause before the instruction runs, so resuming doesn't have to decode or run it again
+                if not inputChannel and self._decodeCurrentInstruction().opcode == INPUT_OPCODE:
+                    value = yield AwaitingInput
+                    while value is None:
+                        value = yield AwaitingInput
+                    inputChannel.append(value)
+
+                self.step()
+                self.cycles += 1
+
+                while outputChannel:
+                    value = yield outputChannel.popleft()
+                    if value is not None:
+                        inputChannel.append(value)
+        finally:
+            self.queueOutputs = queueOutputs
 
         if self.currentIndex > len(self.buffer) and not self.finished:
             raise EGCOutOfRangeError(self.currentIndex, len(self.buffer))
 
 
+ElfGuidanceComputer._registerInstructions()
+
+
+class EGCSnapshot(object):
+    """
+    The captured state of a computer: its memory, its instruction pointer, relative base and every other piece
+    of state, including its input and output buffers.
+
+    Paged memory is shared copy on write with every computer created from the snapshot. A plain list buffer
+    is kept as a tuple instead, and copied whole into each new computer, since list indexing is what keeps
+    the interpreter fast and a single copy of a short program is cheaper than tracking shared pages
+    """
+    # state that's either captured separately, or belongs to one computer only
+    _excludedState = ('buffer', '_decodeCache', '_processCurrentCommand', 'tracer', 'profiler', 'queueOutputs')
+
+    def __init__(self, computer):
+        """
+        :param ElfGuidanceComputer computer: the computer to capture
+        """
+        self.computerClass = type(computer)
+        if isinstance(computer.buffer, list):
+            self.memory = tuple(computer.buffer)
+        else:
+            self.memory = computer.buffer.fork()
+
+        self.decodeCache = dict(computer._decodeCache)
+        self.state = {key: value for key, value in computer.__dict__.items() if key not in self._excludedState}
+
+        # only state that could be changed in place has to be copied, like a list output buffer
+        self._mutableState = [key for key, value in self.state.items()
+                              if not (value is None or isinstance(value, (bool, int, str, tuple)))]
+        for key in self._mutableState:
+            self.state[key] = copy.deepcopy(self.state[key])
+
+    @property
+    def currentIndex(self):
+        return self.state['currentIndex']
+
+    @property
+    def relativeBase(self):
+        return self.state['relativeBase']
+
+    def ApplyTo(self, computer):
+        """
+        Overwrite a computer's state with this snapshot's
+
+        :param ElfGuidanceComputer computer: the computer to overwrite
+        """
+        computer.__dict__.update(self.state)
+        for key in self._mutableState:
+            computer.__dict__[key] = copy.deepcopy(self.state[key])
+        if isinstance(self.memory, tuple):
+            computer.buffer = list(self.memory)
+        else:
+            computer.buffer = self.memory.fork()
+        computer._decodeCache = dict(self.decodeCache)
+
+    def CreateComputer(self):
+        """
+        :return ElfGuidanceComputer: a new computer of the snapshotted class, in the snapshotted state
+        """
+        computer = self.computerClass.__new__(self.computerClass)
+        computer.tracer = None
+        computer.profiler = None
+        computer.queueOutputs = False
+        self.ApplyTo(computer)
+
+        return computer
+
+
 class ExpandedMemoryBuffer(collections.defaultdict):
     """
     A default dict that allows for accessing positive memory addresses beyond what was originally
@@ -396,6 +831,6 @@ class ExpandedMemoryBuffer(collections.defaultdict):
 class ExtraMemoryComputer(ElfGuidanceComputer):
     def __init__(self, *args, **kwargs):
         super(ExtraMemoryComputer, self).__init__(*args, **kwargs)
-        # convert our buffer to a default dict to allow us
+        # convert our buffer to paged memory to allow us
         # to access memory beyond the initial buffer
-        self.buffer = ExpandedMemoryBuffer(self.buffer)
+        self.buffer = PagedMemory(self.buffer)
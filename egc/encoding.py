@@ -0,0 +1,45 @@
+"""
+Compact binary encoding helpers shared by the EGC's on-disk formats
+"""
+
+
+def encodeVarint(value, out):
+    """
+    Appends a zigzag, variable-length encoding of an integer of any size to a bytearray,
+    so small values of either sign take a single byte
+
+    :param int value: the value to encode
+    :param bytearray out: where to append the encoded bytes
+    """
+    zigzag = value << 1 if value >= 0 else ((-value) << 1) - 1
+
+    while zigzag > 0x7f:
+        out.append((zigzag & 0x7f) | 0x80)
+        zigzag >>= 7
+
+    out.append(zigzag)
+
+
+def decodeVarint(data, offset):
+    """
+    Reads one value written by encodeVarint
+
+    :param bytes data: the encoded data
+    :param int offset: where in the data the value starts
+
+    :return tuple: the decoded value, and the offset of the next value
+    """
+    zigzag = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        zigzag |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+
+    if zigzag & 1:
+        return -((zigzag + 1) >> 1), offset
+
+    return zigzag >> 1, offset
@@ -0,0 +1,292 @@
+"""
+Superinstruction fusion for the Elf Guidance Computer
+
+Intcode programs branch straight after most of the work they do: compare then branch (1007 then 1005), count a
+loop down then branch (1001 x,-1,x then 1005 x) and adjust the relative base then jump, which is how the 109
+prefixed call and return sequences work. A FusedEngine recognizes these pairs as it runs into them and executes
+each pair as a single fused operation, saving a whole dispatch every time. Fused operations read their operands
+through the same memory as everything else, and any write landing on a fused pair's words throws it away again,
+so self-modifying programs behave exactly like ElfGuidanceComputer.Run
+"""
+import collections
+
+from egc.computer import ParameterMode, EGCOutOfRangeError, decodeInstruction
+from egc.compiler import CompiledEngine, _operand
+
+
+JUMP_IF_TRUE = 5
+JUMP_IF_FALSE = 6
+
+# the opcodes that can start a fused pair, the pair always ends with a jump
+_ARITHMETIC = {1: '+', 2: '*'}
+_COMPARISONS = {7: '<', 8: '=='}
+_ADJUST_RELATIVE_BASE = 9
+
+# marker for addresses that don't start a fusable pair
+_UNFUSABLE = False
+
+# (fused function, pattern name) mapped to a pair's start address and words, shared by every engine. Least
+# recently used first, so the pairs of programs we've stopped running are the first to go
+_fusedPairs = collections.OrderedDict()
+
+# how many fused pairs we remember, across every program
+MAX_CACHED_PAIRS = 4096
+
+
+class FusedEngine(object):
+    """
+    Runs a computer's program through its own interpreter, except for pairs of instructions that can be fused
+    """
+    def __init__(self, computer):
+        """
+        :param ElfGuidanceComputer computer: the computer whose buffer and state we'll execute
+        """
+        self.computer = computer
+
+        # (fused function, pattern name), or _UNFUSABLE, mapped to the address they start at
+        self._fusions = {}
+
+        # the start addresses of every fused pair covering an address, mapped to that address. Pairs can overlap,
+        # eg when one is decoded from another's parameter words
+        self._coverage = {}
+
+        # the addresses covered by each fused pair, mapped to the address it starts at
+        self._pairAddresses = {}
+
+        self._fusableOpcodes = CompiledEngine._findCompilableOpcodes(type(computer))
+
+        # statistics
+        self.patternCounts = collections.Counter()
+        self.pairsInvalidated = 0
+
+    @property
+    def dispatchesSaved(self):
+        """
+        :return int: how many dispatches fusing pairs has saved, one for every fused pair executed
+        """
+        return sum(self.patternCounts.values())
+
+    def _decode(self, address):
+        """
+        :return tuple: the (opcode, modes, parameters) of the instruction at the address, or None if it isn't
+                       one we can fuse
+        """
+        computer = self.computer
+        memory = computer.buffer
+
+        try:
+            opcode, modes, length = decodeInstruction(memory[address], computer.maxParams,
+                                                      computer._instructionLengths)
+            if opcode not in self._fusableOpcodes:
+                return None
+
+            parameters = tuple(memory[address + 1 + i] for i in range(length - 1))
+        except IndexError:
+            return None
+
+        modes = modes[:length - 1]
+        for mode in modes:
+            if mode not in (ParameterMode.Position, ParameterMode.Immediate, ParameterMode.Relative):
+                return None
+
+        writes = computer._instructionWrites.get(opcode)
+        if writes is not None and modes[writes] == ParameterMode.Immediate:
+            return None
+
+        return opcode, modes, parameters
+
+    def _fuse(self, start):
+        """
+        Look for a fusable pair of instructions at an address
+
+        :param int start: the address of the first instruction of the pair
+
+        :return tuple: the (fused function, pattern name) for the pair, or _UNFUSABLE
+        """
+        first = self._decode(start)
+        if first is None or first[0] not in _ARITHMETIC and first[0] not in _COMPARISONS and \
+                first[0] != _ADJUST_RELATIVE_BASE:
+            self._fusions[start] = _UNFUSABLE
+            return _UNFUSABLE
+
+        middle = start + 1 + len(first[2])
+        second = self._decode(middle)
+        if second is None or second[0] not in (JUMP_IF_TRUE, JUMP_IF_FALSE):
+            self._fusions[start] = _UNFUSABLE
+            return _UNFUSABLE
+
+        end = middle + 1 + len(second[2])
+        words = (self.computer.buffer[start],) + first[2] + (self.computer.buffer[middle],) + second[2]
+
+        fused = _fusedPairs.get((start, words))
+        if fused is None:
+            fused = _fusedPairs[(start, words)] = _emitPair(start, middle, end, first, second)
+            while len(_fusedPairs) > MAX_CACHED_PAIRS:
+                _fusedPairs.popitem(last=False)
+        else:
+            _fusedPairs.move_to_end((start, words))
+
+        self._fusions[start] = fused
+        self._pairAddresses[start] = range(start, end)
+        for covered in range(start, end):
+            self._coverage.setdefault(covered, set()).add(start)
+
+        return fused
+
+    def _invalidate(self, address):
+        """
+        Throw away every fused pair covering an address that was just written to
+
+        :param int address: the address written to
+        """
+        for start in self._coverage.pop(address, ()):
+            self._fusions.pop(start, None)
+            for covered in self._pairAddresses.pop(start):
+                if covered != address:
+                    self._coverage[covered].discard(start)
+                    if not self._coverage[covered]:
+                        del self._coverage[covered]
+
+            self.pairsInvalidated += 1
+
+    def _interpret(self):
+        """
+        Run the single instruction at the instruction pointer through the computer's own interpreter,
+        throwing away any fused pair it writes over
+        """
+        computer = self.computer
+
+        opcode, computer._parameterModes, _ = computer._decodeCurrentInstruction()
+        writes = computer._instructionWrites.get(opcode)
+
+        target = None
+        if writes is not None and self._coverage and computer._parameterModes[writes] != ParameterMode.Immediate:
+            target = computer._getAddressForParameter(writes)
+
+        computer.step()
+
+        if target in self._coverage:
+            self._invalidate(target)
+
+    def Run(self):
+        """
+        Runs the program in the computer's buffer from its current instruction pointer until it finishes,
+        the same way ElfGuidanceComputer.Run does
+        """
+        computer = self.computer
+
+        # a traced or profiled computer wants to see every instruction, so let the interpreter have it
+        if computer.tracer is not None or computer.profiler is not None:
+            computer.Run()
+            return
+
+        fusions = self._fusions
+        coverage = self._coverage
+        decodeCache = computer._decodeCache
+        patternCounts = self.patternCounts
+
+        nextCheck = computer.cycles
+        while not computer.finished and computer.currentIndex < len(computer.buffer):
+            if computer.cycles >= nextCheck:
+                nextCheck = computer._nextBudgetCheck()
+
+            start = computer.currentIndex
+            fused = fusions.get(start)
+            if fused is None:
+                fused = self._fuse(start)
+
+            # a fused pair counts as two instructions, which mustn't take us past our budget
+            if fused is _UNFUSABLE or nextCheck - computer.cycles < 2:
+                self._interpret()
+                computer.cycles += 1
+                continue
+
+            function, pattern = fused
+            written = function(computer.buffer, computer, decodeCache, coverage)
+            if written is None:
+                computer.cycles += 2
+                patternCounts[pattern] += 1
+            else:
+                # the first instruction wrote over fused code, so the second runs on its own
+                computer.cycles += 1
+                self._invalidate(written)
+
+        if computer.currentIndex > len(computer.buffer) and not computer.finished:
+            raise EGCOutOfRangeError(computer.currentIndex, len(computer.buffer))
+
+
+def _patternName(first, second):
+    """
+    :return str: the name of the idiom a fusable pair implements, for the engine's statistics
+    """
+    opcode, modes, parameters = first
+    if opcode == _ADJUST_RELATIVE_BASE:
+        return 'relative-base-jump'
+    if opcode in _COMPARISONS:
+        return 'compare-branch'
+    if opcode == 1 and any(mode == ParameterMode.Immediate and parameter == -1
+                           for mode, parameter in zip(modes[:2], parameters[:2])):
+        return 'decrement-branch'
+
+    return 'arithmetic-branch'
+
+
+def _emitPair(start, middle, end, first, second):
+    """
+    Generate the function that executes a fused pair
+
+    :param int start: the address of the first instruction
+    :param int middle: the address of the second instruction, the jump
+    :param int end: the address just past the jump
+    :param tuple first: the decoded (opcode, modes, parameters) of the first instruction
+    :param tuple second: the decoded (opcode, modes, parameters) of the jump
+
+    :return tuple: the (fused function, pattern name). The function sets the computer's instruction pointer and
+                   returns None, or returns an address holding fused code that it wrote to, in which case
+                   only the first instruction ran
+    """
+    opcode, modes, parameters = first
+    operands = [_operand(mode, parameter) for mode, parameter in zip(modes, parameters)]
+
+    lines = ['def fused(m, c, decoded, cover):', '    rb = c.relativeBase']
+    written = None
+    if opcode == _ADJUST_RELATIVE_BASE:
+        lines.append('    rb += {}'.format(operands[0]))
+    else:
+        if opcode in _ARITHMETIC:
+            expression = '{} {} {}'.format(operands[0], _ARITHMETIC[opcode], operands[1])
+        else:
+            expression = '1 if {} {} {} else 0'.format(operands[0], _COMPARISONS[opcode], operands[1])
+
+        if modes[2] == ParameterMode.Relative:
+            lines.append('    a = rb + {}'.format(parameters[2]))
+        else:
+            lines.append('    a = {}'.format(parameters[2]))
+        written = (modes[2], parameters[2])
+
+        lines.append('    v = {}'.format(expression))
+        lines.append('    m[a] = v')
+        lines.append('    if a in decoded:')
+        lines.append('        del decoded[a]')
+        lines.append('    if a in cover:')
+        lines.append('        c.currentIndex = {}'.format(middle))
+        lines.append('        c.relativeBase = rb')
+        lines.append('        return a')
+
+    jumpOpcode, jumpModes, jumpParameters = second
+    # branching on what we just wrote doesn't need to read it back
+    if written is not None and (jumpModes[0], jumpParameters[0]) == written:
+        condition = 'v'
+    else:
+        condition = _operand(jumpModes[0], jumpParameters[0])
+
+    lines.append('    if {} {} 0:'.format(condition, '!=' if jumpOpcode == JUMP_IF_TRUE else '=='))
+    lines.append('        c.currentIndex = {}'.format(_operand(jumpModes[1], jumpParameters[1])))
+    lines.append('    else:')
+    lines.append('        c.currentIndex = {}'.format(end))
+    lines.append('    c.relativeBase = rb')
+
+    namespace = {}
+    exec(compile('\n'.join(lines), '<egc fused pair {}>'.format(start), 'exec'), namespace)
+
+    return namespace['fused'], _patternName(first, second)
@@ -0,0 +1,165 @@
+"""
+Loads intcode programs, parsing each distinct program only once
+
+Parsed programs are kept as immutable tuple templates keyed by a hash of their text, and every load hands out a
+fresh list copied from the template, which is far cheaper than parsing the text again. Puzzle inputs can also be
+cached on disk next to their text file, so later runs read the parsed program straight back in:
+
+    magic, hash of the program text, layout, values
+
+where the values are little endian 64 bit integers, or zigzag varints if any value doesn't fit in 64 bits.
+A cache whose hash doesn't match its text file is ignored and rewritten
+"""
+import array
+import hashlib
+import os
+import sys
+
+from egc.encoding import encodeVarint, decodeVarint
+
+
+PROGRAM_CACHE_MAGIC = b'EGCP\x01'
+PROGRAM_CACHE_EXTENSION = '.egcp'
+
+# value layouts in the cache
+_INT64 = 0
+_VARINT = 1
+
+_HASH_SIZE = 16
+
+# parsed program templates mapped to the hash of their text
+_templates = {}
+
+
+def parseProgram(text):
+    """
+    :param str text: comma separated integers
+
+    :return tuple[int]: the program
+    """
+    return tuple(map(int, text.split(',')))
+
+
+def _hashProgram(text):
+    """
+    :return bytes: the key a program's text is cached under
+    """
+    return hashlib.blake2b(text.strip().encode('utf-8'), digest_size=_HASH_SIZE).digest()
+
+
+def programCachePath(path):
+    """
+    :param str path: a program's text file, eg inputData/day09.txt
+
+    :return str: the file its parsed program is cached in, eg inputData/day09.egcp
+    """
+    return os.path.splitext(path)[0] + PROGRAM_CACHE_EXTENSION
+
+
+def _readCache(cachePath, key):
+    """
+    :return tuple[int]: the program cached at the path, or None if there isn't one for this key
+    """
+    try:
+        with open(cachePath, 'rb') as fh:
+            data = fh.read()
+    except OSError:
+        return None
+
+    header = len(PROGRAM_CACHE_MAGIC)
+    if data[:header] != PROGRAM_CACHE_MAGIC or data[header:header + _HASH_SIZE] != key:
+        return None
+
+    offset = header + _HASH_SIZE
+
+    # a truncated or corrupt cache is treated as missing, so it's parsed again and rewritten
+    try:
+        layout = data[offset]
+        offset += 1
+
+        if layout == _INT64:
+            values = array.array('q')
+            values.frombytes(data[offset:])
+            if sys.byteorder != 'little':
+                values.byteswap()
+        elif layout == _VARINT:
+            values = []
+            while offset < len(data):
+                value, offset = decodeVarint(data, offset)
+                values.append(value)
+        else:
+            return None
+    except (ValueError, IndexError):
+        return None
+
+    return tuple(values) or None
+
+
+def _writeCache(cachePath, key, program):
+    """
+    Caches a parsed program on disk. Not being able to write the cache isn't an error, we'll just parse the
+    text again next time
+    """
+    out = bytearray(PROGRAM_CACHE_MAGIC)
+    out.extend(key)
+
+    try:
+        values = array.array('q', program)
+    except OverflowError:
+        out.append(_VARINT)
+        for value in program:
+            encodeVarint(value, out)
+    else:
+        if sys.byteorder != 'little':
+            values.byteswap()
+        out.append(_INT64)
+        out.extend(values.tobytes())
+
+    temporaryPath = cachePath + '.tmp'
+    try:
+        with open(temporaryPath, 'wb') as fh:
+            fh.write(out)
+        os.replace(temporaryPath, cachePath)
+    except OSError:
+        pass
+
+
+def programTemplate(text, cachePath=None):
+    """
+    :param str text: comma separated integers
+    :param str cachePath: a file to cache the parsed program in between runs, see programCachePath
+
+    :return tuple[int]: the shared, immutable parsed program
+    """
+    key = _hashProgram(text)
+
+    template = _templates.get(key)
+    if template is None:
+        if cachePath is not None:
+            template = _readCache(cachePath, key)
+
+        if template is None:
+            template = parseProgram(text)
+            if cachePath is not None:
+                _writeCache(cachePath, key, template)
+
+        _templates[key] = template
+
+    return template
+
+
+def loadProgram(text, cachePath=None):
+    """
+    :param str text: comma separated integers
+    :param str cachePath: a file to cache the parsed program in between runs, see programCachePath
+
+    :return list[int]: a fresh copy of the program, ready to be used as a computer's buffer
+    """
+    return list(programTemplate(text, cachePath))
+
+
+def clearTemplates():
+    """
+    Forget every program parsed so far
+    """
+    _templates.clear()
@@ -0,0 +1,210 @@
+"""
+Memory models for the Elf Guidance Computer
+"""
+import array
+
+
+# the array typecode for a page of native 64 bit integers
+INT64_TYPECODE = 'q'
+
+
+class PagedMemory(object):
+    """
+    Unbounded memory for computers that are allowed to access addresses beyond their initial program.
+
+    Memory is split into fixed-size pages of native 64 bit integers, allocated the first time anything is written
+    to them, so reading an untouched address costs nothing and returns 0. A page is promoted to a list of
+    arbitrary-precision integers the first time it has to store a value that doesn't fit in 64 bits.
+    Negative addresses raise an IndexError, just like ExpandedMemoryBuffer.
+
+    Memory can be forked, in which case both copies share their pages until either one writes to a page
+    """
+    def __init__(self, buffer=(), pageBits=10):
+        """
+        :param list[int] buffer: the initial contents of memory, starting at address 0
+        :param int pageBits: pages hold 2 ** pageBits addresses
+        """
+        self.pageBits = pageBits
+        self.pageSize = 1 << pageBits
+        self._pageMask = self.pageSize - 1
+        self._zeroPage = array.array(INT64_TYPECODE, [0]) * self.pageSize
+
+        # array or list pages mapped to their page index
+        self._pages = {}
+
+        # indices of pages we share with a fork, and have to copy before writing to
+        self._shared = set()
+
+        # one past the highest address that has ever held a value
+        self._length = 0
+
+        self.Load(buffer)
+
+    def Load(self, buffer, start=0):
+        """
+        Copy a whole sequence of values into memory a page at a time
+
+        :param list[int] buffer: the values to store
+        :param int start: the address to store the first value at
+        """
+        if start < 0:
+            raise IndexError("Attempted to load values at address {}".format(start))
+
+        address = start
+        end = start + len(buffer)
+        while address < end:
+            index = address >> self.pageBits
+            offset = address & self._pageMask
+            count = min(self.pageSize - offset, end - address)
+            chunk = buffer[address - start:address - start + count]
+
+            page = self._writablePage(index)
+
+            try:
+                page[offset:offset + count] = array.array(INT64_TYPECODE, chunk)
+            except OverflowError:
+                page = self._pages[index] = list(page)
+                page[offset:offset + count] = chunk
+
+            address += count
+
+        self._length = max(self._length, end)
+
+    def _writablePage(self, index):
+        """
+        :param int index: the index of the page we're about to write to
+
+        :return array: the page, allocated if it didn't exist yet, and copied if we were sharing it with a fork
+        """
+        page = self._pages.get(index)
+        if page is None:
+            page = self._pages[index] = self._zeroPage[:]
+        elif index in self._shared:
+            page = self._pages[index] = page[:]
+            self._shared.discard(index)
+
+        return page
+
+    def __getitem__(self, address):
+        if address < 0:
+            raise IndexError("Attempted to get key at address {}".format(address))
+
+        page = self._pages.get(address >> self.pageBits)
+        if page is None:
+            return 0
+
+        return page[address & self._pageMask]
+
+    def __setitem__(self, address, value):
+        if address < 0:
+            raise IndexError("Attempted to set key at address {}".format(address))
+
+        index = address >> self.pageBits
+        page = self._pages.get(index)
+        if page is None or index in self._shared:
+            page = self._writablePage(index)
+
+        try:
+            page[address & self._pageMask] = value
+        except OverflowError:
+            # too big for 64 bits, so this page has to hold python ints from now on
+            page = self._pages[index] = list(page)
+            page[address & self._pageMask] = value
+
+        if address >= self._length:
+            self._length = address + 1
+
+    def __delitem__(self, address):
+        if address < 0:
+            raise IndexError("Attempted to delete key at address {}".format(address))
+
+        if (address >> self.pageBits) in self._pages:
+            self[address] = 0
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for address in range(self._length):
+            yield self[address]
+
+    def __eq__(self, other):
+        if isinstance(other, PagedMemory):
+            return dict(self.items()) == dict(other.items())
+
+        return NotImplemented
+
+    def items(self):
+        """
+        :return generator: (address, value) for every address holding a non-zero value
+        """
+        for index in sorted(self._pages):
+            base = index << self.pageBits
+            for offset, value in enumerate(self._pages[index]):
+                if value:
+                    yield base + offset, value
+
+    def copy(self):
+        """
+        :return PagedMemory: an independent copy of this memory
+        """
+        other = self.__class__.__new__(self.__class__)
+        other.__dict__.update(self.__dict__)
+        other._pages = {index: page[:] for index, page in self._pages.items()}
+        other._shared = set()
+        return other
+
+    def fork(self):
+        """
+        Makes a copy of this memory that shares every page with it, copy on write
+
+        :return PagedMemory: the new copy
+        """
+        other = self.__class__.__new__(self.__class__)
+        other.__dict__.update(self.__dict__)
+        other._pages = dict(self._pages)
+
+        # neither of us can write to a page in place anymore, until we've made our own copy of it
+        self._shared.update(self._pages)
+        other._shared = set(self._pages)
+
+        return other
+
+    def pages(self):
+        """
+        :return list[tuple]: (page index, page) for every allocated page, in address order
+        """
+        return sorted(self._pages.items())
+
+    @classmethod
+    def fromPages(cls, pages, length, pageBits=10):
+        """
+        Rebuild memory from its allocated pages, see pages
+
+        :param list[tuple] pages: (page index, list of values) for every allocated page
+        :param int length: one past the highest address that had ever held a value
+        :param int pageBits: pages hold 2 ** pageBits addresses
+
+        :return PagedMemory: the rebuilt memory
+        """
+        memory = cls(pageBits=pageBits)
+        for index, values in pages:
+            memory.Load(values, index << pageBits)
+
+        memory._length = length
+        return memory
+
+    @property
+    def allocatedPages(self):
+        """
+        :return int: how many pages have actually been allocated
+        """
+        return len(self._pages)
+
+    @property
+    def promotedPages(self):
+        """
+        :return int: how many pages have had to be promoted to arbitrary-precision integers
+        """
+        return sum(1 for page in self._pages.values() if not isinstance(page, array.array))
+
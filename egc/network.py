@@ -0,0 +1,146 @@
+"""
+Runs networks of Elf Guidance Computers that feed each other's inputs with their outputs
+
+Every computer is an asyncio task that runs until it needs an input, then waits on its own input queue, so a
+computer only ever runs when it actually has something to do, however the network is wired together
+"""
+import asyncio
+
+from egc.computer import AwaitingInput
+
+
+# sent to computers that are waiting on each other, to wake them up with an EGCNetworkDeadlock
+_DEADLOCK = object()
+
+
+class EGCNetworkDeadlock(Exception):
+    """
+    Custom exception for raising when every computer still running in a network is waiting for an input
+    that nobody is left to send
+    """
+    def __init__(self, waiting):
+        super(EGCNetworkDeadlock, self).__init__(
+            "Computers {} are all waiting for input that will never arrive".format(sorted(waiting)))
+
+
+class ComputerNetwork(object):
+    """
+    A network of computers, where each computer's outputs are sent to the inputs of the computers it's
+    connected to.
+
+    Values already queued in a computer's input channel, like an amplifier's phase, are read before anything
+    sent to it over the network
+    """
+    def __init__(self, computers, connections):
+        """
+        :param dict computers: the computers in the network mapped to their ids
+        :param dict connections: the id, or list of ids, of the computers receiving a computer's outputs
+                                 mapped to that computer's id, eg {'a': 'b', 'b': 'a'} for a feedback loop.
+                                 A computer that isn't connected to anything keeps its outputs to itself
+        """
+        self.computers = computers
+
+        self.connections = {}
+        for computerID, targets in connections.items():
+            if isinstance(targets, (list, tuple, set)):
+                self.connections[computerID] = list(targets)
+            else:
+                self.connections[computerID] = [targets]
+
+        # the last value each computer output, mapped to its id
+        self.lastOutputs = {}
+
+        self._queues = None
+        self._running = set()
+        self._waiting = set()
+
+    def Send(self, computerID, value):
+        """
+        Send a value to a computer's input before or while the network is running
+
+        :param computerID: the id of the computer
+        :param int value: the value to send
+        """
+        if self._queues is None:
+            self.computers[computerID].inputChannel.append(value)
+        else:
+            self._queues[computerID].put_nowait(value)
+
+    async def _runComputer(self, computerID):
+        """
+        Runs one computer until it finishes, sending its outputs over the network and waiting
+        whenever it needs an input
+
+        :param computerID: the id of the computer to run
+        """
+        queue = self._queues[computerID]
+        targets = self.connections.get(computerID, ())
+        execution = self.computers[computerID].Execute()
+
+        try:
+            value = next(execution)
+            while True:
+                if value is not AwaitingInput:
+                    self.lastOutputs[computerID] = value
+                    for target in targets:
+                        self._queues[target].put_nowait(value)
+
+                    value = next(execution)
+                    continue
+
+                if queue.empty():
+                    self._waiting.add(computerID)
+                    self._checkDeadlock()
+
+                    received = await queue.get()
+                    if received is _DEADLOCK:
+                        raise EGCNetworkDeadlock(self._waiting)
+                    self._waiting.discard(computerID)
+                else:
+                    # no need to hand control back to the event loop if our input's already here
+                    received = queue.get_nowait()
+
+                value = execution.send(received)
+        except StopIteration:
+            pass
+        finally:
+            self._running.discard(computerID)
+            if computerID in self._waiting:
+                self._waiting.discard(computerID)
+            else:
+                self._checkDeadlock()
+
+    def _checkDeadlock(self):
+        """
+        If every computer still running is waiting with nothing to read, nobody is left to send them anything,
+        so wake them all up to raise an EGCNetworkDeadlock instead of waiting forever
+        """
+        if self._waiting and self._waiting == self._running and \
+                all(self._queues[waiting].empty() for waiting in self._waiting):
+            for waiting in self._waiting:
+                self._queues[waiting].put_nowait(_DEADLOCK)
+
+    async def RunAsync(self):
+        """
+        Runs every computer in the network until they've all finished
+
+        :return dict: the last value each computer output, mapped to its id
+        """
+        self._queues = {computerID: asyncio.Queue() for computerID in self.computers}
+        self._running = set(self.computers)
+        self._waiting = set()
+
+        try:
+            await asyncio.gather(*[self._runComputer(computerID) for computerID in self.computers])
+        finally:
+            self._queues = None
+
+        return self.lastOutputs
+
+    def Run(self):
+        """
+        Runs every computer in the network until they've all finished
+
+        :return dict: the last value each computer output, mapped to its id
+        """
+        return asyncio.run(self.RunAsync())
@@ -0,0 +1,193 @@
+"""
+Parallel searches over many runs of the same Elf Guidance Computer program
+"""
+import concurrent.futures
+import itertools
+import multiprocessing
+import os
+
+
+# the program and stop signal each worker process is given once, when it starts
+_workerProgram = None
+_workerStop = None
+
+
+def _initializeWorker(program, stopEvent, prepare=None):
+    """
+    Stores the program and stop signal in the worker process, so they're only shipped to it once
+
+    :param tuple program: the parsed program
+    :param multiprocessing.Event stopEvent: set as soon as any worker finds what we're looking for
+    :param func prepare: optional module level function called once as prepare(program), whatever it returns
+                         is handed to every evaluation in this worker in place of the program
+    """
+    global _workerProgram, _workerStop
+    _workerProgram = program if prepare is None else prepare(program)
+    _workerStop = stopEvent
+
+
+def _searchBatch(evaluate, batch):
+    """
+    Evaluates a batch of candidates in a worker process, giving up early if another worker already succeeded
+
+    :param func evaluate: the evaluation function, see parallelSearch
+    :param list batch: the candidates to evaluate
+
+    :return: the first candidate in the batch that evaluate accepted, or None
+    """
+    for candidate in batch:
+        if _workerStop.is_set():
+            return None
+
+        if evaluate(_workerProgram, candidate):
+            return candidate
+
+    return None
+
+
+def _maxOfBatch(evaluate, batch):
+    """
+    Evaluates a batch of candidates in a worker process, keeping only the best
+
+    :param func evaluate: the evaluation function, see parallelMax
+    :param list batch: the candidates to evaluate
+
+    :return tuple: the best (score, candidate) in the batch
+    """
+    best = None
+    for candidate in batch:
+        score = evaluate(_workerProgram, candidate)
+        if best is None or score > best[0]:
+            best = (score, candidate)
+
+    return best
+
+
+def _batched(iterable, batchSize):
+    """
+    :return generator[list]: the iterable's items, in lists of batchSize items
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, batchSize))
+        if not batch:
+            return
+
+        yield batch
+
+
+def parallelSearch(program, candidates, evaluate, workers=None, batchSize=64):
+    """
+    Fans candidate parameter sets out over a pool of worker processes, and stops as soon as any one of them
+    is accepted.
+
+    The program is shipped to each worker once when it starts, and workers receive candidates in batches.
+    Once a candidate is accepted, batches that haven't started are cancelled and running batches stop
+    before their next candidate
+
+    :param list[int] program: the parsed intcode program every candidate is evaluated against
+    :param iterable candidates: the parameter sets to try, eg (noun, verb) tuples
+    :param func evaluate: a module level function called as evaluate(program, candidate), which returns True
+                          if the candidate is the one we're looking for. It has to copy the program before
+                          running it, since every candidate in a worker shares the same tuple
+    :param int workers: how many worker processes to use, defaults to the number of cores. With 1 worker
+                        the search runs in this process
+    :param int batchSize: how many candidates to send to a worker at a time
+
+    :return: an accepted candidate, or None if no candidate was accepted
+    """
+    program = tuple(program)
+    workers = workers or os.cpu_count() or 1
+    batches = _batched(candidates, batchSize)
+
+    if workers == 1:
+        for batch in batches:
+            for candidate in batch:
+                if evaluate(program, candidate):
+                    return candidate
+
+        return None
+
+    context = multiprocessing.get_context()
+    stopEvent = context.Event()
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                                initializer=_initializeWorker,
+                                                initargs=(program, stopEvent)) as executor:
+        # keep a couple of batches queued per worker, so nobody idles but there's little to cancel
+        pending = {executor.submit(_searchBatch, evaluate, batch)
+                   for batch in itertools.islice(batches, workers * 2)}
+
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                found = future.result()
+                if found is not None:
+                    stopEvent.set()
+                    for other in pending:
+                        other.cancel()
+
+                    return found
+
+            for batch in itertools.islice(batches, len(done)):
+                pending.add(executor.submit(_searchBatch, evaluate, batch))
+
+    return None
+
+
+def parallelMax(program, candidates, evaluate, workers=None, batchSize=8, prepare=None):
+    """
+    Fans candidate parameter sets out over a pool of worker processes, and finds the one that scores highest.
+
+    Like parallelSearch, the program is shipped to each worker once and candidates are sent in batches. Each
+    batch only sends back its best score, which is folded into a running max as batches finish
+
+    :param list[int] program: the parsed intcode program every candidate is evaluated against
+    :param iterable candidates: the parameter sets to try, eg phase orders
+    :param func evaluate: a module level function called as evaluate(program, candidate), which returns the
+                          candidate's score. If prepare is given it's called with prepare's result instead
+    :param int workers: how many worker processes to use, defaults to the number of cores. With 1 worker
+                        the search runs in this process
+    :param int batchSize: how many candidates to send to a worker at a time
+    :param func prepare: optional module level function called once per worker as prepare(program), to build
+                         anything every evaluation can share, like a loaded computer to fork from
+
+    :return tuple: the highest (score, candidate), or None if there were no candidates
+    """
+    program = tuple(program)
+    workers = workers or os.cpu_count() or 1
+    batches = _batched(candidates, batchSize)
+
+    best = None
+
+    if workers == 1:
+        shared = program if prepare is None else prepare(program)
+        for batch in batches:
+            for candidate in batch:
+                score = evaluate(shared, candidate)
+                if best is None or score > best[0]:
+                    best = (score, candidate)
+
+        return best
+
+    context = multiprocessing.get_context()
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                                initializer=_initializeWorker,
+                                                initargs=(program, None, prepare)) as executor:
+        pending = {executor.submit(_maxOfBatch, evaluate, batch)
+                   for batch in itertools.islice(batches, workers * 2)}
+
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                found = future.result()
+                if found is not None and (best is None or found[0] > best[0]):
+                    best = found
+
+            for batch in itertools.islice(batches, len(done)):
+                pending.add(executor.submit(_maxOfBatch, evaluate, batch))
+
+    return best
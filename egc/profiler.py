@@ -0,0 +1,166 @@
+"""
+Profiling for the Elf Guidance Computer
+
+Profiling is off by default, and costs nothing until a profiler is attached with ElfGuidanceComputer.SetProfiler.
+A profile counts how many times each opcode, parameter mode combination and address executed, and how long each
+opcode's handler took, and can be written out as JSON or as collapsed stacks for flamegraph.pl or speedscope.
+A program file can be profiled straight from the command line with
+
+    python -m egc.profiler inputData/day09.txt --input 2 --json day09.json --collapsed day09.folded
+"""
+import argparse
+import collections
+import json
+import sys
+
+from egc.computer import ExtraMemoryComputer
+from egc.loader import loadProgram
+
+
+class Profiler(object):
+    """
+    Counts and times every instruction executed by the computers it's attached to
+    """
+    def __init__(self):
+        # executions mapped to each opcode, each (opcode, modes) pair and each instruction address
+        self.opcodeCounts = collections.Counter()
+        self.modeCounts = collections.Counter()
+        self.addressCounts = collections.Counter()
+
+        # executions mapped to each (address, opcode) pair, for the collapsed stacks
+        self._sites = collections.Counter()
+
+        # total seconds spent in each opcode's handler mapped to the opcode
+        self.handlerTimes = collections.defaultdict(float)
+
+        # handler method names mapped to their opcodes, filled in by the computers we're attached to
+        self.instructionNames = {}
+
+    def Record(self, ip, opcode, modes, elapsed):
+        """
+        Records a single executed instruction
+
+        :param int ip: the address of the instruction
+        :param int opcode: the decoded opcode
+        :param tuple modes: the modes of the instruction's parameters
+        :param float elapsed: how many seconds the instruction's handler took
+        """
+        self.opcodeCounts[opcode] += 1
+        self.modeCounts[(opcode, modes)] += 1
+        self.addressCounts[ip] += 1
+        self._sites[(ip, opcode)] += 1
+        self.handlerTimes[opcode] += elapsed
+
+    @property
+    def instructions(self):
+        """
+        :return int: how many instructions we've recorded
+        """
+        return sum(self.opcodeCounts.values())
+
+    def HotAddresses(self, count=10):
+        """
+        :param int count: how many addresses to return
+
+        :return list[tuple]: the (address, executions) of the most executed instructions, most executed first
+        """
+        return self.addressCounts.most_common(count)
+
+    def _name(self, opcode):
+        """
+        :return str: the name of the opcode's handler, eg _add, or the opcode if we don't know it
+        """
+        return self.instructionNames.get(opcode, str(opcode))
+
+    def ToDict(self):
+        """
+        :return dict: the profile as plain, JSON serializable data
+        """
+        opcodes = {}
+        for opcode, count in self.opcodeCounts.most_common():
+            opcodes[str(opcode)] = {'name': self._name(opcode),
+                                    'count': count,
+                                    'seconds': self.handlerTimes[opcode]}
+
+        modes = {}
+        for (opcode, parameterModes), count in self.modeCounts.most_common():
+            modes['{}:{}'.format(opcode, ''.join(str(mode) for mode in parameterModes))] = count
+
+        return {'instructions': self.instructions,
+                'opcodes': opcodes,
+                'modes': modes,
+                'addresses': {str(address): count for address, count in sorted(self.addressCounts.items())}}
+
+    def WriteJSON(self, fh):
+        """
+        :param file fh: the text file to write the profile to, as JSON
+        """
+        json.dump(self.ToDict(), fh, indent=2)
+
+    def CollapsedStacks(self):
+        """
+        One line per instruction address in the collapsed stack format flamegraph tools read, with the
+        opcode's handler as the parent frame of each address
+
+        :return list[str]: lines like "egc;_add;@12 400", weighted by executions
+        """
+        return ['egc;{};@{} {}'.format(self._name(opcode), ip, count)
+                for (ip, opcode), count in sorted(self._sites.items())]
+
+    def WriteCollapsedStacks(self, fh):
+        """
+        :param file fh: the text file to write the collapsed stacks to
+        """
+        for line in self.CollapsedStacks():
+            fh.write(line + '\n')
+
+    def Report(self, hotAddresses=10):
+        """
+        :param int hotAddresses: how many of the most executed addresses to list
+
+        :return str: a human readable summary of the profile
+        """
+        lines = ['{:>20} {:>8} {:>12} {:>10}'.format('instruction', 'opcode', 'count', 'seconds')]
+        for opcode, count in self.opcodeCounts.most_common():
+            lines.append('{:>20} {:>8} {:>12} {:>10.4f}'.format(self._name(opcode), opcode, count,
+                                                                 self.handlerTimes[opcode]))
+
+        lines.append('')
+        lines.append('{:>20} {:>12}'.format('address', 'count'))
+        for address, count in self.HotAddresses(hotAddresses):
+            lines.append('{:>20} {:>12}'.format(address, count))
+
+        return '\n'.join(lines)
+
+
+def Main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m egc.profiler', description="Profile an intcode program")
+    parser.add_argument('program', help="comma separated intcode program")
+    parser.add_argument('--input', type=int, default=None, help="value for the computer's input buffer")
+    parser.add_argument('--json', help="file to write the profile to as JSON")
+    parser.add_argument('--collapsed', help="file to write the profile to as collapsed stacks")
+
+    args = parser.parse_args(args)
+
+    with open(args.program, 'r') as fh:
+        program = loadProgram(fh.read())
+
+    profiler = Profiler()
+    computer = ExtraMemoryComputer(program)
+    computer.input = args.input
+    computer.SetProfiler(profiler)
+    computer.Run()
+
+    if args.json:
+        with open(args.json, 'w') as fh:
+            profiler.WriteJSON(fh)
+
+    if args.collapsed:
+        with open(args.collapsed, 'w') as fh:
+            profiler.WriteCollapsedStacks(fh)
+
+    sys.stdout.write(profiler.Report() + '\n')
+
+
+if __name__ == '__main__':
+    Main()
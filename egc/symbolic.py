@@ -0,0 +1,306 @@
+"""
+Symbolic evaluation of Elf Guidance Computer programs
+
+Some programs, like day02's, only ever add and multiply their inputs without branching on them, so the value
+they leave behind is a polynomial in those inputs. Running the program once on symbols instead of numbers gives
+us that polynomial, and we can solve it for a target output directly instead of searching every input
+"""
+import itertools
+
+from egc.computer import ElfGuidanceComputer, ParameterMode, EGCUnexpectedParameterMode
+
+
+class EGCSymbolicError(Exception):
+    """
+    Custom exception for raising when a program does something with a symbolic value that depends on what the
+    value actually is, like branching on it or using it as an address, so it can't be evaluated symbolically
+    """
+    def __init__(self, reason, position):
+        super(EGCSymbolicError, self).__init__(
+            "Cannot evaluate symbolically at position {}: {}".format(position, reason))
+
+
+class Polynomial(object):
+    """
+    An immutable polynomial with integer coefficients over named symbols.
+
+    Arithmetic between polynomials and integers returns a new polynomial, or a plain int when the result
+    turns out to be constant
+    """
+    def __init__(self, terms):
+        """
+        :param dict terms: integer coefficients mapped to their monomial, a sorted tuple of symbol names
+                           where () is the constant term and ('noun', 'noun') is noun squared
+        """
+        self.terms = {monomial: coefficient for monomial, coefficient in terms.items() if coefficient}
+
+    @classmethod
+    def Symbol(cls, name):
+        """
+        :param str name: the name of the symbol
+
+        :return Polynomial: the polynomial made of that single symbol
+        """
+        return cls({(name,): 1})
+
+    @staticmethod
+    def _simplify(terms):
+        """
+        :return Polynomial|int: the polynomial with the given terms, or an int if it's constant
+        """
+        polynomial = Polynomial(terms)
+        if not polynomial.terms:
+            return 0
+        if list(polynomial.terms) == [()]:
+            return polynomial.terms[()]
+
+        return polynomial
+
+    def __add__(self, other):
+        if isinstance(other, int):
+            other = Polynomial({(): other})
+        if not isinstance(other, Polynomial):
+            return NotImplemented
+
+        terms = dict(self.terms)
+        for monomial, coefficient in other.terms.items():
+            terms[monomial] = terms.get(monomial, 0) + coefficient
+
+        return self._simplify(terms)
+
+    __radd__ = __add__
+
+    def __mul__(self, other):
+        if isinstance(other, int):
+            other = Polynomial({(): other})
+        if not isinstance(other, Polynomial):
+            return NotImplemented
+
+        terms = {}
+        for (monomialA, coefficientA), (monomialB, coefficientB) in itertools.product(self.terms.items(),
+                                                                                         other.terms.items()):
+            monomial = tuple(sorted(monomialA + monomialB))
+            terms[monomial] = terms.get(monomial, 0) + coefficientA * coefficientB
+
+        return self._simplify(terms)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        if isinstance(other, Polynomial):
+            return self.terms == other.terms
+
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(frozenset(self.terms.items()))
+
+    def __repr__(self):
+        parts = []
+        for monomial, coefficient in sorted(self.terms.items(), key=lambda term: (-len(term[0]), term[0])):
+            parts.append('*'.join([str(coefficient)] + list(monomial)))
+
+        return 'Polynomial({})'.format(' + '.join(parts))
+
+    @property
+    def symbols(self):
+        """
+        :return set: the name of every symbol in the polynomial
+        """
+        return {symbol for monomial in self.terms for symbol in monomial}
+
+    @property
+    def degree(self):
+        """
+        :return int: the highest degree of any term
+        """
+        return max(len(monomial) for monomial in self.terms)
+
+    def IsAffine(self):
+        """
+        :return bool: True if the polynomial is a constant plus a multiple of each symbol
+        """
+        return self.degree <= 1
+
+    def Coefficient(self, *symbols):
+        """
+        :param str symbols: the symbols of the monomial, or none for the constant term
+
+        :return int: the coefficient of that monomial
+        """
+        return self.terms.get(tuple(sorted(symbols)), 0)
+
+    def Evaluate(self, values):
+        """
+        :param dict values: the integer value of every symbol mapped to its name
+
+        :return int: the value of the polynomial
+        """
+        total = 0
+        for monomial, coefficient in self.terms.items():
+            for symbol in monomial:
+                coefficient *= values[symbol]
+            total += coefficient
+
+        return total
+
+
+class _Unknown(object):
+    """
+    A value read from a symbolic address, which could be anything. Anything computed from it is unknown too,
+    which is fine as long as the program eventually overwrites it
+    """
+    def __add__(self, other):
+        return self
+
+    __radd__ = __mul__ = __rmul__ = __add__
+
+    def __repr__(self):
+        return 'Unknown'
+
+
+Unknown = _Unknown()
+
+
+class SymbolicComputer(ElfGuidanceComputer):
+    """
+    An Elf Guidance Computer that can hold Polynomials in memory, and raises an EGCSymbolicError as soon as
+    the program does anything that depends on a symbolic value's actual value
+    """
+    def _concrete(self, value, reason):
+        """
+        :param value: a value from memory
+        :param str reason: what we need the value for, for the error message
+
+        :return int: the value, as long as it's an actual number
+        """
+        if not isinstance(value, int):
+            raise EGCSymbolicError("{} depends on {}".format(reason, value), self.currentIndex)
+
+        return value
+
+    def _decodeCurrentInstruction(self):
+        self._concrete(self.buffer[self.currentIndex], "the opcode")
+        return super(SymbolicComputer, self)._decodeCurrentInstruction()
+
+    def _getAddressForParameter(self, paramPosition):
+        mode = self._parameterModes[paramPosition]
+        parameterAddress = self.currentIndex + 1 + paramPosition
+
+        if mode == ParameterMode.Position:
+            return self._concrete(self.buffer[parameterAddress], "an address")
+        elif mode == ParameterMode.Immediate:
+            return parameterAddress
+        elif mode == ParameterMode.Relative:
+            return self._concrete(self.relativeBase + self.buffer[parameterAddress], "an address")
+
+        raise EGCUnexpectedParameterMode(mode, self.currentIndex)
+
+    def _getValueForParameter(self, paramPosition):
+        # reading from a symbolic address gives us something we know nothing about, but that only matters if
+        # the program actually ends up using it
+        try:
+            address = self._getAddressForParameter(paramPosition)
+        except EGCSymbolicError:
+            return Unknown
+
+        return self.buffer[address]
+
+    def _setValueForParameter(self, paramPosition, value):
+        # writing to a symbolic address could clobber anything, so there's no recovering from it
+        if self._parameterModes[paramPosition] != ParameterMode.Immediate:
+            self._getAddressForParameter(paramPosition)
+
+        super(SymbolicComputer, self)._setValueForParameter(paramPosition, value)
+
+    def _jumpIfTrue(self):
+        self._concrete(self._getValueForParameter(0), "a jump")
+        self._concrete(self._getValueForParameter(1), "a jump target")
+        return super(SymbolicComputer, self)._jumpIfTrue()
+
+    def _jumpIfFalse(self):
+        self._concrete(self._getValueForParameter(0), "a jump")
+        self._concrete(self._getValueForParameter(1), "a jump target")
+        return super(SymbolicComputer, self)._jumpIfFalse()
+
+    def _lessThan(self):
+        self._concrete(self._getValueForParameter(0), "a comparison")
+        self._concrete(self._getValueForParameter(1), "a comparison")
+        return super(SymbolicComputer, self)._lessThan()
+
+    def _equals(self):
+        self._concrete(self._getValueForParameter(0), "a comparison")
+        self._concrete(self._getValueForParameter(1), "a comparison")
+        return super(SymbolicComputer, self)._equals()
+
+    def _adjustRelativeBase(self):
+        self._concrete(self._getValueForParameter(0), "the relative base")
+        return super(SymbolicComputer, self)._adjustRelativeBase()
+
+
+def deriveOutputPolynomial(program, symbols, outputAddress=0):
+    """
+    Runs a program with symbols in place of some of its values
+
+    :param list[int] program: the parsed intcode program
+    :param dict symbols: the name of the symbol to place at each address, mapped to that address,
+                         eg {1: 'noun', 2: 'verb'}
+    :param int outputAddress: the address holding the program's result once it halts
+
+    :return Polynomial|int: the program's result in terms of the symbols
+    """
+    buffer = list(program)
+    for address, name in symbols.items():
+        buffer[address] = Polynomial.Symbol(name)
+
+    computer = SymbolicComputer(buffer)
+    computer.Run()
+
+    result = computer.buffer[outputAddress]
+    if result is Unknown:
+        raise EGCSymbolicError("the output was read from a symbolic address", computer.currentIndex)
+
+    return result
+
+
+def solvePolynomial(polynomial, target, ranges):
+    """
+    Find values for every symbol, within their ranges, that make the polynomial equal the target.
+    Affine polynomials are solved for their last symbol directly, anything else is evaluated over every
+    combination of values, which is still far cheaper than running the program for each of them
+
+    :param Polynomial|int polynomial: the polynomial to solve
+    :param int target: the value we want
+    :param dict ranges: the range of values to consider mapped to each symbol's name, in search order,
+                        eg {'noun': range(100), 'verb': range(100)}
+
+    :return dict: the first solution found searching in order, as values mapped to symbol names, or None
+    """
+    names = list(ranges)
+
+    if isinstance(polynomial, int):
+        if polynomial != target:
+            return None
+        return {name: ranges[name][0] for name in names}
+
+    if polynomial.IsAffine() and polynomial.Coefficient(names[-1]):
+        # everything but the last symbol gets searched, and the last is solved for
+        last = names[-1]
+        coefficient = polynomial.Coefficient(last)
+        for values in itertools.product(*[ranges[name] for name in names[:-1]]):
+            values = dict(zip(names[:-1], values))
+            values[last] = 0
+
+            remainder = target - polynomial.Evaluate(values)
+            if remainder % coefficient == 0 and remainder // coefficient in ranges[last]:
+                values[last] = remainder // coefficient
+                return values
+
+        return None
+
+    for values in itertools.product(*[ranges[name] for name in names]):
+        values = dict(zip(names, values))
+        if polynomial.Evaluate(values) == target:
+            return values
+
+    return None
@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from egc.analysis import Instruction, disassemble, buildControlFlowGraph, formatInstruction
+
+import day05
+import day09
+
+
+class TestAnalysis(TestCase):
+    def setUp(self):
+        super(TestAnalysis, self).setUp()
+
+        self.sampleProgram = [1, 0, 0, 0, 2, 4, 4, 4, 99]
+        # counts address 11 down from 3 to 0
+        self.loopProgram = [1001, 11, -1, 11, 1005, 11, 0, 99, 0, 0, 0, 3]
+        # jumps to an add at 14, then rewrites it into a mul and runs it again
+        self.selfModifyingProgram = [1106,0,14,1101,0,2,14,1101,0,1,33,1105,1,14,1,30,31,32,1006,33,3,99,
+                                     0,0,0,0,0,0,0,0,3,4,0,0]
+
+    def test_disassemble(self):
+        instructions = disassemble(self.sampleProgram)
+
+        self.assertEqual(instructions, [Instruction(0, 1, (0, 0, 0), (0, 0, 0), 4),
+                                        Instruction(4, 2, (0, 0, 0), (4, 4, 4), 4),
+                                        Instruction(8, 99, (), (), 1)])
+        self.assertEqual(formatInstruction(instructions[0]), '     0: _add [0], [0], [0]')
+
+        # anything that isn't an instruction is a word of data
+        self.assertEqual(disassemble([0, 109, -3])[0], Instruction(0, None, (), (0,), 1))
+        self.assertEqual(formatInstruction(disassemble([109, -3])[0]), '     0: _adjustRelativeBase #-3')
+
+    def test_loop(self):
+        graph = buildControlFlowGraph(self.loopProgram)
+
+        self.assertEqual(sorted(graph.blocks), [0, 7])
+        self.assertEqual(graph.blocks[0].successors, [0, 7])
+        self.assertEqual(graph.Predecessors()[0], [0])
+        self.assertEqual(graph.codeAddresses, set(range(8)))
+        self.assertFalse(graph.isSelfModifying)
+
+    def test_selfModifying(self):
+        graph = buildControlFlowGraph(self.selfModifyingProgram)
+
+        self.assertEqual(graph.selfModifyingWrites, [(3, 14)])
+        self.assertEqual({start: (block.end, block.successors) for start, block in graph.blocks.items()},
+                         {0: (3, [14]), 3: (14, [14]), 14: (21, [3, 21]), 21: (22, [])})
+        self.assertEqual(graph.codeAddresses, set(range(22)), msg="The data after the halt isn't code")
+
+    def test_puzzleInputs(self):
+        graph = buildControlFlowGraph(day05.DaySolver05().ProcessInput())
+        # day05 patches its own instruction at address 6 with the input before running it
+        self.assertEqual(graph.selfModifyingWrites, [(2, 6)])
+        self.assertEqual(graph.invalidAddresses, [6])
+
+        graph = buildControlFlowGraph(day09.DaySolver09().ProcessInput())
+        self.assertFalse(graph.isSelfModifying)
+        for block in graph.blocks.values():
+            for successor in block.successors:
+                self.assertIn(successor, graph.blocks)
@@ -0,0 +1,100 @@
+from unittest import TestCase, skipIf
+
+from egc.batch import BatchComputer, numpy
+from egc.computer import ElfGuidanceComputer, EGCOutOfRangeError
+
+import day02
+import day05
+import day09
+
+
+@skipIf(numpy is None, "NumPy is not installed")
+class TestBatchComputer(TestCase):
+    def test_Day02Sweep(self):
+        program = day02.DaySolver02().ProcessInput()
+
+        batch = BatchComputer(program, 10000)
+        candidates = numpy.arange(10000)
+        batch.memory[:, 1] = candidates // 100
+        batch.memory[:, 2] = candidates % 100
+        batch.Run()
+
+        self.assertTrue(batch.finished.all())
+        self.assertEqual(list(numpy.flatnonzero(batch.memory[:, 0] == day02.TARGET_OUTPUT)), [8609])
+
+        for noun, verb in ((0, 0), (12, 2), (99, 99)):
+            computer = ElfGuidanceComputer(list(program), noun=noun, verb=verb)
+            computer.Run()
+            self.assertEqual(batch.memory[noun * 100 + verb, 0], computer.buffer[0])
+
+    def test_Day05Divergence(self):
+        solver = day05.DaySolver05()
+        inputs = [1, 7, 8, 9]
+        for test in solver.testDataPartTwo:
+            program = solver.ProcessInput(test)
+
+            batch = BatchComputer(program, len(inputs))
+            for instance, value in enumerate(inputs):
+                batch.SetInputs(instance, [value])
+            batch.Run()
+
+            for instance, value in enumerate(inputs):
+                computer = ElfGuidanceComputer(list(program))
+                computer.input = value
+                computer.Run()
+                self.assertEqual(batch.outputs[instance], [computer.output],
+                                 msg="Instance with input {} differed on {}".format(value, test))
+
+    def test_Day09Overflow(self):
+        quine = [109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99]
+        batch = BatchComputer(quine, 2, memorySize=128)
+        batch.Run()
+        self.assertEqual(batch.outputs, [quine, quine])
+
+        for test, expected in day09.DaySolver09().testDataPartOne.items():
+            batch = BatchComputer(day09.DaySolver09().ProcessInput(test), 3)
+            batch.Run()
+            self.assertEqual([outputs[-1] for outputs in batch.outputs], [expected] * 3)
+
+        # squares and outputs the value at address 7, which overflows 64 bits in the first instance only
+        batch = BatchComputer([2, 7, 7, 7, 4, 7, 99, 2 ** 40], 2)
+        batch.memory[1, 7] = 3
+        batch.Run()
+        self.assertTrue(batch.isObject)
+        self.assertEqual(batch.outputs, [[2 ** 80], [9]])
+
+        # the most negative int64 is its own absolute value, so adding it to itself still has to promote
+        batch = BatchComputer([1, 7, 7, 7, 4, 7, 99, -2 ** 63], 1)
+        batch.Run()
+        self.assertTrue(batch.isObject)
+        self.assertEqual(batch.outputs, [[-2 ** 64]])
+
+    def test_runOffTheEnd(self):
+        # jumps to an add at the very end if address 1 is set, otherwise halts
+        programs = [[1105, 1, 4, 99, 1101, 2, 3, 0], [1105, 0, 4, 99, 1101, 2, 3, 0]]
+        batch = BatchComputer(programs[0], 2)
+        batch.memory[1, 1] = 0
+        batch.Run()
+
+        for instance, program in enumerate(programs):
+            computer = ElfGuidanceComputer(list(program))
+            computer.Run()
+            self.assertEqual(batch.memory[instance].tolist(), computer.buffer)
+            self.assertEqual(batch.finished[instance], computer.finished)
+        self.assertEqual(batch.currentIndices[0], len(programs[0]))
+
+        batch = BatchComputer([1105, 1, 9, 99], 1)
+        with self.assertRaises(EGCOutOfRangeError):
+            batch.Run()
+
+    def test_blockedOnInput(self):
+        batch = BatchComputer([3, 0, 4, 0, 99], 2)
+        batch.SetInputs(0, [5])
+        batch.Run()
+
+        self.assertEqual(list(batch.finished), [True, False])
+        self.assertTrue(batch.blocked[1])
+
+        batch.SetInputs(1, [6])
+        batch.Run()
+        self.assertEqual(batch.outputs, [[5], [6]])
@@ -0,0 +1,154 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+from unittest import TestCase
+
+from egc.checkpoint import CHECKPOINT_MAGIC, EGCCheckpointError, encodeCheckpoint, decodeCheckpoint, saveCheckpoint, \
+    loadCheckpoint, runWithCheckpoints
+from egc.computer import ElfGuidanceComputer, ExtraMemoryComputer, ExpandedMemoryBuffer
+from egc.encoding import encodeVarint
+
+import day07
+import day09
+
+
+class TestCheckpoint(TestCase):
+    def setUp(self):
+        super(TestCheckpoint, self).setUp()
+
+        # outputs its input doubled, then the value at address 100
+        self.program = [3, 13, 1002, 13, 2, 13, 4, 13, 4, 100, 99, 0, 0, 0]
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(TestCheckpoint, self).tearDown()
+
+    def assertRoundTrip(self, computer):
+        """
+        Checkpoint a computer part way through its program, then check the restored computer is in the same
+        state and finishes the same way
+        """
+        restored = decodeCheckpoint(encodeCheckpoint(computer))
+
+        self.assertIs(type(restored), type(computer))
+        self.assertEqual(list(restored.buffer), list(computer.buffer))
+        for key in ('currentIndex', 'relativeBase', 'finished', 'cycles', 'input', 'output', 'inputChannel',
+                    'outputChannel'):
+            self.assertEqual(getattr(restored, key), getattr(computer, key), msg=key)
+
+        computer.Run()
+        restored.Run()
+        self.assertEqual(restored.output, computer.output)
+        self.assertEqual(list(restored.buffer), list(computer.buffer))
+
+    def test_roundTripEachComputer(self):
+        for computerClass in (ElfGuidanceComputer, ExtraMemoryComputer, day09.Day09Computer):
+            computer = computerClass(list(self.program) + [0] * 87 + [-7])
+            computer.input = 21
+            computer.RunFor(2)
+
+            self.assertRoundTrip(computer)
+
+    def test_roundTripDay07(self):
+        amplifier = day07.Day07ElfGuidanceComputer('a', day07.DaySolver07().ProcessInput())
+        amplifier.phase = 3
+        amplifier.input = 9
+        amplifier.RunFor(3)
+        self.assertRoundTrip(amplifier)
+
+        concurrent = day07.Day07ConcurrentComputer('e', day07.DaySolver07().ProcessInput())
+        concurrent.inputChannel.extend([3, 0])
+        concurrent.RunFor(5)
+        self.assertRoundTrip(concurrent)
+
+    def test_bigIntegersAndSparseMemory(self):
+        computer = day09.Day09Computer([104, 1125899906842624, 99])
+        computer.buffer[5000000] = -2 ** 80
+        restored = decodeCheckpoint(encodeCheckpoint(computer))
+
+        self.assertEqual(restored.buffer[5000000], -2 ** 80)
+        self.assertEqual(restored.buffer.allocatedPages, computer.buffer.allocatedPages)
+
+        restored.Run()
+        self.assertEqual(restored.output, [1125899906842624])
+
+        computer = ElfGuidanceComputer([])
+        computer.buffer = ExpandedMemoryBuffer([1, 0, 0, 0, 99])
+        computer.buffer[3000] = 2 ** 70
+        restored = decodeCheckpoint(encodeCheckpoint(computer))
+        self.assertEqual(dict(restored.buffer), dict(computer.buffer))
+
+    def test_resumeFromDisk(self):
+        solver = day09.DaySolver09()
+        expected = day09.Day09Computer(solver.ProcessInput())
+        expected.input = 1
+        expected.Run()
+
+        computer = day09.Day09Computer(solver.ProcessInput())
+        computer.input = 1
+        computer.RunFor(1000)
+
+        path = os.path.join(self.directory, 'day09.egck')
+        saveCheckpoint(computer, path)
+        resumed = loadCheckpoint(path)
+        resumed.Run()
+
+        self.assertEqual(resumed.output, expected.output)
+        self.assertEqual(resumed.cycles, expected.cycles)
+
+    def test_runWithCheckpoints(self):
+        path = os.path.join(self.directory, 'loop.egck')
+        # counts address 11 down from 3 to 0
+        computer = ElfGuidanceComputer([1001, 11, -1, 11, 1005, 11, 0, 99, 0, 0, 0, 3])
+        runWithCheckpoints(computer, path, 2)
+
+        restored = loadCheckpoint(path)
+        self.assertTrue(restored.finished)
+        self.assertEqual(restored.cycles, 7)
+        self.assertEqual(restored.buffer[11], 0)
+        self.assertFalse(os.path.exists(path + '.tmp'))
+
+    def test_roundTripWithBudget(self):
+        solver = day09.DaySolver09()
+        computer = day09.Day09Computer(solver.ProcessInput())
+        computer.input = 1
+        computer.SetBudget(maxCycles=100000, seconds=60)
+        computer.RunFor(1000)
+
+        path = os.path.join(self.directory, 'budget.egck')
+        runWithCheckpoints(computer, path, 500)
+        self.assertTrue(computer.finished)
+
+        restored = decodeCheckpoint(encodeCheckpoint(computer))
+        self.assertEqual(restored.maxCycles, 100000)
+        self.assertTrue(0 < restored.deadline - time.monotonic() <= 60,
+                        msg="The deadline should count down from when the checkpoint is loaded")
+        self.assertEqual(restored.output, computer.output)
+
+    def test_rejectsUnknownData(self):
+        with self.assertRaises(EGCCheckpointError):
+            decodeCheckpoint(b'not a checkpoint')
+
+        # only Elf Guidance Computers that are already loaded can be loaded from a checkpoint, and loading one
+        # mustn't import the module the checkpoint names
+        sys.modules.pop('this', None)
+        data = encodeCheckpoint(ElfGuidanceComputer(list(self.program)))
+        for moduleName, className in (('os', 'system'), ('collections', 'OrderedDict'), ('egc', 'Missing'),
+                                      ('this', 'ElfGuidanceComputer'), ('egc.computer', 'EGCSnapshot')):
+            forged = bytearray(CHECKPOINT_MAGIC)
+            for text in (moduleName, className):
+                encodeVarint(len(text), forged)
+                forged.extend(text.encode('utf-8'))
+            forged.extend(data[len(CHECKPOINT_MAGIC) + len('egc.computer') + len('ElfGuidanceComputer') + 2:])
+
+            with self.assertRaises(EGCCheckpointError):
+                decodeCheckpoint(forged)
+        self.assertNotIn('this', sys.modules, msg="Loading a checkpoint imported the module it named")
+
+        computer = ElfGuidanceComputer(list(self.program))
+        computer.input = object()
+        with self.assertRaises(EGCCheckpointError):
+            encodeCheckpoint(computer)
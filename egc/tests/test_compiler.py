@@ -0,0 +1,97 @@
+from unittest import TestCase
+
+from egc import compiler
+from egc.compiler import CompiledEngine
+from egc.computer import ElfGuidanceComputer, ExtraMemoryComputer, EGCBudgetExceeded
+
+import day02
+import day05
+import day09
+
+
+class TestCompiledEngine(TestCase):
+    def setUp(self):
+        super(TestCompiledEngine, self).setUp()
+
+        # jumps to an add at 14, then rewrites it into a mul and runs it again
+        self.selfModifyingProgram = [1106,0,14,1101,0,2,14,1101,0,1,33,1105,1,14,1,30,31,32,1006,33,3,99,
+                                     0,0,0,0,0,0,0,0,3,4,0,0]
+
+    def assertSameAsInterpreter(self, computerClass, program, inputValue=None):
+        interpreted = computerClass(list(program))
+        interpreted.input = inputValue
+        interpreted.Run()
+
+        compiled = computerClass(list(program))
+        compiled.input = inputValue
+        CompiledEngine(compiled).Run()
+
+        self.assertTrue(compiled.finished)
+        self.assertEqual(compiled.output, interpreted.output, msg="Output differed on {}".format(program))
+        self.assertEqual(self._memoryContents(compiled), self._memoryContents(interpreted),
+                         msg="Memory differed on {}".format(program))
+        self.assertEqual(compiled.cycles, interpreted.cycles, msg="Cycles differed on {}".format(program))
+
+    @staticmethod
+    def _memoryContents(computer):
+        # expanded memory reads untouched addresses as 0, so only compare what's actually set
+        if not isinstance(computer.buffer, list):
+            return {address: value for address, value in computer.buffer.items() if value}
+
+        return computer.buffer
+
+    def test_Day02Programs(self):
+        solver = day02.DaySolver02()
+        for test in solver.testDataPartOne:
+            self.assertSameAsInterpreter(ElfGuidanceComputer, solver.ProcessInput(test))
+
+    def test_Day05Programs(self):
+        solver = day05.DaySolver05()
+        for test in solver.testDataPartTwo:
+            for inputValue in (7, 8, 9):
+                self.assertSameAsInterpreter(ElfGuidanceComputer, solver.ProcessInput(test), inputValue)
+
+    def test_Day09Programs(self):
+        quine = [109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99]
+        self.assertSameAsInterpreter(day09.Day09Computer, quine)
+
+        solver = day09.DaySolver09()
+        for test in solver.testDataPartOne:
+            self.assertSameAsInterpreter(day09.Day09Computer, solver.ProcessInput(test))
+
+    def test_selfModifyingProgram(self):
+        for computerClass in (ElfGuidanceComputer, ExtraMemoryComputer):
+            computer = computerClass(list(self.selfModifyingProgram))
+            engine = CompiledEngine(computer)
+            engine.Run()
+
+            self.assertEqual(computer.buffer[32], 12, msg="The compiled engine executed a stale block")
+            self.assertGreater(engine.blocksInvalidated, 0)
+
+    def test_budget(self):
+        # jumps to itself forever
+        computer = ElfGuidanceComputer([1105, 1, 0])
+        computer.SetBudget(maxCycles=1000, seconds=1)
+
+        with self.assertRaises(EGCBudgetExceeded) as context:
+            CompiledEngine(computer).Run()
+        self.assertEqual(context.exception.cycles, 1000)
+
+        # a block that doesn't fit in what's left of the budget is run one instruction at a time up to it
+        computer = ElfGuidanceComputer([1101, 1, 2, 9, 1101, 3, 4, 10, 99, 0, 0])
+        computer.SetBudget(maxCycles=1)
+
+        with self.assertRaises(EGCBudgetExceeded) as context:
+            CompiledEngine(computer).Run()
+        self.assertEqual(context.exception.cycles, 1)
+        self.assertEqual(computer.buffer[9:], [3, 0])
+
+    def test_cacheIsBounded(self):
+        maxCachedBlocks = compiler.MAX_CACHED_BLOCKS
+        compiler.MAX_CACHED_BLOCKS = 4
+        compiler._compiledBlocks.clear()
+        try:
+            self.assertSameAsInterpreter(ExtraMemoryComputer, day09.DaySolver09().ProcessInput(), 1)
+            self.assertEqual(len(compiler._compiledBlocks), 4)
+        finally:
+            compiler.MAX_CACHED_BLOCKS = maxCachedBlocks
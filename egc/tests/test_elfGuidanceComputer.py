@@ -1,9 +1,20 @@
 from unittest import TestCase
 
-from egc.computer import ElfGuidanceComputer, EGCUnhandledOpcodeError, EGCOutOfRangeError
+from egc.computer import ElfGuidanceComputer, ExtraMemoryComputer, EGCUnhandledOpcodeError, EGCOutOfRangeError, \
+    decodeInstruction, instruction, AwaitingInput, EGCBudgetExceeded
 
 import day02
 
+
+class _DoublingComputer(ElfGuidanceComputer):
+    """
+    Registers a new opcode 10, which doubles the value at its parameter in place
+    """
+    @instruction(10, 2)
+    def _double(self):
+        self._setValueForParameter(0, self._getValueForParameter(0) * 2)
+        return 2
+
 class TestElfGuidanceComputer(TestCase):
     def setUp(self):
         super(TestElfGuidanceComputer, self).setUp()
@@ -14,6 +25,11 @@ class TestElfGuidanceComputer(TestCase):
         self.unknownCommandTestProgram = [-1]
         self.outOfRangeCommandTestProgram = [1, 0, 0, 0]
         self.sampleProgram = [1,0,0,0,2,4,4,4,99]
+        # outputs each input doubled, until it reads a 0
+        self.doublingProgram = [3,15,1006,15,14,102,2,15,15,4,15,1105,1,0,99,0]
+        # jumps to an add at 14, then rewrites it into a mul and runs it again
+        self.selfModifyingProgram = [1106,0,14,1101,0,2,14,1101,0,1,33,1105,1,14,1,30,31,32,1006,33,3,99,
+                                     0,0,0,0,0,0,0,0,3,4,0,0]
 
     def test__add(self):
         computer = ElfGuidanceComputer(self.addTestProgram)
@@ -52,6 +68,115 @@ class TestElfGuidanceComputer(TestCase):
 
         self.assertTrue(computer.finished, msg="We did not successfully complete the sample program")
 
+    def test_decodeInstruction(self):
+        decoded = decodeInstruction(1002)
+        self.assertEqual(decoded.opcode, 2, msg="1002 should decode to a mul")
+        self.assertEqual(decoded.modes, (0, 1, 0), msg="1002 should have modes position, immediate, position")
+        self.assertEqual(decoded.length, 4, msg="A mul should be 4 addresses long")
+
+        self.assertEqual(decodeInstruction(21101).modes, (1, 1, 2))
+        self.assertIsNone(decodeInstruction(-1).length, msg="Negative opcodes should never be known")
+
+    def test_decodeCacheInvalidation(self):
+        for computerClass in (ElfGuidanceComputer, ExtraMemoryComputer):
+            computer = computerClass(list(self.selfModifyingProgram))
+            computer.Run()
+
+            self.assertTrue(computer.finished)
+            self.assertEqual(computer.buffer[32], 12,
+                             msg="{} executed a stale cached instruction".format(computerClass.__name__))
+
+    def test_registeredInstruction(self):
+        computer = _DoublingComputer([10, 3, 99, 21])
+        computer.Run()
+        self.assertEqual(computer.buffer[3], 42, msg="The registered opcode 10 did not run")
+
+        self.assertNotIn(10, ElfGuidanceComputer._instructionSet,
+                         msg="Registering an opcode on a subclass leaked into the base class")
+
+    def test_Execute(self):
+        computer = ElfGuidanceComputer(self.doublingProgram[:])
+        execution = computer.Execute()
+
+        self.assertIs(next(execution), AwaitingInput, msg="Execute didn't ask for an input")
+        self.assertEqual(execution.send(4), 8, msg="Execute didn't yield the doubled input")
+        self.assertIs(next(execution), AwaitingInput, msg="Execute didn't ask for a second input")
+        self.assertEqual(execution.send(5), 10, msg="Execute didn't yield the second doubled input")
+
+        # a value sent in reply to an output is queued, and the 0 halts the program
+        with self.assertRaises(StopIteration):
+            execution.send(0)
+        self.assertTrue(computer.finished, msg="The program didn't finish")
+        self.assertFalse(computer.queueOutputs, msg="Outputs are still queued after Execute finished")
+
+    def test_RunDoesntQueueOutputs(self):
+        computer = ElfGuidanceComputer(self.doublingProgram[:])
+        computer.inputChannel.extend([4, 5, 0])
+        computer.Run()
+
+        self.assertEqual(computer.output, 10)
+        self.assertEqual(len(computer.outputChannel), 0, msg="Run queued outputs nothing will ever read")
+
+    def test_ExecutePipeline(self):
+        first = ElfGuidanceComputer(self.doublingProgram[:])
+        second = ElfGuidanceComputer(self.doublingProgram[:])
+
+        first.inputChannel.extend(range(1000, 0, -1))
+        first.inputChannel.append(0)
+
+        # everything the first computer outputs feeds straight into the second
+        for value in first.Execute():
+            second.inputChannel.append(value)
+        second.inputChannel.append(0)
+
+        self.assertEqual(list(second.Execute()), [value * 4 for value in range(1000, 0, -1)],
+                         msg="Piping two computers together lost or reordered values")
+
+    def test_cycles(self):
+        computer = ElfGuidanceComputer(list(self.sampleProgram))
+        computer.Run()
+        self.assertEqual(computer.cycles, 3, msg="Didn't count every instruction executed")
+
+    def test_maxCycles(self):
+        computer = ElfGuidanceComputer([1105, 1, 0])
+        computer.SetBudget(maxCycles=1000)
+
+        with self.assertRaises(EGCBudgetExceeded) as context:
+            computer.Run()
+        self.assertEqual(context.exception.cycles, 1000)
+        self.assertEqual(context.exception.position, 0)
+
+        # a program that finishes within its budget runs normally
+        computer = ElfGuidanceComputer(list(self.sampleProgram))
+        computer.SetBudget(maxCycles=3)
+        computer.Run()
+        self.assertTrue(computer.finished)
+
+    def test_deadline(self):
+        computer = ElfGuidanceComputer([1105, 1, 0])
+        computer.SetBudget(seconds=0.05)
+
+        with self.assertRaises(EGCBudgetExceeded):
+            computer.Run()
+
+        execution = ElfGuidanceComputer([1105, 1, 0])
+        execution.SetBudget(maxCycles=10)
+        with self.assertRaises(EGCBudgetExceeded):
+            list(execution.Execute())
+
+    def test_RunFor(self):
+        program = day02.DaySolver02().ProcessInput()
+
+        sliced = ElfGuidanceComputer(list(program), noun=12, verb=2)
+        while not sliced.finished:
+            self.assertLessEqual(sliced.RunFor(5), 5, msg="RunFor ran more instructions than it was asked to")
+
+        computer = ElfGuidanceComputer(list(program), noun=12, verb=2)
+        computer.Run()
+
+        self.assertEqual(sliced.buffer, computer.buffer, msg="Running in slices changed the result")
+        self.assertEqual(sliced.cycles, computer.cycles)
+
     def test_Day02(self):
         try:
             day02.Main()
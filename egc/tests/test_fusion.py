@@ -0,0 +1,89 @@
+from unittest import TestCase
+
+from egc.computer import ElfGuidanceComputer, EGCBudgetExceeded
+from egc import fusion
+from egc.fusion import FusedEngine
+
+import day05
+import day09
+
+
+class TestFusedEngine(TestCase):
+    def setUp(self):
+        super(TestFusedEngine, self).setUp()
+
+        # counts address 11 down from 3 to 0
+        self.loopProgram = [1001, 11, -1, 11, 1005, 11, 0, 99, 0, 0, 0, 3]
+        # the multiply writes its own jump's target, so the jump it was fused with has to read the new one
+        self.selfModifyingProgram = [1001, 20, 1, 20, 2, 20, 21, 10, 1105, 1, 0, 99,
+                                     0, 0, 0, 0, 0, 0, 0, 0, -1, 11]
+
+    def assertSameAsInterpreter(self, computerClass, program, inputValue=None):
+        interpreted = computerClass(list(program))
+        interpreted.input = inputValue
+        interpreted.Run()
+
+        fused = computerClass(list(program))
+        fused.input = inputValue
+        engine = FusedEngine(fused)
+        engine.Run()
+
+        self.assertTrue(fused.finished)
+        self.assertEqual(fused.output, interpreted.output, msg="Output differed on {}".format(program))
+        self.assertEqual(list(fused.buffer), list(interpreted.buffer), msg="Memory differed on {}".format(program))
+        self.assertEqual(fused.cycles, interpreted.cycles)
+
+        return engine
+
+    def test_loop(self):
+        engine = self.assertSameAsInterpreter(ElfGuidanceComputer, self.loopProgram)
+        self.assertEqual(engine.patternCounts, {'decrement-branch': 3})
+
+    def test_selfModifyingProgram(self):
+        engine = self.assertSameAsInterpreter(ElfGuidanceComputer, self.selfModifyingProgram)
+        self.assertGreater(engine.pairsInvalidated, 0, msg="Rewriting the fused branch didn't invalidate it")
+
+    def test_overlappingPairs(self):
+        # an add and jump at 0, and a relative base adjustment and jump decoded from the add's parameters at 1
+        engine = FusedEngine(ElfGuidanceComputer([1101, 9, 5, 1006, 1105, 1, 0]))
+        self.assertIsNot(engine._fuse(0), False)
+        self.assertIsNot(engine._fuse(1), False)
+
+        engine._invalidate(3)
+        self.assertNotIn(0, engine._fusions, msg="A write into overlapping pairs has to throw away both")
+        self.assertNotIn(1, engine._fusions)
+        self.assertEqual(engine._coverage, {})
+        self.assertEqual(engine.pairsInvalidated, 2)
+
+    def test_Day05(self):
+        solver = day05.DaySolver05()
+        for test in solver.testDataPartTwo:
+            for inputValue in (7, 8, 9):
+                self.assertSameAsInterpreter(ElfGuidanceComputer, solver.ProcessInput(test), inputValue)
+
+        engine = self.assertSameAsInterpreter(ElfGuidanceComputer, solver.ProcessInput(), 5)
+        self.assertGreater(engine.dispatchesSaved, 0)
+
+    def test_Day09(self):
+        program = day09.DaySolver09().ProcessInput()
+        engine = self.assertSameAsInterpreter(day09.Day09Computer, program, 1)
+
+        self.assertEqual(set(engine.patternCounts), {'compare-branch', 'arithmetic-branch', 'relative-base-jump'})
+
+    def test_budget(self):
+        computer = ElfGuidanceComputer(list(self.loopProgram))
+        computer.SetBudget(maxCycles=3)
+
+        with self.assertRaises(EGCBudgetExceeded) as context:
+            FusedEngine(computer).Run()
+        self.assertEqual(context.exception.cycles, 3)
+
+    def test_cacheIsBounded(self):
+        maxCachedPairs = fusion.MAX_CACHED_PAIRS
+        fusion.MAX_CACHED_PAIRS = 2
+        fusion._fusedPairs.clear()
+        try:
+            self.assertSameAsInterpreter(ElfGuidanceComputer, day05.DaySolver05().ProcessInput(), 5)
+            self.assertEqual(len(fusion._fusedPairs), 2)
+        finally:
+            fusion.MAX_CACHED_PAIRS = maxCachedPairs
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from egc import loader
+
+
+class TestLoader(TestCase):
+    def setUp(self):
+        super(TestLoader, self).setUp()
+
+        self.directory = tempfile.mkdtemp()
+        self.cachePath = os.path.join(self.directory, 'program.egcp')
+        loader.clearTemplates()
+
+    def tearDown(self):
+        loader.clearTemplates()
+        shutil.rmtree(self.directory)
+        super(TestLoader, self).tearDown()
+
+    def test_templatesAreShared(self):
+        template = loader.programTemplate('1,0,0,3,99\n')
+        self.assertEqual(template, (1, 0, 0, 3, 99))
+        self.assertIs(loader.programTemplate('1,0,0,3,99'), template)
+
+        first = loader.loadProgram('1,0,0,3,99')
+        first[0] = 2
+        self.assertEqual(loader.loadProgram('1,0,0,3,99'), [1, 0, 0, 3, 99])
+
+    def test_diskCache(self):
+        program = loader.loadProgram('104,-5,99', self.cachePath)
+        self.assertTrue(os.path.exists(self.cachePath))
+
+        loader.clearTemplates()
+        self.assertEqual(loader._readCache(self.cachePath, loader._hashProgram('104,-5,99')), (104, -5, 99))
+        self.assertEqual(loader.loadProgram('104,-5,99', self.cachePath), program)
+
+        # the cache belongs to a different program now, so it's ignored and replaced
+        self.assertEqual(loader.loadProgram('104,7,99', self.cachePath), [104, 7, 99])
+        self.assertEqual(loader._readCache(self.cachePath, loader._hashProgram('104,7,99')), (104, 7, 99))
+
+    def test_diskCacheBigIntegers(self):
+        text = '104,{},99'.format(-2 ** 70)
+        loader.loadProgram(text, self.cachePath)
+
+        loader.clearTemplates()
+        self.assertEqual(loader.loadProgram(text, self.cachePath), [104, -2 ** 70, 99])
+
+    def test_corruptDiskCache(self):
+        key = loader._hashProgram('104,-5,99')
+        header = loader.PROGRAM_CACHE_MAGIC + key
+        for body in (b'', bytes([loader._INT64]) + b'\x01\x02\x03', bytes([loader._VARINT, 0x81]), b'\x07\x00'):
+            with open(self.cachePath, 'wb') as fh:
+                fh.write(header + body)
+
+            self.assertIsNone(loader._readCache(self.cachePath, key))
+
+            loader.clearTemplates()
+            self.assertEqual(loader.loadProgram('104,-5,99', self.cachePath), [104, -5, 99])
+            self.assertEqual(loader._readCache(self.cachePath, key), (104, -5, 99), msg="The cache wasn't rewritten")
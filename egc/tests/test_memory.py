@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+from egc.compiler import CompiledEngine
+from egc.fusion import FusedEngine
+from egc.memory import PagedMemory
+
+import day09
+
+
+class TestPagedMemory(TestCase):
+    def test_readWrite(self):
+        memory = PagedMemory([1, 2, 3], pageBits=2)
+
+        self.assertEqual([memory[i] for i in range(3)], [1, 2, 3])
+        self.assertEqual(memory[1000], 0, msg="Untouched memory should read as 0")
+        self.assertEqual(memory.allocatedPages, 1, msg="Reading untouched memory should not allocate a page")
+
+        memory[1000] = 7
+        self.assertEqual(memory[1000], 7)
+        self.assertEqual(len(memory), 1001)
+        self.assertEqual(memory.allocatedPages, 2)
+
+    def test_negativeAddress(self):
+        memory = PagedMemory([1, 2, 3])
+
+        with self.assertRaises(IndexError):
+            memory[-1]
+        with self.assertRaises(IndexError):
+            memory[-1] = 1
+        with self.assertRaises(IndexError):
+            del memory[-1]
+
+    def test_bigIntegers(self):
+        big = 1125899906842624 ** 2
+        memory = PagedMemory([big, 1, 2, 3, 4, 5], pageBits=2)
+
+        self.assertEqual(memory[0], big)
+        self.assertEqual(memory[5], 5)
+
+        memory[6] = -big
+        self.assertEqual(memory[6], -big)
+        self.assertEqual(memory[4], 4, msg="Promoting a page lost its other values")
+
+    def test_promotionOnOverflow(self):
+        # a multiply and an add that overflow 64 bits, then an add that doesn't, each on its own page
+        program = [1102, 2 ** 50, 2 ** 50, 2000, 1101, 2 ** 62, 2 ** 62, 3000, 1101, 1, 1, 4000,
+                   4, 2000, 4, 3000, 99]
+
+        for run in (lambda computer: computer.Run(),
+                    lambda computer: CompiledEngine(computer).Run(),
+                    lambda computer: FusedEngine(computer).Run()):
+            computer = day09.Day09Computer(list(program))
+            self.assertEqual(computer.buffer.promotedPages, 0)
+
+            run(computer)
+            self.assertEqual(computer.output, [2 ** 100, 2 ** 63])
+            self.assertEqual(computer.buffer[4000], 2)
+            self.assertEqual(computer.buffer.allocatedPages, 4)
+            self.assertEqual(computer.buffer.promotedPages, 2, msg="Only the overflowing pages should be promoted")
+
+    def test_copy(self):
+        memory = PagedMemory([1, 2, 3])
+        other = memory.copy()
+        other[0] = 10
+
+        self.assertEqual(memory[0], 1, msg="Writing to a copy changed the original")
+        self.assertEqual(list(other.items()), [(0, 10), (1, 2), (2, 3)])
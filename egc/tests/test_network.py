@@ -0,0 +1,52 @@
+from unittest import TestCase
+
+from egc.computer import ElfGuidanceComputer
+from egc.network import ComputerNetwork, EGCNetworkDeadlock
+
+import day07
+
+
+class _RecordingComputer(ElfGuidanceComputer):
+    def __init__(self, *args, **kwargs):
+        super(_RecordingComputer, self).__init__(*args, **kwargs)
+        self.outputs = []
+
+    def Output(self, value):
+        self.outputs.append(value)
+
+
+class TestComputerNetwork(TestCase):
+    def setUp(self):
+        super(TestComputerNetwork, self).setUp()
+
+        # outputs each input doubled, and halts after passing on a 0
+        self.doublingProgram = [3,12,102,2,12,12,4,12,1005,12,0,99,0]
+
+    def test_feedbackLoop(self):
+        solver = day07.DaySolver07()
+        for (data, phaseOrder), expected in solver.testDataPartTwo.items():
+            program = solver.ProcessInput(data)
+            amplifiers = {ampID: day07.Day07ConcurrentComputer(ampID, program[:]) for ampID in solver.amplifierIDs}
+
+            result = solver.testPhaseOrderConcurrent(amplifiers, [int(phase) for phase in phaseOrder])
+            self.assertEqual(result, expected, msg="The feedback loop gave the wrong signal")
+
+    def test_fanOut(self):
+        computers = {computerID: _RecordingComputer(self.doublingProgram[:]) for computerID in 'abc'}
+        network = ComputerNetwork(computers, {'a': ['b', 'c']})
+        for value in (1, 2, 3, 0):
+            network.Send('a', value)
+
+        network.Run()
+
+        self.assertEqual(computers['a'].outputs, [2, 4, 6, 0])
+        self.assertEqual(computers['b'].outputs, [4, 8, 12, 0], msg="b didn't receive everything a output")
+        self.assertEqual(computers['c'].outputs, [4, 8, 12, 0], msg="c didn't receive everything a output")
+        self.assertTrue(all(computer.finished for computer in computers.values()))
+
+    def test_deadlock(self):
+        computers = {computerID: ElfGuidanceComputer([3, 0, 4, 0, 99]) for computerID in 'ab'}
+        network = ComputerNetwork(computers, {'a': 'b', 'b': 'a'})
+
+        with self.assertRaises(EGCNetworkDeadlock):
+            network.Run()
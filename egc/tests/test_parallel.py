@@ -0,0 +1,84 @@
+import functools
+from unittest import TestCase
+
+from egc.parallel import parallelSearch, parallelMax
+from egc.symbolic import EGCSymbolicError
+
+import day02
+import day07
+
+
+class TestParallelSearch(TestCase):
+    def setUp(self):
+        super(TestParallelSearch, self).setUp()
+
+        # leaves the sum of the values at the noun and verb addresses at address 0,
+        # where the value at each address from 5 onwards is the address minus 5
+        self.program = [1, 0, 0, 0, 99] + list(range(10))
+        self.sumsToSeven = functools.partial(day02.producesOutput, target=7)
+
+    def test_serialSearch(self):
+        candidates = [(noun, verb) for noun in range(5, 15) for verb in range(5, 15)]
+
+        self.assertEqual(parallelSearch(self.program, candidates, self.sumsToSeven, workers=1), (5, 12))
+
+    def test_parallelSearch(self):
+        candidates = ((noun, verb) for noun in range(5, 15) for verb in range(5, 15))
+
+        found = parallelSearch(self.program, candidates, self.sumsToSeven, workers=2, batchSize=3)
+        self.assertEqual(sum(found) - 10, 7)
+
+    def test_notFound(self):
+        candidates = [(noun, verb) for noun in range(5, 8) for verb in range(5, 8)]
+
+        self.assertIsNone(parallelSearch(self.program, candidates, self.sumsToSeven, workers=1))
+        self.assertIsNone(parallelSearch(self.program, candidates, self.sumsToSeven, workers=2, batchSize=2))
+
+    def test_Day02Search(self):
+        solver = day02.DaySolver02()
+        solver.workers = 2
+
+        candidates = ((noun, verb) for noun in range(0, 100) for verb in range(0, 100))
+        self.assertEqual(parallelSearch(solver.ProcessInput(), candidates, day02.producesOutput, workers=2), (86, 9))
+
+        # make the solver fall back to searching, as it would for a program that branches on the noun or verb
+        def branches(program, symbols):
+            raise EGCSymbolicError("the noun is a branch condition", 0)
+
+        deriveOutputPolynomial = day02.deriveOutputPolynomial
+        day02.deriveOutputPolynomial = branches
+        try:
+            self.assertEqual(solver.SolvePartTwo(), 8609)
+        finally:
+            day02.deriveOutputPolynomial = deriveOutputPolynomial
+
+
+def _sumAtZero(program, nounVerb):
+    noun, verb = nounVerb
+    return program[noun] + program[verb]
+
+
+class TestParallelMax(TestCase):
+    def setUp(self):
+        super(TestParallelMax, self).setUp()
+
+        self.program = [1, 0, 0, 0, 99] + list(range(10))
+
+    def test_parallelMax(self):
+        candidates = [(noun, verb) for noun in range(5, 15) for verb in range(5, 15)]
+
+        self.assertEqual(parallelMax(self.program, candidates, _sumAtZero, workers=1), (18, (14, 14)))
+        self.assertEqual(parallelMax(self.program, iter(candidates), _sumAtZero, workers=2, batchSize=7),
+                         (18, (14, 14)))
+
+    def test_noCandidates(self):
+        self.assertIsNone(parallelMax(self.program, [], _sumAtZero, workers=1))
+        self.assertIsNone(parallelMax(self.program, [], _sumAtZero, workers=2))
+
+    def test_Day07(self):
+        solver = day07.DaySolver07()
+        solver.processed = solver.ProcessInput()
+        solver.workers = 2
+
+        self.assertEqual(solver.SolvePartOne(), 118936)
+        self.assertEqual(solver.SolvePartTwo(), 57660948)
@@ -0,0 +1,74 @@
+import io
+import json
+from unittest import TestCase
+
+from egc.computer import ElfGuidanceComputer
+from egc.profiler import Profiler
+from egc.trace import RingBufferTracer
+
+import day09
+
+
+class TestProfiler(TestCase):
+    def setUp(self):
+        super(TestProfiler, self).setUp()
+
+        self.sampleProgram = [1, 0, 0, 0, 2, 4, 4, 4, 99]
+        # counts address 11 down from 3 to 0
+        self.loopProgram = [1001, 11, -1, 11, 1005, 11, 0, 99, 0, 0, 0, 3]
+
+    def test_counts(self):
+        computer = ElfGuidanceComputer(list(self.loopProgram))
+        profiler = Profiler()
+        computer.SetProfiler(profiler)
+        computer.Run()
+
+        self.assertEqual(profiler.opcodeCounts, {1: 3, 5: 3, 99: 1})
+        self.assertEqual(profiler.modeCounts, {(1, (0, 1, 0)): 3, (5, (0, 1)): 3, (99, ()): 1})
+        self.assertEqual(profiler.HotAddresses(2), [(0, 3), (4, 3)])
+        self.assertEqual(profiler.instructions, 7)
+        self.assertEqual(set(profiler.handlerTimes), {1, 5, 99})
+
+    def test_export(self):
+        computer = ElfGuidanceComputer(list(self.sampleProgram))
+        profiler = Profiler()
+        computer.SetProfiler(profiler)
+        computer.Run()
+
+        fh = io.StringIO()
+        profiler.WriteJSON(fh)
+        profile = json.loads(fh.getvalue())
+        self.assertEqual(profile['instructions'], 3)
+        self.assertEqual(profile['opcodes']['1']['name'], '_add')
+        self.assertEqual(profile['modes'], {'1:000': 1, '2:000': 1, '99:': 1})
+
+        self.assertEqual(profiler.CollapsedStacks(), ['egc;_add;@0 1', 'egc;_mul;@4 1', 'egc;_complete;@8 1'])
+
+    def test_detach(self):
+        computer = ElfGuidanceComputer(list(self.sampleProgram))
+        profiler = Profiler()
+        tracer = RingBufferTracer(capacity=10)
+        computer.SetProfiler(profiler)
+        computer.SetTracer(tracer)
+        computer.Run()
+
+        # profiling and tracing at the same time still records everything to both
+        self.assertEqual(len(tracer), 3)
+        self.assertEqual(profiler.instructions, 3)
+
+        computer.SetProfiler(None)
+        computer.SetTracer(None)
+        self.assertNotIn('_processCurrentCommand', computer.__dict__,
+                         msg="The unprofiled computer is still running the profiled command processor")
+
+    def test_profiledDay09(self):
+        program = day09.DaySolver09().ProcessInput()
+        computer = day09.Day09Computer(list(program))
+        computer.input = 1
+
+        profiler = Profiler()
+        computer.SetProfiler(profiler)
+        computer.Run()
+
+        self.assertEqual(computer.output, [3380552333])
+        self.assertEqual(profiler.opcodeCounts[4], 1)
@@ -0,0 +1,73 @@
+from unittest import TestCase
+
+from egc.computer import ElfGuidanceComputer, ExtraMemoryComputer
+
+import day09
+
+
+class TestSnapshot(TestCase):
+    def setUp(self):
+        super(TestSnapshot, self).setUp()
+
+        # outputs its input doubled, then the value at address 100
+        self.program = [3, 13, 1002, 13, 2, 13, 4, 13, 4, 100, 99, 0, 0, 0]
+
+    def test_forkSharesNothingVisible(self):
+        for computerClass in (ElfGuidanceComputer, ExtraMemoryComputer):
+            program = list(self.program) + [0] * 100
+            computer = computerClass(program)
+            computer.input = 21
+            computer.step()
+
+            fork = computer.Fork()
+            fork.Run()
+            computer.buffer[100] = 5
+            computer.Run()
+
+            self.assertEqual(fork.buffer[13], 42)
+            self.assertEqual(fork.output, 0, msg="A write to the original leaked into the {} fork".format(
+                computerClass.__name__))
+            self.assertEqual(computer.output, 5)
+
+    def test_snapshotFromCommonPoint(self):
+        # snapshot before any input is consumed, and branch a run per input from there
+        computer = day09.Day09Computer(list(self.program))
+        snapshot = computer.Snapshot()
+
+        outputs = []
+        for value in range(3):
+            branch = snapshot.CreateComputer()
+            branch.input = value
+            branch.Run()
+            outputs.append(branch.output)
+
+        self.assertEqual(outputs, [[0, 0], [2, 0], [4, 0]],
+                         msg="Forked computers should not share their output buffers")
+        self.assertEqual(computer.output, [])
+
+    def test_restore(self):
+        computer = ExtraMemoryComputer(list(self.program))
+        computer.input = 1
+        computer.step()
+        snapshot = computer.Snapshot()
+
+        computer.Run()
+        self.assertTrue(computer.finished)
+
+        computer.Restore(snapshot)
+        self.assertFalse(computer.finished)
+        self.assertEqual(computer.currentIndex, snapshot.currentIndex)
+        self.assertEqual(computer.buffer[13], 1)
+
+        with self.assertRaises(TypeError):
+            ElfGuidanceComputer([99]).Restore(snapshot)
+
+    def test_copyOnWrite(self):
+        computer = ExtraMemoryComputer(list(self.program))
+        fork = computer.Fork()
+
+        self.assertIs(fork.buffer._pages[0], computer.buffer._pages[0], msg="Forked memory should share its pages")
+
+        fork.buffer[0] = 4
+        self.assertIsNot(fork.buffer._pages[0], computer.buffer._pages[0])
+        self.assertEqual(computer.buffer[0], 3)
@@ -0,0 +1,56 @@
+from unittest import TestCase
+
+from egc.symbolic import Polynomial, EGCSymbolicError, deriveOutputPolynomial, solvePolynomial
+
+import day02
+
+
+class TestSymbolic(TestCase):
+    def test_polynomialArithmetic(self):
+        noun = Polynomial.Symbol('noun')
+        verb = Polynomial.Symbol('verb')
+
+        affine = noun * 3 + verb + 5
+        self.assertTrue(affine.IsAffine())
+        self.assertEqual(affine.Coefficient('noun'), 3)
+        self.assertEqual(affine.Coefficient(), 5)
+        self.assertEqual(affine.Evaluate({'noun': 2, 'verb': 1}), 12)
+
+        product = affine * noun
+        self.assertFalse(product.IsAffine())
+        self.assertEqual(product.Coefficient('noun', 'noun'), 3)
+
+        self.assertEqual(affine + noun * -3 + verb * -1, 5, msg="Constant results should simplify to an int")
+
+    def test_derivePolynomial(self):
+        # like day02, the noun and verb are the first instruction's parameters, and get used from then on
+        # as mem[0] = mem[1] * 3 + mem[2]
+        program = [1, 0, 0, 3, 1002, 1, 3, 0, 1, 0, 2, 0, 99]
+        polynomial = deriveOutputPolynomial(program, {1: 'noun', 2: 'verb'})
+
+        self.assertEqual(polynomial, Polynomial.Symbol('noun') * 3 + Polynomial.Symbol('verb'))
+        self.assertEqual(solvePolynomial(polynomial, 20, {'noun': range(10), 'verb': range(10)}),
+                         {'noun': 4, 'verb': 8})
+        self.assertIsNone(solvePolynomial(polynomial, 1000, {'noun': range(10), 'verb': range(10)}))
+
+    def test_nonAffine(self):
+        # mem[0] = mem[1] * mem[2], which still solves by evaluating the polynomial
+        program = [1, 0, 0, 3, 2, 1, 2, 0, 99]
+        polynomial = deriveOutputPolynomial(program, {1: 'noun', 2: 'verb'})
+
+        self.assertEqual(solvePolynomial(polynomial, 12, {'noun': range(10), 'verb': range(10)}),
+                         {'noun': 2, 'verb': 6})
+
+    def test_branchingOnSymbols(self):
+        # jumps if mem[1] is non zero
+        program = [1, 0, 0, 3, 1005, 1, 8, 99, 99]
+
+        with self.assertRaises(EGCSymbolicError):
+            deriveOutputPolynomial(program, {1: 'noun'})
+
+    def test_Day02(self):
+        solver = day02.DaySolver02()
+        polynomial = deriveOutputPolynomial(solver.ProcessInput(), {1: 'noun', 2: 'verb'})
+
+        self.assertTrue(polynomial.IsAffine())
+        self.assertEqual(solver.SolvePartTwo(), 8609)
@@ -0,0 +1,61 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from egc.computer import ElfGuidanceComputer, ExtraMemoryComputer
+from egc.encoding import encodeVarint, decodeVarint
+from egc.trace import RingBufferTracer, BinaryTraceWriter, TraceRecord, readTrace, filterTrace
+
+
+class TestTrace(TestCase):
+    def setUp(self):
+        super(TestTrace, self).setUp()
+
+        self.sampleProgram = [1, 0, 0, 0, 2, 4, 4, 4, 99]
+        self.relativeProgram = [109, 5, 21101, 3, 4, 0, 204, 0, 99]
+
+    def test_varintRoundTrip(self):
+        values = [0, 1, -1, 63, -64, 64, 300, -300, 1125899906842624, -(2 ** 90)]
+        out = bytearray()
+        for value in values:
+            encodeVarint(value, out)
+
+        offset = 0
+        for value in values:
+            decoded, offset = decodeVarint(out, offset)
+            self.assertEqual(decoded, value)
+
+        self.assertEqual(offset, len(out))
+
+    def test_ringBuffer(self):
+        computer = ElfGuidanceComputer(list(self.sampleProgram))
+        tracer = RingBufferTracer(capacity=2)
+        computer.SetTracer(tracer)
+        computer.Run()
+
+        self.assertEqual(list(tracer), [TraceRecord(4, 2, (0, 0, 0), (2, 2), 4),
+                                        TraceRecord(8, 99, (0, 0, 0), (), None)])
+
+        computer.SetTracer(None)
+        self.assertNotIn('_processCurrentCommand', computer.__dict__,
+                         msg="Turning tracing off should restore the untraced command processor")
+
+    def test_binaryTrace(self):
+        fd, path = tempfile.mkstemp(suffix='.egct')
+        os.close(fd)
+        try:
+            computer = ExtraMemoryComputer(list(self.relativeProgram))
+            with BinaryTraceWriter(path) as writer:
+                computer.SetTracer(writer)
+                computer.Run()
+
+            records = list(readTrace(path))
+        finally:
+            os.remove(path)
+
+        self.assertEqual(records[0], TraceRecord(0, 9, (1, 0, 0), (5,), None))
+        self.assertEqual(records[1], TraceRecord(2, 1, (1, 1, 2), (3, 4), 5))
+        self.assertEqual(records[2], TraceRecord(6, 4, (2, 0, 0), (7,), None))
+
+        self.assertEqual([record.ip for record in filterTrace(records, target=5)], [2])
+        self.assertEqual([record.ip for record in filterTrace(records, ipRange=(1, 6))], [2, 6])
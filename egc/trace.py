@@ -0,0 +1,235 @@
+"""
+Structured tracing for the Elf Guidance Computer
+
+Tracing is off by default, and costs nothing until a tracer is attached with ElfGuidanceComputer.SetTracer.
+Traces written to disk with a BinaryTraceWriter can be dumped and filtered after the run with
+
+    python -m egc.trace dump trace.egct --opcode 1 --opcode 2 --ip 100-200
+
+or recorded straight from a program file with
+
+    python -m egc.trace run inputData/day09.txt --input 1 --out trace.egct
+"""
+import argparse
+import collections
+import sys
+
+from egc.computer import ExtraMemoryComputer
+from egc.encoding import encodeVarint, decodeVarint
+from egc.loader import loadProgram
+
+
+TRACE_MAGIC = b'EGCT\x01'
+
+
+TraceRecord = collections.namedtuple('TraceRecord', ['ip', 'opcode', 'modes', 'operands', 'target'])
+
+
+class Tracer(object):
+    """
+    Base class for anything that can receive a computer's trace
+    """
+    def Record(self, ip, opcode, modes, operands, target):
+        """
+        Records a single executed instruction
+
+        :param int ip: the address of the instruction
+        :param int opcode: the decoded opcode
+        :param tuple modes: the parameter modes of the instruction
+        :param tuple operands: the resolved values of every parameter the instruction reads
+        :param int target: the address the instruction writes to, or None
+        """
+        raise NotImplementedError()
+
+
+class RingBufferTracer(Tracer):
+    """
+    Keeps the most recent records in memory, forgetting the oldest once full
+    """
+    def __init__(self, capacity=10000):
+        """
+        :param int capacity: how many records to keep
+        """
+        self.records = collections.deque(maxlen=capacity)
+
+    def Record(self, ip, opcode, modes, operands, target):
+        self.records.append(TraceRecord(ip, opcode, modes, operands, target))
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+
+class BinaryTraceWriter(Tracer):
+    """
+    Streams records to a compact, varint encoded trace file
+    """
+    def __init__(self, path, flushSize=65536):
+        """
+        :param str path: the file to write the trace to
+        :param int flushSize: how many encoded bytes to buffer before writing them out
+        """
+        self._fh = open(path, 'wb')
+        self._fh.write(TRACE_MAGIC)
+        self._pending = bytearray()
+        self.flushSize = flushSize
+
+    def Record(self, ip, opcode, modes, operands, target):
+        out = self._pending
+
+        encodeVarint(ip, out)
+        encodeVarint(opcode, out)
+
+        encodeVarint(len(modes), out)
+        for mode in modes:
+            encodeVarint(mode, out)
+
+        encodeVarint(len(operands), out)
+        for operand in operands:
+            encodeVarint(operand, out)
+
+        if target is None:
+            out.append(0)
+        else:
+            out.append(1)
+            encodeVarint(target, out)
+
+        if len(out) >= self.flushSize:
+            self.Flush()
+
+    def Flush(self):
+        self._fh.write(self._pending)
+        self._pending.clear()
+
+    def Close(self):
+        self.Flush()
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.Close()
+
+
+def readTrace(path):
+    """
+    Reads back a trace file written by a BinaryTraceWriter
+
+    :param str path: the trace file
+
+    :return generator[TraceRecord]: every record in the order it was executed
+    """
+    with open(path, 'rb') as fh:
+        data = fh.read()
+
+    if not data.startswith(TRACE_MAGIC):
+        raise ValueError("{} is not an EGC trace file".format(path))
+
+    offset = len(TRACE_MAGIC)
+    while offset < len(data):
+        ip, offset = decodeVarint(data, offset)
+        opcode, offset = decodeVarint(data, offset)
+
+        count, offset = decodeVarint(data, offset)
+        modes = []
+        for _ in range(count):
+            mode, offset = decodeVarint(data, offset)
+            modes.append(mode)
+
+        count, offset = decodeVarint(data, offset)
+        operands = []
+        for _ in range(count):
+            operand, offset = decodeVarint(data, offset)
+            operands.append(operand)
+
+        target = None
+        hasTarget = data[offset]
+        offset += 1
+        if hasTarget:
+            target, offset = decodeVarint(data, offset)
+
+        yield TraceRecord(ip, opcode, tuple(modes), tuple(operands), target)
+
+
+def filterTrace(records, opcodes=None, ipRange=None, target=None):
+    """
+    :param iterable records: the trace records to filter
+    :param set opcodes: only keep records of these opcodes
+    :param tuple ipRange: only keep records whose ip is within this inclusive (start, end) range
+    :param int target: only keep records that write to this address
+
+    :return generator[TraceRecord]: the records matching every given filter
+    """
+    for record in records:
+        if opcodes and record.opcode not in opcodes:
+            continue
+        if ipRange and not ipRange[0] <= record.ip <= ipRange[1]:
+            continue
+        if target is not None and record.target != target:
+            continue
+
+        yield record
+
+
+def formatRecord(record):
+    """
+    :param TraceRecord record:
+
+    :return str: a single human readable line describing the record
+    """
+    line = "{:>8} op {:>2} modes {} operands {}".format(record.ip, record.opcode,
+                                                       ''.join(str(mode) for mode in record.modes),
+                                                       ', '.join(str(operand) for operand in record.operands))
+    if record.target is not None:
+        line += " -> [{}]".format(record.target)
+
+    return line
+
+
+def _parseRange(text):
+    start, _, end = text.partition('-')
+    return int(start), int(end or start)
+
+
+def Main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m egc.trace', description="Record and inspect EGC traces")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help="Run an intcode program file, tracing it to disk")
+    run.add_argument('program', help="comma separated intcode program")
+    run.add_argument('--input', type=int, default=None, help="value for the computer's input buffer")
+    run.add_argument('--out', required=True, help="trace file to write")
+
+    dump = subparsers.add_parser('dump', help="Print the records of a trace file")
+    dump.add_argument('trace', help="trace file to read")
+    dump.add_argument('--opcode', type=int, action='append', help="only show this opcode, can be repeated")
+    dump.add_argument('--ip', type=_parseRange, help="only show instructions in this address range, eg 100-200")
+    dump.add_argument('--target', type=int, help="only show instructions writing to this address")
+    dump.add_argument('--limit', type=int, help="stop after this many records")
+
+    args = parser.parse_args(args)
+
+    if args.command == 'run':
+        with open(args.program, 'r') as fh:
+            program = loadProgram(fh.read())
+
+        computer = ExtraMemoryComputer(program)
+        computer.input = args.input
+        with BinaryTraceWriter(args.out) as writer:
+            computer.SetTracer(writer)
+            computer.Run()
+        return
+
+    records = filterTrace(readTrace(args.trace), opcodes=set(args.opcode or []), ipRange=args.ip,
+                          target=args.target)
+    for count, record in enumerate(records):
+        if args.limit is not None and count >= args.limit:
+            break
+        sys.stdout.write(formatRecord(record) + '\n')
+
+
+if __name__ == '__main__':
+    Main()
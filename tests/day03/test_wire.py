@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+from day03 import DaySolver03
+from utils.geometry import Point
+
+
+class TestWire(TestCase):
+    def setUp(self):
+        super(TestWire, self).setUp()
+
+        self.solver = DaySolver03()
+
+    def test_stepCounts(self):
+        wire = self.solver.BuildWire([('R', 8), ('U', 5), ('L', 5), ('D', 3)])
+
+        self.assertEqual(wire.stepCounts, [0, 8, 13, 18])
+        self.assertEqual(wire.StepsTo(2, wire[2].end), 18)
+        self.assertEqual(wire.StepsTo(3, wire[3].end), 21)
+
+    def test_integerPoints(self):
+        wire = self.solver.BuildWire([('R', 2 ** 60), ('U', 3)])
+
+        self.assertEqual(wire[1].end, Point(2 ** 60, 3))
+        self.assertIsInstance(wire[1].end.x, int, msg="Wire points should stay integers without rounding")
+        self.assertEqual(wire.StepsTo(1, Point(2 ** 60, 1)), 2 ** 60 + 1)
+
+    def test_crossingSteps(self):
+        wires = self.solver.BuildWires(self.solver.ProcessInput('R8,U5,L5,D3\nU7,R6,D4,L4'))
+
+        steps = sorted((point.x, point.y, wires[0].StepsTo(indexA, point) + wires[1].StepsTo(indexB, point))
+                       for indexA, indexB, point in self.solver.GetWireCrossings(wires))
+        self.assertEqual(steps, [(3, 3, 40), (6, 5, 30)])
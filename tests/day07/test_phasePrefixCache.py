@@ -0,0 +1,39 @@
+import itertools
+from unittest import TestCase
+
+from day07 import DaySolver07, PhasePrefixCache, createChainTemplate, createFeedbackLoopTemplate, \
+    runAmplifierChain, runFeedbackLoop, forkAmplifiers
+
+
+class TestPhasePrefixCache(TestCase):
+    def setUp(self):
+        super(TestPhasePrefixCache, self).setUp()
+
+        self.solver = DaySolver07()
+        self.program = self.solver.ProcessInput()
+
+    def test_chain(self):
+        template = createChainTemplate(self.program)
+        cache = PhasePrefixCache(template)
+
+        for phaseOrder in itertools.permutations(range(5)):
+            expected = runAmplifierChain(forkAmplifiers(template), phaseOrder)
+            self.assertEqual(cache.Signal(phaseOrder), expected,
+                             msg="The cached chain gave the wrong signal for {}".format(phaseOrder))
+
+        # one amplifier run per distinct prefix, rather than five per phase order
+        self.assertEqual(cache.amplifierRuns, 5 + 5 * 4 + 5 * 4 * 3 + 5 * 4 * 3 * 2 + 120)
+
+    def test_feedbackLoop(self):
+        template = createFeedbackLoopTemplate(self.program)
+        cache = PhasePrefixCache(template)
+
+        for phaseOrder in itertools.islice(itertools.permutations(range(5, 10)), 30):
+            expected = runFeedbackLoop(forkAmplifiers(template), phaseOrder)
+            self.assertEqual(cache.Signal(phaseOrder), expected,
+                             msg="The cached feedback loop gave the wrong signal for {}".format(phaseOrder))
+
+    def test_feedbackLoopExamples(self):
+        for (data, phaseOrder), expected in self.solver.testDataPartTwo.items():
+            cache = PhasePrefixCache(createFeedbackLoopTemplate(self.solver.ProcessInput(data)))
+            self.assertEqual(cache.Signal([int(phase) for phase in phaseOrder]), expected)
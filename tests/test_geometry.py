@@ -0,0 +1,36 @@
+import random
+from unittest import TestCase
+
+from utils.geometry import findCrossings, sweepCrossings
+
+import day03
+
+
+class TestSweepCrossings(TestCase):
+    def test_touchingSegmentsCross(self):
+        horizontals = [(0, 10, 0, 0), (0, 10, 5, 1)]
+        verticals = [(10, 0, 5, 0), (11, 0, 5, 1), (3, -5, 0, 2)]
+
+        self.assertEqual(sorted(sweepCrossings(horizontals, verticals)),
+                         [(0, 0, 10, 0), (0, 2, 3, 0), (1, 0, 10, 5)])
+
+    def test_sameAsEveryPair(self):
+        solver = day03.DaySolver03()
+        generator = random.Random(3)
+
+        for _ in range(20):
+            wires = []
+            for _ in range(2):
+                wires.append(solver.BuildWire([(generator.choice('RLUD'), generator.randint(1, 20))
+                                               for _ in range(40)]))
+
+            expected = set()
+            for indexA, edgeA in enumerate(wires[0]):
+                for indexB, edgeB in enumerate(wires[1]):
+                    intersection = edgeA.FindIntersection(edgeB)
+                    if intersection:
+                        expected.add((indexA, indexB, intersection.x, intersection.y))
+
+            crossings = findCrossings(wires[0], wires[1])
+            self.assertEqual(len(crossings), len(set(crossings)))
+            self.assertEqual(set(crossings), expected)
@@ -0,0 +1,56 @@
+import random
+from unittest import TestCase, skipIf
+
+from utils.math import Float2, numpy, dot, getBarycentric, batchDot, batchBarycentric, batchSegmentIntersections
+
+import day03
+
+
+@skipIf(numpy is None, "NumPy is not installed")
+class TestBatchMath(TestCase):
+    def test_batchDot(self):
+        a = numpy.array([[1, 2], [3, 4], [5, 6]])
+        b = numpy.array([[7, 8], [9, 10], [11, 12]])
+
+        self.assertEqual(list(batchDot(a, b)), [dot(x, y) for x, y in zip(a.tolist(), b.tolist())])
+        self.assertEqual(list(batchDot(a, [1, 1])), [3, 7, 11])
+
+    def test_batchBarycentric(self):
+        generator = random.Random(24)
+        points = [[generator.uniform(-10, 10), generator.uniform(-10, 10)] for _ in range(20)]
+
+        a, b, c = [0, 0], [4, 0], [0, 3]
+        coordinates = batchBarycentric(numpy.array(points), a, b, c)
+
+        self.assertEqual(coordinates.shape, (20, 3))
+        for point, uvw in zip(points, coordinates):
+            expected = getBarycentric(Float2(point), Float2(a), Float2(b), Float2(c))
+            self.assertTrue(numpy.allclose(uvw, expected))
+
+    def test_sameAsFindIntersection(self):
+        solver = day03.DaySolver03()
+        generator = random.Random(5)
+
+        wires = []
+        for _ in range(2):
+            wires.append(solver.BuildWire([(generator.choice('RLUD'), generator.randint(1, 20)) for _ in range(60)]))
+        # a diagonal segment, which the grid wires can't have
+        wires[1].append(day03.Edge(Float2([0, 0]), Float2([7, 11])))
+
+        def endpoints(wire):
+            return numpy.array([edge.start for edge in wire]), numpy.array([edge.end for edge in wire])
+
+        mask, points = batchSegmentIntersections(*(endpoints(wires[0]) + endpoints(wires[1])))
+
+        self.assertEqual(mask.shape, (60, 61))
+        for indexA, edgeA in enumerate(wires[0]):
+            for indexB, edgeB in enumerate(wires[1]):
+                # FindIntersection only reports crossings on grid points, which the diagonal could miss
+                intersection = edgeA.FindIntersection(edgeB)
+                if intersection:
+                    self.assertTrue(mask[indexA, indexB])
+                    self.assertTrue(numpy.allclose(points[indexA, indexB], intersection))
+                elif mask[indexA, indexB]:
+                    self.assertFalse(numpy.allclose(points[indexA, indexB], numpy.round(points[indexA, indexB])))
+                else:
+                    self.assertTrue(numpy.isnan(points[indexA, indexB]).all())
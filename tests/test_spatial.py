@@ -0,0 +1,51 @@
+import itertools
+import random
+from unittest import TestCase
+
+from utils.geometry import Point, findCrossings
+from utils.spatial import SegmentGrid
+
+import day03
+
+
+class TestSegmentGrid(TestCase):
+    def setUp(self):
+        super(TestSegmentGrid, self).setUp()
+
+        solver = day03.DaySolver03()
+        generator = random.Random(25)
+        self.wires = solver.BuildWires([[(generator.choice('RLUD'), generator.randint(1, 40)) for _ in range(50)]
+                                        for _ in range(8)])
+
+    def test_sameAsSweep(self):
+        for cellSize in (1, 16, 1000):
+            grid = SegmentGrid(cellSize)
+            grid.AddWires(self.wires)
+            self.assertEqual(len(grid), 8)
+
+            for wireA, wireB in itertools.combinations(range(8), 2):
+                crossings = grid.Crossings(wireA, wireB)
+                self.assertEqual(len(crossings), len(set(crossings)))
+                self.assertEqual(set(crossings), set(findCrossings(self.wires[wireA], self.wires[wireB])))
+
+    def test_closestCrossing(self):
+        expected = None
+        for wireA, wireB in itertools.combinations(range(8), 2):
+            for _, _, x, y in findCrossings(self.wires[wireA], self.wires[wireB]):
+                if (x or y) and (expected is None or abs(x) + abs(y) < expected):
+                    expected = abs(x) + abs(y)
+
+        grid = SegmentGrid(16)
+        grid.AddWires({'wire{}'.format(i): wire for i, wire in enumerate(self.wires)})
+        distance, wireA, wireB, x, y = grid.ClosestCrossing()
+
+        self.assertEqual(distance, expected)
+        self.assertIn((x, y), [(cx, cy) for _, _, cx, cy in findCrossings(grid.wires[wireA], grid.wires[wireB])])
+        self.assertIsNone(SegmentGrid().ClosestCrossing(Point(5, 5)))
+
+    def test_day03(self):
+        solver = day03.DaySolver03()
+        grid = SegmentGrid()
+        grid.AddWires(solver.BuildWires(solver.ProcessInput()))
+
+        self.assertEqual(grid.ClosestCrossing()[0], solver.SolvePartOne(solver.ProcessInput()))
@@ -0,0 +1,151 @@
+"""
+Micro benchmarks for the shared grid geometry
+
+Run with `python -m utils.benchmark`
+"""
+import itertools
+import random
+import timeit
+
+from utils.geometry import Point, findCrossings
+from utils.math import Float2, numpy, batchSegmentIntersections
+from utils.spatial import SegmentGrid
+
+
+def _buildFloat2Wire(wire):
+    """
+    Builds a wire's edges the way day03 did before it moved to integer points, allocating a Float2 for every
+    direction, multiplication and addition
+
+    :param list wire: the (direction, distance) of each edge
+
+    :return day03.Wire: the wire
+    """
+    import day03
+
+    directions = {direction: Float2(step) for direction, step in day03.Directions.items()}
+
+    output = []
+    currentPoint = Float2([0, 0])
+    for direction, distance in wire:
+        newPoint = currentPoint + (directions[direction] * distance)
+        output.append(day03.Edge(currentPoint, newPoint))
+        currentPoint = newPoint
+
+    return day03.Wire(output)
+
+
+def benchmarkWireGeometry(number=100):
+    """
+    Builds day03's wires and finds the combined steps to every crossing, with Float2 points and with integer
+    Points
+
+    :param int number: how many times to run each
+
+    :return dict: seconds per run mapped to the name of each kind of point
+    """
+    import day03
+
+    solver = day03.DaySolver03()
+    data = solver.ProcessInput()
+
+    def solve(buildWire):
+        wires = [buildWire(wire) for wire in data]
+        return min(wires[0].StepsTo(indexA, Point(x, y)) + wires[1].StepsTo(indexB, Point(x, y))
+                   for indexA, indexB, x, y in findCrossings(wires[0], wires[1]) if x or y)
+
+    if solve(_buildFloat2Wire) != solve(solver.BuildWire):
+        raise Exception("Float2 and integer wires disagreed on day03")
+
+    return {'Float2': timeit.timeit(lambda: solve(_buildFloat2Wire), number=number) / number,
+            'Point': timeit.timeit(lambda: solve(solver.BuildWire), number=number) / number}
+
+
+def benchmarkSegmentIntersections(number=10):
+    """
+    Finds every intersection between day03's wires by testing each pair of edges in turn, by testing them all
+    at once with NumPy, and by sweeping across them
+
+    :param int number: how many times to run each
+
+    :return dict: seconds per run mapped to the name of each method
+    """
+    import day03
+
+    solver = day03.DaySolver03()
+    wires = solver.BuildWires(solver.ProcessInput())
+
+    def everyPair():
+        return [edgeA.FindIntersection(edgeB) for edgeA in wires[0] for edgeB in wires[1]]
+
+    results = {'pairs': timeit.timeit(everyPair, number=1),
+               'sweep': timeit.timeit(lambda: findCrossings(wires[0], wires[1]), number=number) / number}
+
+    if numpy is not None:
+        endpoints = []
+        for wire in wires:
+            endpoints.append(numpy.array([edge.start for edge in wire]))
+            endpoints.append(numpy.array([edge.end for edge in wire]))
+
+        results['numpy'] = timeit.timeit(lambda: batchSegmentIntersections(*endpoints),
+                                         number=number) / number
+
+    return results
+
+
+def benchmarkManyWires(wireCount=32, edgeCount=300, cellSize=256):
+    """
+    Finds the crossings between every pair of a netlist of randomly generated wires, and the closest crossing
+    to the origin, by sweeping each pair of wires and with a SegmentGrid that indexes each wire once
+
+    :param int wireCount: how many wires to generate
+    :param int edgeCount: how many edges each wire has
+    :param int cellSize: the SegmentGrid's cell size
+
+    :return dict: seconds mapped to the name of each method
+    """
+    import day03
+
+    generator = random.Random(wireCount)
+    wires = day03.DaySolver03().BuildWires([[(generator.choice('RLUD'), generator.randint(1, 1000))
+                                             for _ in range(edgeCount)] for _ in range(wireCount)])
+    pairs = list(itertools.combinations(range(wireCount), 2))
+
+    def sweep():
+        crossings = {pair: findCrossings(wires[pair[0]], wires[pair[1]]) for pair in pairs}
+        return crossings, min(abs(x) + abs(y) for found in crossings.values() for _, _, x, y in found if x or y)
+
+    def grid():
+        index = SegmentGrid(cellSize)
+        index.AddWires(wires)
+        return {pair: index.Crossings(*pair) for pair in pairs}, index.ClosestCrossing()[0]
+
+    swept, gridded = sweep(), grid()
+    if swept[1] != gridded[1] or any(set(swept[0][pair]) != set(gridded[0][pair]) for pair in pairs):
+        raise Exception("The SegmentGrid disagreed with sweeping each pair of wires")
+
+    return {'sweep': timeit.timeit(sweep, number=1), 'grid': timeit.timeit(grid, number=1)}
+
+
+def Main():
+    number = 100
+    print("Solving day03 part two with each kind of point, {} runs".format(number))
+    print("{:>8} {:>10}".format("point", "run (ms)"))
+    for name, seconds in benchmarkWireGeometry(number).items():
+        print("{:>8} {:>10.3f}".format(name, seconds * 1e3))
+
+    print()
+    print("Finding every intersection between day03's wires")
+    print("{:>8} {:>10}".format("method", "run (ms)"))
+    for name, seconds in benchmarkSegmentIntersections().items():
+        print("{:>8} {:>10.3f}".format(name, seconds * 1e3))
+
+    print()
+    print("Finding the crossings between every pair of 32 wires, and the closest")
+    print("{:>8} {:>10}".format("method", "run (ms)"))
+    for name, seconds in benchmarkManyWires().items():
+        print("{:>8} {:>10.3f}".format(name, seconds * 1e3))
+
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,101 @@
+"""
+Geometry for grid problems, where everything runs along the axes
+"""
+
+import bisect
+import collections
+import math
+
+
+# an integer grid point, a tuple so it costs no more than one small allocation and reads x and y at C speed
+Point = collections.namedtuple('Point', ['x', 'y'])
+
+
+# sweep events at the same x are handled in this order, so segments that only touch still cross
+_INSERT = 0
+_QUERY = 1
+_REMOVE = 2
+
+
+def splitSegments(edges):
+    """
+    Split axis aligned edges into horizontal and vertical segments for sweepCrossings
+
+    :param list edges: edges with start and end points, eg day03's Edge
+
+    :return tuple: (horizontals as [(left, right, y, index)], verticals as [(x, bottom, top, index)]),
+                   where index is the position of the edge in the list of edges
+    """
+    horizontals = []
+    verticals = []
+    for index, edge in enumerate(edges):
+        x0, y0 = edge.start.x, edge.start.y
+        x1, y1 = edge.end.x, edge.end.y
+
+        if y0 == y1:
+            horizontals.append((min(x0, x1), max(x0, x1), y0, index))
+        elif x0 == x1:
+            verticals.append((x0, min(y0, y1), max(y0, y1), index))
+        else:
+            raise ValueError("Edge {} from {} to {} isn't axis aligned".format(index, edge.start, edge.end))
+
+    return horizontals, verticals
+
+
+def sweepCrossings(horizontals, verticals):
+    """
+    Find every point where a horizontal segment meets a vertical one by sweeping a line across them from left
+    to right. Horizontal segments are kept sorted by y while the sweep line is over them, so each vertical
+    segment only has to look at the ones between its ends, which takes O((n + m) log n + k) for n horizontal
+    segments, m vertical segments and k crossings
+
+    :param list[tuple] horizontals: (left, right, y, index) for each horizontal segment
+    :param list[tuple] verticals: (x, bottom, top, index) for each vertical segment
+
+    :return list[tuple]: (horizontal index, vertical index, x, y) for every crossing
+    """
+    events = []
+    for left, right, y, index in horizontals:
+        events.append((left, _INSERT, y, y, index))
+        events.append((right, _REMOVE, y, y, index))
+
+    for x, bottom, top, index in verticals:
+        events.append((x, _QUERY, bottom, top, index))
+
+    events.sort()
+
+    # (y, index) of the horizontal segments the sweep line is currently crossing
+    active = []
+
+    crossings = []
+    for x, kind, low, high, index in events:
+        if kind == _INSERT:
+            bisect.insort(active, (low, index))
+        elif kind == _REMOVE:
+            del active[bisect.bisect_left(active, (low, index))]
+        else:
+            first = bisect.bisect_left(active, (low, -math.inf))
+            last = bisect.bisect_right(active, (high, math.inf))
+            for y, horizontal in active[first:last]:
+                crossings.append((horizontal, index, x, y))
+
+    return crossings
+
+
+def findCrossings(wireA, wireB):
+    """
+    Find every point where the edges of one wire meet the edges of another. Edges running along each other
+    don't count as crossing
+
+    :param list wireA: the axis aligned edges of the first wire
+    :param list wireB: the axis aligned edges of the second wire
+
+    :return list[tuple]: (index of the edge in wireA, index of the edge in wireB, x, y) for every crossing
+    """
+    horizontalsA, verticalsA = splitSegments(wireA)
+    horizontalsB, verticalsB = splitSegments(wireB)
+
+    crossings = sweepCrossings(horizontalsA, verticalsB)
+    crossings.extend((indexA, indexB, x, y) for indexB, indexA, x, y in sweepCrossings(horizontalsB, verticalsA))
+
+    return crossings
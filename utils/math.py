@@ -5,6 +5,11 @@ Common maths functions and datatypes for solving Advent of Code problems
 import functools
 import operator
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 def product(iterable):
     """
@@ -111,3 +116,115 @@ def getBarycentric(p, a, b, c):
     u = 1.0 - v - w
 
     return u, v, w
+
+
+def _requireNumpy():
+    if numpy is None:
+        raise ImportError("The batched maths functions require NumPy")
+
+
+def batchDot(a, b):
+    """
+    :param numpy.ndarray a: (n, k) array of vectors
+    :param numpy.ndarray b: (n, k) array of vectors, or a single vector to dot every row of a with
+
+    :return numpy.ndarray: (n,) dot product of each pair of rows
+    """
+    _requireNumpy()
+
+    a = numpy.asarray(a)
+    b = numpy.broadcast_to(numpy.asarray(b), a.shape)
+
+    return numpy.einsum('ij,ij->i', a, b)
+
+
+def batchBarycentric(p, a, b, c):
+    """
+    Get the barycentric coordinates of a whole batch of points at once, see getBarycentric
+
+    :param numpy.ndarray p: (n, 2) test points
+    :param numpy.ndarray a: (n, 2) A points, or a single point shared by every triangle
+    :param numpy.ndarray b: (n, 2) B points, or a single point shared by every triangle
+    :param numpy.ndarray c: (n, 2) C points, or a single point shared by every triangle
+
+    :return numpy.ndarray: (n, 3) UVW coordinates of each point in its reference frame ABC
+    """
+    _requireNumpy()
+
+    p = numpy.asarray(p, dtype=float)
+    a, b, c = (numpy.broadcast_to(numpy.asarray(point, dtype=float), p.shape) for point in (a, b, c))
+
+    v0 = b - a  # Vector BA
+    v1 = c - a  # Vector CA
+    v2 = p - a  # Vector PA
+    d00 = batchDot(v0, v0)
+    d01 = batchDot(v0, v1)
+    d11 = batchDot(v1, v1)
+    d20 = batchDot(v2, v0)
+    d21 = batchDot(v2, v1)
+
+    denom = (d00 * d11) - (d01 * d01)
+
+    v = (d11 * d20 - d01 * d21) / denom
+    w = (d00 * d21 - d01 * d20) / denom
+    u = 1.0 - v - w
+
+    return numpy.stack([u, v, w], axis=-1)
+
+
+def _batchOrientation(p, q, r):
+    """
+    :return numpy.ndarray: the sign of the orientation of each triplet (p, q, r), 0 for colinear,
+                           1 for clockwise and -1 for counterclockwise, like day03's Edge
+    """
+    return numpy.sign((r[..., 1] - p[..., 1]) * (q[..., 0] - r[..., 0]) -
+                      (r[..., 0] - p[..., 0]) * (q[..., 1] - r[..., 1]))
+
+
+def batchSegmentIntersections(startsA, endsA, startsB, endsB):
+    """
+    Test every segment in one batch against every segment in another, all in one go. Segments intersect
+    where they cross or touch, but not where they're parallel, like day03's Edge.FindIntersection, which
+    only reports the crossings that land on grid points
+
+    :param numpy.ndarray startsA: (n, 2) start points of the first batch of segments
+    :param numpy.ndarray endsA: (n, 2) end points of the first batch of segments
+    :param numpy.ndarray startsB: (m, 2) start points of the second batch of segments
+    :param numpy.ndarray endsB: (m, 2) end points of the second batch of segments
+
+    :return tuple: ((n, m) mask of which pairs intersect, (n, m, 2) point each pair intersects at,
+                   which is nan wherever they don't)
+    """
+    _requireNumpy()
+
+    # line every segment in A up against every segment in B
+    startsA = numpy.asarray(startsA)[:, numpy.newaxis, :]
+    endsA = numpy.asarray(endsA)[:, numpy.newaxis, :]
+    startsB = numpy.asarray(startsB)[numpy.newaxis, :, :]
+    endsB = numpy.asarray(endsB)[numpy.newaxis, :, :]
+
+    o1 = _batchOrientation(startsA, endsA, startsB)
+    o2 = _batchOrientation(startsA, endsA, endsB)
+    o3 = _batchOrientation(startsB, endsB, startsA)
+    o4 = _batchOrientation(startsB, endsB, endsA)
+
+    xdiffA = startsA[..., 0] - endsA[..., 0]
+    xdiffB = startsB[..., 0] - endsB[..., 0]
+    ydiffA = startsA[..., 1] - endsA[..., 1]
+    ydiffB = startsB[..., 1] - endsB[..., 1]
+    div = xdiffA * ydiffB - xdiffB * ydiffA
+
+    # segments that aren't parallel only have a colinear triplet where one touches the other, in which case
+    # the orientations of the other triplets already differ
+    mask = (o1 != o2) & (o3 != o4) & (div != 0)
+
+    dA = startsA[..., 0] * endsA[..., 1] - startsA[..., 1] * endsA[..., 0]
+    dB = startsB[..., 0] * endsB[..., 1] - startsB[..., 1] * endsB[..., 0]
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        x = (dA * xdiffB - dB * xdiffA) / div
+        y = (dA * ydiffB - dB * ydiffA) / div
+
+    points = numpy.stack([x, y], axis=-1)
+    points[~mask] = numpy.nan
+
+    return mask, points
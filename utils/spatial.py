@@ -0,0 +1,156 @@
+"""
+Spatial indexing for finding crossings between many wires on a grid
+"""
+
+import collections
+
+from utils.geometry import Point, splitSegments
+
+
+class SegmentGrid(object):
+    """
+    A uniform grid over the axis aligned segments of any number of wires. Each wire is indexed once, by adding
+    each of its segments to every cell it passes through, so finding the crossings between two wires only has
+    to compare the segments sharing a cell instead of every pair of segments
+    """
+    def __init__(self, cellSize=256):
+        """
+        :param int cellSize: the width and height of each cell
+        """
+        self.cellSize = cellSize
+
+        # the edges of each wire mapped to its id
+        self.wires = {}
+
+        # the horizontal segments (left, right, y, index) and vertical segments (x, bottom, top, index)
+        # of each wire mapped to its id
+        self.horizontals = {}
+        self.verticals = {}
+
+        # the indices of the horizontal and vertical segments of each wire passing through a cell,
+        # mapped to the wire's id, mapped to the cell
+        self._cells = collections.defaultdict(lambda: collections.defaultdict(lambda: ([], [])))
+
+        # the cells each wire passes through mapped to its id
+        self._wireCells = {}
+
+    def __len__(self):
+        return len(self.wires)
+
+    def _cell(self, x, y):
+        return x // self.cellSize, y // self.cellSize
+
+    def AddWire(self, wireID, edges):
+        """
+        :param wireID: the id to query the wire by
+        :param list edges: the axis aligned edges of the wire, eg a day03 Wire
+        """
+        if wireID in self.wires:
+            raise KeyError("Wire {} has already been added".format(wireID))
+
+        horizontals, verticals = splitSegments(edges)
+        self.wires[wireID] = edges
+        self.horizontals[wireID] = {segment[3]: segment for segment in horizontals}
+        self.verticals[wireID] = {segment[3]: segment for segment in verticals}
+
+        cells = self._wireCells[wireID] = set()
+        size = self.cellSize
+
+        for left, right, y, index in horizontals:
+            row = y // size
+            for column in range(left // size, right // size + 1):
+                self._cells[(column, row)][wireID][0].append(index)
+                cells.add((column, row))
+
+        for x, bottom, top, index in verticals:
+            column = x // size
+            for row in range(bottom // size, top // size + 1):
+                self._cells[(column, row)][wireID][1].append(index)
+                cells.add((column, row))
+
+    def AddWires(self, wires):
+        """
+        :param wires: the edges of each wire mapped to its id, or a list of them to be indexed by position
+        """
+        if not isinstance(wires, dict):
+            wires = dict(enumerate(wires))
+
+        for wireID, edges in wires.items():
+            self.AddWire(wireID, edges)
+
+    def _crossingsInCell(self, cell, wireA, wireB):
+        """
+        :return list[tuple]: (index of the edge in wireA, index of the edge in wireB, x, y) for every crossing
+                             between the two wires inside the cell
+        """
+        horizontalsA, verticalsA = self._cells[cell][wireA]
+        horizontalsB, verticalsB = self._cells[cell][wireB]
+
+        crossings = []
+        for horizontalIndices, horizontals, verticalIndices, verticals, swapped in (
+                (horizontalsA, self.horizontals[wireA], verticalsB, self.verticals[wireB], False),
+                (horizontalsB, self.horizontals[wireB], verticalsA, self.verticals[wireA], True)):
+            for horizontalIndex in horizontalIndices:
+                left, right, y, _ = horizontals[horizontalIndex]
+                for verticalIndex in verticalIndices:
+                    x, bottom, top, _ = verticals[verticalIndex]
+
+                    # a crossing in more than one cell is only reported by the one it lies in
+                    if left <= x <= right and bottom <= y <= top and self._cell(x, y) == cell:
+                        if swapped:
+                            crossings.append((verticalIndex, horizontalIndex, x, y))
+                        else:
+                            crossings.append((horizontalIndex, verticalIndex, x, y))
+
+        return crossings
+
+    def Crossings(self, wireA, wireB):
+        """
+        Find every point where the edges of two wires meet, like utils.geometry.findCrossings
+
+        :param wireA: the id of the first wire
+        :param wireB: the id of the second wire
+
+        :return list[tuple]: (index of the edge in wireA, index of the edge in wireB, x, y) for every crossing
+        """
+        crossings = []
+        for cell in self._wireCells[wireA] & self._wireCells[wireB]:
+            crossings.extend(self._crossingsInCell(cell, wireA, wireB))
+
+        return crossings
+
+    def _cellDistance(self, cell, origin):
+        """
+        :return int: the smallest Manhattan distance from the origin to any point in the cell
+        """
+        size = self.cellSize
+        left, bottom = cell[0] * size, cell[1] * size
+        right, top = left + size - 1, bottom + size - 1
+
+        return max(left - origin.x, 0, origin.x - right) + max(bottom - origin.y, 0, origin.y - top)
+
+    def ClosestCrossing(self, origin=Point(0, 0)):
+        """
+        Find the crossing between any two different wires closest to the origin by Manhattan distance, looking
+        at the cells nearest the origin first and stopping once no cell left can hold anything closer.
+        Crossings at the origin itself don't count, since that's where wires usually start
+
+        :param Point origin: where to measure distance from
+
+        :return tuple: (distance, first wire id, second wire id, x, y) of the closest crossing, or None if no
+                       wires cross
+        """
+        best = None
+        for distance, cell in sorted((self._cellDistance(cell, origin), cell) for cell in self._cells):
+            if best is not None and distance > best[0]:
+                break
+
+            wireIDs = list(self._cells[cell])
+            for i, wireA in enumerate(wireIDs):
+                for wireB in wireIDs[i + 1:]:
+                    for _, _, x, y in self._crossingsInCell(cell, wireA, wireB):
+                        crossingDistance = abs(x - origin.x) + abs(y - origin.y)
+                        if crossingDistance and (best is None or crossingDistance < best[0]):
+                            best = (crossingDistance, wireA, wireB, x, y)
+
+        return best